@@ -7,3 +7,7 @@ from django.apps import AppConfig
 class AdminPanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'admin_panel'
+    
+    def ready(self):
+        """Register signal handlers."""
+        from . import signals  # noqa: F401
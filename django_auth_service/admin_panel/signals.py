@@ -0,0 +1,24 @@
+"""
+Signal handlers for admin panel.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.core_service import notify_core_service
+from .models import Fee, Offer
+
+
+def _invalidate_core_pricing():
+    """Tell the core service to reload its offer and fee index."""
+    transaction.on_commit(
+        lambda: notify_core_service("/api/internal/pricing/invalidate")
+    )
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=Fee)
+@receiver(post_delete, sender=Fee)
+def pricing_changed(sender, instance, **kwargs):
+    """Invalidate on every offer or fee change."""
+    _invalidate_core_pricing()
@@ -125,6 +125,10 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# FastAPI core service (internal calls, e.g. auth cache invalidation)
+CORE_SERVICE_URL = os.getenv('CORE_SERVICE_URL', 'http://fastapi_core:8001')
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = DEBUG
 CORS_ALLOW_CREDENTIALS = True
@@ -7,3 +7,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+    
+    def ready(self):
+        """Register signal handlers."""
+        from . import signals  # noqa: F401
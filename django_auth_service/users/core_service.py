@@ -0,0 +1,31 @@
+"""
+Client for internal calls to the FastAPI core service.
+"""
+import logging
+import urllib.error
+import urllib.request
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def notify_core_service(path, timeout=2):
+    """
+    POST to an internal FastAPI endpoint.
+    Failures are logged and swallowed; the core service's cache TTLs bound staleness.
+    """
+    if not settings.INTERNAL_API_TOKEN:
+        return False
+    
+    request = urllib.request.Request(
+        f"{settings.CORE_SERVICE_URL.rstrip('/')}{path}",
+        data=b"",
+        method="POST",
+        headers={"X-Internal-Token": settings.INTERNAL_API_TOKEN},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout):
+            return True
+    except (urllib.error.URLError, OSError) as e:
+        logger.warning(f"Core service notification to {path} failed: {e}")
+        return False
@@ -0,0 +1,31 @@
+"""
+Signal handlers for users app.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .core_service import notify_core_service
+from .models import User
+
+
+def _invalidate_core_auth_cache(user_id):
+    """Tell the core service to drop its cached active status for the user."""
+    transaction.on_commit(
+        lambda: notify_core_service(f"/api/internal/users/{user_id}/invalidate")
+    )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Invalidate on deactivation/reactivation; ignore saves that cannot change status."""
+    if created:
+        return
+    if update_fields is not None and 'is_active' not in update_fields:
+        return  # e.g. the last_login update on every login
+    _invalidate_core_auth_cache(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Invalidate when a user is deleted."""
+    _invalidate_core_auth_cache(instance.pk)
@@ -1,10 +1,22 @@
 """
 Database configuration for FastAPI.
+
+Two request paths share the same schema and service code:
+
+- sync (default): a ``mysql+pymysql`` engine; session work runs on the threadpool.
+- async (``DB_ASYNC_ENABLED=true``): a ``mysql+aiomysql`` engine; session work runs
+  on the event loop through ``AsyncSession.run_sync``, so no threadpool slot is held
+  while waiting on MySQL.
 """
+import functools
 import os
+from typing import Any, Callable, TypeVar, Union
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from app.utils.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, install_idle_pre_ping
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,27 +28,169 @@ MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
 MYSQL_PORT = os.getenv('MYSQL_PORT', '3306')
 MYSQL_DATABASE = os.getenv('MYSQL_DATABASE', 'food_delivery')
 
-DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+DATABASE_URL = os.getenv(
+    'DATABASE_URL',
+    f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+)
+ASYNC_DATABASE_URL = os.getenv(
+    'ASYNC_DATABASE_URL',
+    f"mysql+aiomysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+)
+
+# Read replica (optional). Without it, read-only endpoints use the primary.
+MYSQL_REPLICA_HOST = os.getenv('MYSQL_REPLICA_HOST')
+MYSQL_REPLICA_PORT = os.getenv('MYSQL_REPLICA_PORT', MYSQL_PORT)
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False
+REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL') or (
+    f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_REPLICA_HOST}:{MYSQL_REPLICA_PORT}/{MYSQL_DATABASE}"
+    if MYSQL_REPLICA_HOST else None
+)
+ASYNC_REPLICA_DATABASE_URL = os.getenv('ASYNC_REPLICA_DATABASE_URL') or (
+    f"mysql+aiomysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_REPLICA_HOST}:{MYSQL_REPLICA_PORT}/{MYSQL_DATABASE}"
+    if MYSQL_REPLICA_HOST else None
 )
+REPLICA_ENABLED = REPLICA_DATABASE_URL is not None
+
+# Request path selection
+DB_ASYNC_ENABLED = os.getenv('DB_ASYNC_ENABLED', 'False').lower() == 'true'
+
+# Connection pool configuration (per worker process)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600'))
+DB_POOL_USE_LIFO = os.getenv('DB_POOL_USE_LIFO', 'False').lower() == 'true'
+# always: ping on every checkout, idle: ping only after DB_POOL_PRE_PING_IDLE_SECONDS idle, never: no ping
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'idle').lower()
+DB_POOL_PRE_PING_IDLE_SECONDS = float(os.getenv('DB_POOL_PRE_PING_IDLE_SECONDS', '30'))
+
+if DB_POOL_PRE_PING not in ('always', 'idle', 'never'):
+    raise ValueError(f"DB_POOL_PRE_PING must be 'always', 'idle' or 'never', got '{DB_POOL_PRE_PING}'")
+
+
+def _pool_options() -> dict:
+    """Engine keyword arguments shared by the sync and async engines."""
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_use_lifo": DB_POOL_USE_LIFO,
+        "pool_pre_ping": DB_POOL_PRE_PING == 'always',
+    }
+
+
+def _create_sync_engine(url: str):
+    """Create an instrumented sync engine."""
+    sync_engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        echo=False,
+        **_pool_options()
+    )
+    if DB_POOL_PRE_PING == 'idle':
+        install_idle_pre_ping(sync_engine, DB_POOL_PRE_PING_IDLE_SECONDS)
+    return sync_engine
+
+
+def _create_async_engine(url: str):
+    """Create an instrumented async engine."""
+    new_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        echo=False,
+        **_pool_options()
+    )
+    if DB_POOL_PRE_PING == 'idle':
+        install_idle_pre_ping(new_engine.sync_engine, DB_POOL_PRE_PING_IDLE_SECONDS)
+    return new_engine
 
-# Session factory
+
+# Create engines (the replica falls back to the primary when not configured)
+engine = _create_sync_engine(DATABASE_URL)
+replica_engine = _create_sync_engine(REPLICA_DATABASE_URL) if REPLICA_ENABLED else engine
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+# Async engines and session factories (only built when the async path is enabled)
+async_engine = None
+async_replica_engine = None
+AsyncSessionLocal = None
+AsyncReplicaSessionLocal = None
+
+if DB_ASYNC_ENABLED:
+    async_engine = _create_async_engine(ASYNC_DATABASE_URL)
+    async_replica_engine = (
+        _create_async_engine(ASYNC_REPLICA_DATABASE_URL) if REPLICA_ENABLED else async_engine
+    )
+    # expire_on_commit=False so ORM objects stay readable once run_sync returns
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        bind=async_replica_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
 
 # Base class for models
 Base = declarative_base()
 
+DbSession = Union[Session, AsyncSession]
+
+T = TypeVar("T")
+
+
+async def _session_scope(sync_factory, async_factory):
+    """Open a request session from the factory matching the configured path."""
+    if DB_ASYNC_ENABLED:
+        async with async_factory() as db:
+            yield db
+    else:
+        db = sync_factory()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
 
-def get_db():
-    """Dependency for getting database session."""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """
+    Dependency for getting database session.
+    Yields an AsyncSession when the async path is enabled, otherwise a Session.
+    """
+    async for db in _session_scope(SessionLocal, AsyncSessionLocal):
         yield db
-    finally:
-        db.close()
+
+
+async def get_replica_db():
+    """Dependency for getting a read replica session (primary when no replica is set)."""
+    async for db in _session_scope(ReplicaSessionLocal, AsyncReplicaSessionLocal):
+        yield db
+
+
+async def run_in_session(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run synchronous ORM code ``fn(session, *args, **kwargs)`` against a request session.
+    AsyncSession: runs on the event loop via run_sync. Session: runs on the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(session, *args, **kwargs))
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def with_db_session(fn: Callable[..., T]) -> Callable[..., Any]:
+    """
+    Decorator turning a synchronous route or dependency into an async one.
+    The wrapped function keeps its signature and receives a plain ``Session``
+    as its ``db`` argument in both sync and async mode.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        db = kwargs.pop("db")
+        return await run_in_session(db, lambda session: fn(*args, db=session, **kwargs))
+    return wrapper
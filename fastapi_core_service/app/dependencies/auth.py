@@ -1,28 +1,109 @@
 """
 Authentication dependencies for FastAPI.
+
+JWT_AUTH_MODE selects how the current user is resolved:
+
+- db (default): load the full User row on every request.
+- claims: trust the signed role/email/name claims from Django and only check
+  the user's active status, which is cached (bounded TTL/LRU) so the hot path
+  needs no database access.
 """
+import hashlib
 import os
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+from typing import Optional, Union
+from contextlib import aclosing
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import DbSession, get_db, run_in_session
 from app.models.models import User
+from app.utils.cache import TTLCache
 from dotenv import load_dotenv
 
 load_dotenv()
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here-change-in-production')
 JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+JWT_AUTH_MODE = os.getenv('JWT_AUTH_MODE', 'db').lower()
+
+if JWT_AUTH_MODE not in ('db', 'claims'):
+    raise ValueError(f"JWT_AUTH_MODE must be 'db' or 'claims', got '{JWT_AUTH_MODE}'")
+
+# Active-status cache used in claims mode: {user_id: is_active}
+user_status_cache = TTLCache(
+    maxsize=int(os.getenv('USER_STATUS_CACHE_SIZE', '10000')),
+    ttl=float(os.getenv('USER_STATUS_CACHE_TTL_SECONDS', '60'))
+)
+
+
+# Verified token payloads: {sha256(token): payload}, each kept until the token's exp
+JWT_DECODE_CACHE_ENABLED = os.getenv('JWT_DECODE_CACHE_ENABLED', 'True').lower() == 'true'
+token_cache = TTLCache(
+    maxsize=int(os.getenv('JWT_DECODE_CACHE_SIZE', '50000')),
+    ttl=float(os.getenv('JWT_DECODE_CACHE_MAX_TTL_SECONDS', '3600'))
+)
+
+
+@dataclass(frozen=True)
+class TokenUser:
+    """Authenticated user built from verified JWT claims (claims mode)."""
+    id: int
+    role: str
+    email: Optional[str] = None
+    name: Optional[str] = None
+    is_active: bool = True
+
+
+CurrentUser = Union[User, TokenUser]
+
+
+def invalidate_user_status(user_id: int) -> None:
+    """Drop a cached active status (called when Django changes or deletes a user)."""
+    user_status_cache.pop(user_id)
+
+
+def decode_token(token: str) -> dict:
+    """
+    Verify a JWT and return its payload.
+    Verified payloads are cached by token digest until the token expires,
+    so repeat requests with the same access token skip signature verification.
+    Raises JWTError for invalid tokens.
+    """
+    if not JWT_DECODE_CACHE_ENABLED:
+        return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(key, payload, expires_at=float(exp))
+    return payload
 
 
-def get_current_user(
+def _load_user(db: Session, user_id: int) -> Optional[User]:
+    """Load the full user row."""
+    return db.query(User).filter(User.id == user_id).first()
+
+
+def _load_user_status(db: Session, user_id: int) -> Optional[bool]:
+    """Load only the active flag; None if the user does not exist."""
+    row = db.query(User.is_active).filter(User.id == user_id).first()
+    return None if row is None else bool(row.is_active)
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: DbSession = Depends(get_db)
+) -> CurrentUser:
     """
     Validate JWT token and return current user.
     Token is generated by Django SimpleJWT.
@@ -32,35 +113,82 @@ def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    inactive_exception = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="User account is inactive"
+    )
     
     try:
         token = credentials.credentials
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        payload = decode_token(token)
         user_id: int = payload.get("user_id")
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    if JWT_AUTH_MODE == "claims":
+        role = payload.get("role")
+        if role is None:
+            raise credentials_exception
+        
+        is_active = user_status_cache.get(user_id)
+        if is_active is None:
+            is_active = await run_in_session(db, _load_user_status, user_id)
+            if is_active is None:
+                raise credentials_exception
+            user_status_cache.set(user_id, is_active)
+        
+        if not is_active:
+            raise inactive_exception
+        
+        return TokenUser(
+            id=user_id,
+            role=role,
+            email=payload.get("email"),
+            name=payload.get("name")
+        )
+    
+    user = await run_in_session(db, _load_user, user_id)
     if user is None:
         raise credentials_exception
     
     if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User account is inactive"
-        )
+        raise inactive_exception
     
     return user
 
 
+async def get_stream_user(
+    token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> CurrentUser:
+    """
+    Authenticate a long-lived stream.
+    Browsers' EventSource cannot send headers, so the access token may also be
+    passed as ?token=. Uses its own short-lived session so an open stream does
+    not hold a database connection.
+    """
+    if credentials is None:
+        if not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    
+    async with aclosing(get_db()) as sessions:
+        async for db in sessions:
+            return await get_current_user(credentials, db)
+
+
 def require_role(*allowed_roles: str):
     """
     Dependency factory to check if user has required role.
     Usage: require_role("Customer", "Admin")
     """
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    async def role_checker(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -71,7 +199,7 @@ def require_role(*allowed_roles: str):
 
 
 # Pre-defined role dependencies
-def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_admin_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Dependency to get admin user."""
     if current_user.role != "Admin":
         raise HTTPException(
@@ -81,7 +209,7 @@ def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def get_customer_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_customer_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Dependency to get customer user."""
     if current_user.role != "Customer":
         raise HTTPException(
@@ -91,7 +219,7 @@ def get_customer_user(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def get_restaurant_owner_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_restaurant_owner_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Dependency to get restaurant owner user."""
     if current_user.role != "Restaurant Owner":
         raise HTTPException(
@@ -101,7 +229,7 @@ def get_restaurant_owner_user(current_user: User = Depends(get_current_user)) ->
     return current_user
 
 
-def get_delivery_partner_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_delivery_partner_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Dependency to get delivery partner user."""
     if current_user.role != "Delivery Partner":
         raise HTTPException(
@@ -111,7 +239,7 @@ def get_delivery_partner_user(current_user: User = Depends(get_current_user)) ->
     return current_user
 
 
-def get_customer_care_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_customer_care_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Dependency to get customer care user."""
     if current_user.role != "Customer Care":
         raise HTTPException(
@@ -0,0 +1,82 @@
+"""
+Read routing dependencies.
+Sends read-only endpoints to the replica, except for users who wrote recently
+(read-your-writes stickiness, tracked per worker process).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app import database
+from app.database import DbSession, get_db
+from app.dependencies.auth import get_current_user
+from app.models.models import User
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# How long a user's reads stay on the primary after their own write
+READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', '5'))
+
+# {user_id: sticky_until}, oldest first (all entries share the same window)
+_recent_writes: "OrderedDict[int, float]" = OrderedDict()
+_recent_writes_lock = threading.Lock()
+
+
+def mark_recent_write(user_id: int) -> None:
+    """Pin the user's reads to the primary for READ_YOUR_WRITES_SECONDS."""
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[user_id] = now + READ_YOUR_WRITES_SECONDS
+        _recent_writes.move_to_end(user_id)
+
+        # Drop expired entries from the front so memory stays bounded
+        while _recent_writes:
+            oldest_user_id, sticky_until = next(iter(_recent_writes.items()))
+            if sticky_until > now:
+                break
+            del _recent_writes[oldest_user_id]
+
+
+def has_recent_write(user_id: int) -> bool:
+    """Check whether the user is inside their read-your-writes window."""
+    with _recent_writes_lock:
+        sticky_until = _recent_writes.get(user_id)
+    return sticky_until is not None and sticky_until > time.monotonic()
+
+
+async def _release_session(db: DbSession) -> None:
+    """
+    Close a session, detaching its objects (their loaded attributes stay
+    readable) and returning its connection to the pool. The session can be
+    used again afterwards; it then checks out a new connection.
+    """
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+
+async def get_read_db(
+    db: DbSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Dependency for read-only endpoints.
+    Yields a replica session, or the request's primary session when no replica
+    is configured or the user wrote within the stickiness window.
+
+    Authentication (JWT_AUTH_MODE=db) loads the user through the primary
+    session; that session is closed before the replica is used, so a replica
+    read does not also hold a primary connection for the whole request.
+    """
+    if not database.REPLICA_ENABLED or has_recent_write(current_user.id):
+        yield db
+        return
+
+    await _release_session(db)
+    async for replica_db in database.get_replica_db():
+        yield replica_db
@@ -1,10 +1,23 @@
 """
 Main FastAPI application.
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import customer, restaurant_owner, delivery, support
+from starlette.concurrency import run_in_threadpool
+from app.database import SessionLocal
+from app.routers import customer, restaurant_owner, delivery, support, metrics, internal, stream, quotes
+from app.services.batch_matcher import BATCH_MATCHER_ENABLED, batch_matcher
+from app.services.order_events import order_event_dispatcher
+from app.services.order_stream import order_stream_broker, order_stream_hub
+from app.services.partner_dispatcher import partner_dispatcher
+from app.utils.notifications import notification_queue
+from app.utils.pagination import NEXT_CURSOR_HEADER
 import logging
+import re
+
+logger = logging.getLogger(__name__)
 
 # Configure logging
 logging.basicConfig(
@@ -12,13 +25,62 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# EventSource clients pass their bearer token as ?token= (see get_stream_user)
+_TOKEN_PARAM = re.compile(r"([?&]token=)[^&\s]*")
+
+
+class RedactTokenFilter(logging.Filter):
+    """Masks ?token= in uvicorn access log lines, for runs with the access log on."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                _TOKEN_PARAM.sub(r"\1[redacted]", arg) if isinstance(arg, str) else arg
+                for arg in record.args
+            )
+        return True
+
+
+logging.getLogger("uvicorn.access").addFilter(RedactTokenFilter())
+
+
+def load_partner_dispatcher():
+    db = SessionLocal()
+    try:
+        partner_dispatcher.load(db)
+    except Exception:
+        # Assignment falls back to the table and retries the load on first use
+        logger.exception("Could not load delivery partners into the dispatcher")
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers; drain pending order events and notifications on shutdown."""
+    if partner_dispatcher.enabled:
+        await run_in_threadpool(load_partner_dispatcher)
+    order_stream_hub.bind(asyncio.get_running_loop())
+    order_stream_broker.start(order_stream_hub)
+    notification_queue.start()
+    order_event_dispatcher.start()
+    if BATCH_MATCHER_ENABLED:
+        batch_matcher.start()
+    yield
+    await run_in_threadpool(batch_matcher.stop)
+    await run_in_threadpool(order_event_dispatcher.stop)
+    await run_in_threadpool(notification_queue.stop)
+    order_stream_broker.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Food Delivery System - Core API",
     description="FastAPI core service for food delivery platform with business logic",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -28,6 +90,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -35,10 +98,14 @@ app.include_router(customer.router)
 app.include_router(restaurant_owner.router)
 app.include_router(delivery.router)
 app.include_router(support.router)
+app.include_router(metrics.router)
+app.include_router(internal.router)
+app.include_router(stream.router)
+app.include_router(quotes.router)
 
 
 @app.get("/")
-def root():
+async def root():
     """Root endpoint."""
     return {
         "message": "Food Delivery System - Core API",
@@ -48,6 +115,6 @@ def root():
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
@@ -1,8 +1,8 @@
 """
 SQLAlchemy models for FastAPI Core Service.
 """
-from sqlalchemy import Column, Integer, String, Decimal, Boolean, DateTime, ForeignKey, Enum, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Numeric, Boolean, DateTime, ForeignKey, Enum, Text, JSON, UniqueConstraint, cast, func
+from sqlalchemy.orm import column_property, relationship
 from datetime import datetime
 from app.database import Base
 import enum
@@ -65,11 +65,14 @@ class Dish(Base):
     id = Column(Integer, primary_key=True, index=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
     name = Column(String(255), nullable=False)
-    price = Column(Decimal(10, 2), nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)
     photo_path = Column(String(500), nullable=True)
     available = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Price as Money (paise), converted by the database; load with undefer() for pricing
+    price_paise = column_property(cast(func.round(price * 100), Integer), deferred=True)
+    
     # Relationships
     restaurant = relationship("Restaurant", back_populates="dishes")
 
@@ -99,14 +102,21 @@ class Order(Base):
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
     delivery_partner_id = Column(Integer, ForeignKey("users_user.id"), nullable=True)
     status = Column(String(50), default=OrderStatus.PLACED.value)
-    total_amount = Column(Decimal(10, 2), nullable=False)
-    discount_amount = Column(Decimal(10, 2), default=0)
-    delivery_fee = Column(Decimal(10, 2), nullable=False)
-    platform_fee = Column(Decimal(10, 2), nullable=False)
+    total_amount = Column(Numeric(10, 2), nullable=False)
+    discount_amount = Column(Numeric(10, 2), default=0)
+    delivery_fee = Column(Numeric(10, 2), nullable=False)
+    platform_fee = Column(Numeric(10, 2), nullable=False)
     payment_mode = Column(String(20), nullable=False)
+    # Idempotency-Key of the checkout that placed the order, and a hash of its body
+    idempotency_key = Column(String(255), nullable=True)
+    request_fingerprint = Column(String(64), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        UniqueConstraint("customer_id", "idempotency_key", name="uq_customer_idempotency_key"),
+    )
+    
     # Relationships
     customer = relationship("User", foreign_keys=[customer_id])
     restaurant = relationship("Restaurant", foreign_keys=[restaurant_id])
@@ -123,13 +133,23 @@ class OrderItem(Base):
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     dish_id = Column(Integer, ForeignKey("dishes.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
-    price_snapshot = Column(Decimal(10, 2), nullable=False)
+    price_snapshot = Column(Numeric(10, 2), nullable=False)
     
     # Relationships
     order = relationship("Order", back_populates="items")
     dish = relationship("Dish")
 
 
+class CustomerStats(Base):
+    """Per-customer order counters, maintained on checkout and cancellation."""
+    __tablename__ = "customer_stats"
+    
+    customer_id = Column(Integer, ForeignKey("users_user.id"), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)  # Non-cancelled orders
+    lifetime_spend = Column(Numeric(12, 2), nullable=False, default=0)
+    last_order_at = Column(DateTime, nullable=True)
+
+
 class DeliveryPartner(Base):
     """Delivery partner model."""
     __tablename__ = "delivery_partners"
@@ -174,8 +194,8 @@ class Offer(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=True)
-    discount_percentage = Column(Decimal(5, 2), nullable=False)
-    min_order_value = Column(Decimal(10, 2), nullable=False)
+    discount_percentage = Column(Numeric(5, 2), nullable=False)
+    min_order_value = Column(Numeric(10, 2), nullable=False)
     first_time_user_only = Column(Boolean, default=False)
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -190,8 +210,8 @@ class Fee(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=True)
-    delivery_fee = Column(Decimal(10, 2), nullable=False)
-    platform_fee = Column(Decimal(10, 2), nullable=False)
+    delivery_fee = Column(Numeric(10, 2), nullable=False)
+    platform_fee = Column(Numeric(10, 2), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -212,3 +232,24 @@ class Notification(Base):
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
     order = relationship("Order", foreign_keys=[order_id])
+
+
+class OrderEvent(Base):
+    """Order events outbox, written in the same transaction as the order change."""
+    __tablename__ = "order_events"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = Column(String(36), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    order = relationship("Order", foreign_keys=[order_id])
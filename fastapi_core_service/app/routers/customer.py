@@ -1,64 +1,75 @@
 """
 Customer API routes.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
+from app.database import DbSession, get_db, run_in_session, with_db_session
 from app.dependencies.auth import get_customer_user
-from app.models.models import User, Restaurant, Dish, Order, Complaint
+from app.dependencies.read_routing import get_read_db, mark_recent_write
+from app.models.models import User, Order, OrderStatus, Complaint
 from app.schemas.schemas import (
     RestaurantResponse, DishResponse, CartAddRequest, CartRemoveRequest,
     CartResponse, CheckoutRequest, OrderResponse, ComplaintCreate,
     ComplaintResponse, OrderItemResponse
 )
-from app.services import cart_service, order_service
+from app.services import cart_service, menu_service, order_service, order_state, restaurant_service
+from app.services.menu_service import menu_cache
+from app.services.restaurant_service import restaurant_list_cache
+from app.services.zone_index import ZONE_MAX_NEIGHBOURS
+from app.utils.idempotency import IdempotencyStore, fingerprint, validate_idempotency_key
+from app.utils.pagination import PageParams
+from app.utils.response_cache import cached_json_response
 
 router = APIRouter(prefix="/api", tags=["Customer"])
 
+# Completed checkouts by (user_id, Idempotency-Key)
+checkout_idempotency = IdempotencyStore()
+
 
 @router.get("/restaurants", response_model=List[RestaurantResponse])
-def list_restaurants(
+async def list_restaurants(
     pin_code: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    zones: int = Query(1, ge=1, le=ZONE_MAX_NEIGHBOURS + 1),
+    if_none_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: User = Depends(get_customer_user)
 ):
-    """List all restaurants (filter by pin_code, only active and ordering enabled)."""
-    query = db.query(Restaurant).filter(
-        Restaurant.status == "active",
-        Restaurant.is_ordering_enabled == True
+    """
+    List all restaurants (filter by pin_code, only active and ordering enabled).
+    zones > 1 also includes the nearest neighbouring pin codes, nearest first.
+    Supports If-None-Match revalidation. Misses load from the primary, like
+    the menu.
+    """
+    pin_codes = restaurant_service.listing_pin_codes(pin_code, zones)
+    cached = await restaurant_list_cache.get_or_load(
+        tuple(pin_codes),
+        lambda: run_in_session(db, restaurant_service.load_restaurant_list, pin_codes),
+        depends_on=pin_codes
     )
-    
-    if pin_code:
-        query = query.filter(Restaurant.pin_code == pin_code)
-    
-    restaurants = query.all()
-    return restaurants
+    return cached_json_response(cached, if_none_match)
 
 
 @router.get("/restaurants/{restaurant_id}/menu", response_model=List[DishResponse])
-def get_restaurant_menu(
+async def get_restaurant_menu(
     restaurant_id: int,
-    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: User = Depends(get_customer_user)
 ):
-    """Get menu (dishes) for a specific restaurant."""
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-    if not restaurant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Restaurant not found"
-        )
-    
-    dishes = db.query(Dish).filter(
-        Dish.restaurant_id == restaurant_id,
-        Dish.available == True
-    ).all()
-    
-    return dishes
+    """
+    Get menu (dishes) for a specific restaurant. Served from the menu cache;
+    supports If-None-Match revalidation. Misses load from the primary: a
+    lagging replica would store the pre-write menu under the bumped version.
+    """
+    cached = await menu_cache.get_or_load(
+        restaurant_id, lambda: run_in_session(db, menu_service.load_menu, restaurant_id)
+    )
+    return cached_json_response(cached, if_none_match)
 
 
 @router.post("/cart/add", response_model=CartResponse)
+@with_db_session
 def add_to_cart(
     request: CartAddRequest,
     db: Session = Depends(get_db),
@@ -69,6 +80,7 @@ def add_to_cart(
 
 
 @router.post("/cart/remove", response_model=CartResponse)
+@with_db_session
 def remove_from_cart(
     request: CartRemoveRequest,
     db: Session = Depends(get_db),
@@ -79,6 +91,7 @@ def remove_from_cart(
 
 
 @router.get("/cart", response_model=CartResponse)
+@with_db_session
 def get_cart(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_customer_user)
@@ -88,37 +101,54 @@ def get_cart(
 
 
 @router.post("/checkout", response_model=OrderResponse)
-def checkout(
+async def checkout(
     request: CheckoutRequest,
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: User = Depends(get_customer_user)
 ):
-    """Checkout and create order from cart."""
-    order = order_service.create_order_from_cart(db, current_user.id, request)
-    
-    # Load items for response
-    db.refresh(order)
-    
-    return order
+    """
+    Checkout and create order from cart.
+    With an Idempotency-Key header, retries of the same checkout (on any
+    worker) return the original order instead of placing a new one.
+    """
+    user_id = current_user.id
+    request_fingerprint = None
+    if idempotency_key is not None:
+        validate_idempotency_key(idempotency_key)
+        request_fingerprint = fingerprint(request.model_dump_json())
+
+    async def place_order() -> OrderResponse:
+        order = await run_in_session(
+            db, order_service.create_order_from_cart, user_id, request, idempotency_key, request_fingerprint
+        )
+        mark_recent_write(user_id)
+        return order
+
+    if idempotency_key is None:
+        return await place_order()
+
+    # Replays and concurrent duplicates within this worker skip the database
+    return await checkout_idempotency.run((user_id, idempotency_key), request_fingerprint, place_order)
 
 
 @router.get("/orders/history", response_model=List[OrderResponse])
+@with_db_session
 def get_order_history(
-    db: Session = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_customer_user)
 ):
-    """Get order history for customer."""
-    orders = db.query(Order).filter(
-        Order.customer_id == current_user.id
-    ).order_by(Order.created_at.desc()).all()
-    
-    return orders
+    """Get order history for customer, newest first, one page at a time."""
+    return order_service.order_page(db, page, response, Order.customer_id == current_user.id)
 
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
+@with_db_session
 def get_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_customer_user)
 ):
     """Get specific order details."""
@@ -133,46 +163,31 @@ def get_order(
             detail="Order not found"
         )
     
-    return order
+    return OrderResponse.model_validate(order)
 
 
 @router.post("/orders/{order_id}/cancel", response_model=OrderResponse)
+@with_db_session
 def cancel_order(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_customer_user)
 ):
     """Cancel an order (only if status is 'placed')."""
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.customer_id == current_user.id
-    ).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    if order.status != "placed":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order can only be cancelled when status is 'placed'"
-        )
-    
-    order.status = "cancelled"
+    # Notifications and releasing an assigned partner run from the outbox
+    order = order_state.transition(
+        db, order_id, order_state.CUSTOMER, OrderStatus.CANCELLED.value,
+        scope=[Order.customer_id == current_user.id]
+    )
+    response = OrderResponse.model_validate(order)
     db.commit()
-    db.refresh(order)
-    
-    # Release delivery partner if assigned
-    if order.delivery_partner_id:
-        from app.services import delivery_service
-        delivery_service.release_delivery_partner(db, order.delivery_partner_id)
+    mark_recent_write(current_user.id)
     
-    return order
+    return response
 
 
 @router.post("/orders/{order_id}/reorder")
+@with_db_session
 def reorder(
     order_id: int,
     db: Session = Depends(get_db),
@@ -183,6 +198,7 @@ def reorder(
 
 
 @router.post("/complaints", response_model=ComplaintResponse)
+@with_db_session
 def create_complaint(
     request: ComplaintCreate,
     db: Session = Depends(get_db),
@@ -210,12 +226,14 @@ def create_complaint(
     
     db.add(complaint)
     db.commit()
+    mark_recent_write(current_user.id)
     db.refresh(complaint)
     
     return complaint
 
 
 @router.get("/complaints", response_model=List[ComplaintResponse])
+@with_db_session
 def get_my_complaints(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_customer_user)
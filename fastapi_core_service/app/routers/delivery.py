@@ -1,18 +1,20 @@
 """
 Delivery Partner API routes.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_db, with_db_session
 from app.dependencies.auth import get_delivery_partner_user
-from app.models.models import User, DeliveryPartner, Order
+from app.models.models import User, DeliveryPartner, Order, OrderStatus
 from app.schemas.schemas import (
     DeliveryPartnerToggle, DeliveryPartnerResponse,
     OrderResponse, OrderStatusUpdate
 )
-from app.services import delivery_service
-from app.utils.notifications import notify_order_status_change
+from app.services import delivery_service, order_service, order_state
+from app.services.partner_dispatcher import track
+from app.utils.pagination import PageParams
 
 router = APIRouter(prefix="/api/delivery", tags=["Delivery Partner"])
 
@@ -29,6 +31,7 @@ def get_delivery_partner_record(db: Session, user_id: int) -> DeliveryPartner:
 
 
 @router.put("/toggle-availability", response_model=DeliveryPartnerResponse)
+@with_db_session
 def toggle_availability(
     toggle_data: DeliveryPartnerToggle,
     db: Session = Depends(get_db),
@@ -45,20 +48,23 @@ def toggle_availability(
 
 
 @router.get("/assigned-orders", response_model=List[OrderResponse])
+@with_db_session
 def get_assigned_orders(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_delivery_partner_user)
 ):
-    """Get orders assigned to delivery partner."""
-    orders = db.query(Order).filter(
+    """Get orders assigned to delivery partner, newest first, one page at a time."""
+    return order_service.order_page(
+        db, page, response,
         Order.delivery_partner_id == current_user.id,
         Order.status.in_(["preparing", "out_for_delivery"])
-    ).order_by(Order.created_at.desc()).all()
-    
-    return orders
+    )
 
 
 @router.put("/orders/{order_id}/status", response_model=OrderResponse)
+@with_db_session
 def update_delivery_status(
     order_id: int,
     status_update: OrderStatusUpdate,
@@ -69,60 +75,33 @@ def update_delivery_status(
     Update order delivery status.
     Delivery partner can move: preparing -> out_for_delivery -> delivered.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
+    new_status = status_update.status.value
+    if new_status == OrderStatus.OUT_FOR_DELIVERY.value:
+        # Pick up the order: assigned to this partner, or unassigned and taken
+        # in the same UPDATE unless another partner picked it up first
+        order = order_state.transition(
+            db, order_id, order_state.DELIVERY_PARTNER, new_status,
+            guards=[or_(Order.delivery_partner_id.is_(None), Order.delivery_partner_id == current_user.id)],
+            values={"delivery_partner_id": current_user.id},
+            guard_error=HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Order was picked up by another delivery partner"
+            )
         )
-    
-    # Assign delivery partner if moving to out_for_delivery
-    if status_update.status.value == "out_for_delivery" and order.status == "preparing":
-        if not order.delivery_partner_id:
-            # Assign current delivery partner
-            order.delivery_partner_id = current_user.id
-            # Mark as unavailable
-            partner = get_delivery_partner_record(db, current_user.id)
-            partner.available = False
-    
-    # Verify order is assigned to this delivery partner for status updates
-    if order.status in ["out_for_delivery", "delivered"]:
-        if order.delivery_partner_id != current_user.id:
-            raise HTTPException(
+        # Mark as unavailable (no-op if the order was assigned to them)
+        if delivery_service.claim_delivery_partner(db, current_user.id):
+            track(db, current_user.id, False)
+    else:
+        # Notifications and releasing the partner on delivery run from the outbox
+        order = order_state.transition(
+            db, order_id, order_state.DELIVERY_PARTNER, new_status,
+            guards=[Order.delivery_partner_id == current_user.id],
+            guard_error=HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="This order is not assigned to you"
             )
-    
-    # Validate status transitions
-    valid_transitions = {
-        "preparing": ["out_for_delivery"],
-        "out_for_delivery": ["delivered"]
-    }
-    
-    if order.status not in valid_transitions:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot update status from {order.status}"
-        )
-    
-    if status_update.status.value not in valid_transitions[order.status]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid status transition from {order.status} to {status_update.status.value}"
         )
-    
-    old_status = order.status
-    order.status = status_update.status.value
-    
-    # Release delivery partner when order is delivered
-    if order.status == "delivered" and order.delivery_partner_id:
-        delivery_service.release_delivery_partner(db, order.delivery_partner_id)
-    
+    response = OrderResponse.model_validate(order)
     db.commit()
-    db.refresh(order)
-    
-    # Send notifications
-    notify_order_status_change(db, order, old_status)
     
-    return order
+    return response
@@ -0,0 +1,49 @@
+"""
+Internal service-to-service API routes (called by the Django auth service).
+Protected by the shared INTERNAL_API_TOKEN and blocked at nginx.
+"""
+import hmac
+import os
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status
+from app.dependencies.auth import invalidate_user_status
+from app.services.pricing_index import pricing_index
+from dotenv import load_dotenv
+
+load_dotenv()
+
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN')
+
+router = APIRouter(prefix="/api/internal", tags=["Internal"], include_in_schema=False)
+
+
+def verify_internal_token(x_internal_token: Optional[str]) -> None:
+    """Reject calls without the shared internal token."""
+    if not INTERNAL_API_TOKEN or not x_internal_token or not hmac.compare_digest(
+        x_internal_token, INTERNAL_API_TOKEN
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid internal token"
+        )
+
+
+@router.post("/users/{user_id}/invalidate", status_code=status.HTTP_204_NO_CONTENT)
+async def invalidate_user(
+    user_id: int,
+    x_internal_token: Optional[str] = Header(None)
+):
+    """Drop cached auth state for a user after Django changes or deletes them."""
+    verify_internal_token(x_internal_token)
+    invalidate_user_status(user_id)
+    return None
+
+
+@router.post("/pricing/invalidate", status_code=status.HTTP_204_NO_CONTENT)
+async def invalidate_pricing(
+    x_internal_token: Optional[str] = Header(None)
+):
+    """Reload offers and fees on next use after Django changes them."""
+    verify_internal_token(x_internal_token)
+    pricing_index.bump()
+    return None
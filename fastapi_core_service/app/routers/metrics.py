@@ -0,0 +1,99 @@
+"""
+Operational metrics API routes (Admin only).
+"""
+from fastapi import APIRouter, Depends
+from starlette.concurrency import run_in_threadpool
+from app import database
+from app.dependencies import auth
+from app.dependencies.auth import get_admin_user
+from app.models.models import User
+from app.services import cart_service
+from app.services.batch_matcher import batch_matcher
+from app.services.menu_service import menu_cache
+from app.services.restaurant_service import restaurant_list_cache
+from app.services.order_events import order_event_dispatcher
+from app.services.order_stream import order_stream_hub
+from app.services.partner_dispatcher import partner_dispatcher
+from app.services.pricing_index import pricing_index
+from app.utils.notifications import notification_queue
+from app.utils.pool_metrics import pool_status
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+
+@router.get("/pool")
+async def get_pool_metrics(current_user: User = Depends(get_admin_user)):
+    """Live connection pool state and checkout metrics for this worker process."""
+    engines = {"sync": pool_status(database.engine)}
+    if database.REPLICA_ENABLED:
+        engines["sync_replica"] = pool_status(database.replica_engine)
+    if database.async_engine is not None:
+        engines["async"] = pool_status(database.async_engine.sync_engine)
+        if database.REPLICA_ENABLED:
+            engines["async_replica"] = pool_status(database.async_replica_engine.sync_engine)
+
+    return {
+        "async_enabled": database.DB_ASYNC_ENABLED,
+        "replica_enabled": database.REPLICA_ENABLED,
+        "pre_ping": database.DB_POOL_PRE_PING,
+        "engines": engines
+    }
+
+
+@router.get("/auth")
+async def get_auth_metrics(current_user: User = Depends(get_admin_user)):
+    """Authentication mode, token cache and user status cache counters for this worker process."""
+    return {
+        "auth_mode": auth.JWT_AUTH_MODE,
+        "token_cache_enabled": auth.JWT_DECODE_CACHE_ENABLED,
+        "token_cache": auth.token_cache.stats(),
+        "user_status_cache": auth.user_status_cache.stats()
+    }
+
+
+@router.get("/cart")
+async def get_cart_store_metrics(current_user: User = Depends(get_admin_user)):
+    """Cart store backend and size."""
+    return await run_in_threadpool(cart_service.cart_store.stats)
+
+
+@router.get("/menu-cache")
+async def get_menu_cache_metrics(current_user: User = Depends(get_admin_user)):
+    """Menu and restaurant listing cache sizes and hit counters for this worker process."""
+    return {"menus": menu_cache.stats(), "restaurant_lists": restaurant_list_cache.stats()}
+
+
+@router.get("/pricing")
+async def get_pricing_metrics(current_user: User = Depends(get_admin_user)):
+    """Offer and fee index size and reload counters for this worker process."""
+    return pricing_index.stats()
+
+
+@router.get("/notifications")
+async def get_notification_metrics(current_user: User = Depends(get_admin_user)):
+    """Notification queue depth and background writer counters for this worker process."""
+    return notification_queue.stats()
+
+
+@router.get("/order-events")
+async def get_order_event_metrics(current_user: User = Depends(get_admin_user)):
+    """Order event dispatcher counters for this worker process."""
+    return order_event_dispatcher.stats()
+
+
+@router.get("/order-stream")
+async def get_order_stream_metrics(current_user: User = Depends(get_admin_user)):
+    """Open order status streams and delivery counters for this worker process."""
+    return order_stream_hub.stats()
+
+
+@router.get("/dispatcher")
+async def get_dispatcher_metrics(current_user: User = Depends(get_admin_user)):
+    """Available delivery partners held by this worker's dispatcher."""
+    return partner_dispatcher.stats()
+
+
+@router.get("/batch-matcher")
+async def get_batch_matcher_metrics(current_user: User = Depends(get_admin_user)):
+    """Batch order-to-partner matcher counters for this worker process."""
+    return batch_matcher.stats()
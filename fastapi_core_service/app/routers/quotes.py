@@ -0,0 +1,55 @@
+"""
+Price quote API routes.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.database import get_db, with_db_session
+from app.dependencies.auth import get_customer_user
+from app.models.models import User
+from app.schemas.schemas import QuoteBatchRequest, QuoteBatchResponse
+from app.services.quote_engine import QUOTE_BATCH_MAX_ITEMS, quote_engine
+from app.utils.money import to_decimal, to_money
+
+router = APIRouter(prefix="/api/quotes", tags=["Quotes"])
+
+
+@router.post("/batch", response_model=QuoteBatchResponse)
+@with_db_session
+def batch_quotes(
+    request: QuoteBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_customer_user)
+):
+    """
+    Total with best offer and fees for many (restaurant, subtotal) pairs,
+    for the current customer. Same amounts as checkout would charge.
+
+    Reads the primary, not the replica: a quote may reload the process-wide
+    pricing index, which checkout uses too, and a lagging replica would load
+    offers and fees from before the change that bumped it.
+    """
+    if len(request.items) > QUOTE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {QUOTE_BATCH_MAX_ITEMS} items per batch"
+        )
+    
+    restaurant_ids = [item.restaurant_id for item in request.items]
+    subtotals = [to_money(item.subtotal) for item in request.items]
+    quotes = quote_engine.quote(db, restaurant_ids, subtotals, [current_user.id] * len(subtotals))
+    
+    return {"quotes": [
+        {
+            "restaurant_id": restaurant_id,
+            "subtotal": to_decimal(subtotal),
+            "offer_id": offer_id if offer_id >= 0 else None,
+            "discount_amount": to_decimal(discount),
+            "delivery_fee": to_decimal(delivery_fee),
+            "platform_fee": to_decimal(platform_fee),
+            "total_amount": to_decimal(total),
+        }
+        for restaurant_id, subtotal, offer_id, discount, delivery_fee, platform_fee, total in zip(
+            restaurant_ids, subtotals, quotes.offer_id.tolist(), quotes.discount.tolist(),
+            quotes.delivery_fee.tolist(), quotes.platform_fee.tolist(), quotes.total.tolist()
+        )
+    ]}
@@ -1,18 +1,20 @@
 """
 Restaurant Owner API routes.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_db, with_db_session
 from app.dependencies.auth import get_restaurant_owner_user
 from app.models.models import User, Restaurant, Dish, Order
 from app.schemas.schemas import (
     DishCreate, DishUpdate, DishResponse, OrderResponse,
     OrderStatusUpdate, RestaurantToggleOrdering
 )
-from app.services import delivery_service
-from app.utils.notifications import notify_order_status_change
+from app.services import order_service, order_state
+from app.services.menu_service import invalidate_menu
+from app.services.restaurant_service import invalidate_restaurant_list
+from app.utils.pagination import PageParams
 
 router = APIRouter(prefix="/api/restaurant", tags=["Restaurant Owner"])
 
@@ -29,6 +31,7 @@ def get_owner_restaurant(db: Session, owner_id: int) -> Restaurant:
 
 
 @router.post("/dishes", response_model=DishResponse, status_code=status.HTTP_201_CREATED)
+@with_db_session
 def create_dish(
     dish_data: DishCreate,
     db: Session = Depends(get_db),
@@ -54,12 +57,14 @@ def create_dish(
     
     db.add(dish)
     db.commit()
+    invalidate_menu(restaurant.id)
     db.refresh(dish)
     
     return dish
 
 
 @router.get("/dishes", response_model=List[DishResponse])
+@with_db_session
 def list_dishes(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_restaurant_owner_user)
@@ -72,6 +77,7 @@ def list_dishes(
 
 
 @router.put("/dishes/{dish_id}", response_model=DishResponse)
+@with_db_session
 def update_dish(
     dish_id: int,
     dish_data: DishUpdate,
@@ -98,12 +104,14 @@ def update_dish(
         setattr(dish, field, value)
     
     db.commit()
+    invalidate_menu(restaurant.id)
     db.refresh(dish)
     
     return dish
 
 
 @router.delete("/dishes/{dish_id}", status_code=status.HTTP_204_NO_CONTENT)
+@with_db_session
 def delete_dish(
     dish_id: int,
     db: Session = Depends(get_db),
@@ -125,26 +133,27 @@ def delete_dish(
     
     db.delete(dish)
     db.commit()
+    invalidate_menu(restaurant.id)
     
     return None
 
 
 @router.get("/orders", response_model=List[OrderResponse])
+@with_db_session
 def list_restaurant_orders(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_restaurant_owner_user)
 ):
-    """List all orders for owner's restaurant."""
+    """List orders for owner's restaurant, newest first, one page at a time."""
     restaurant = get_owner_restaurant(db, current_user.id)
     
-    orders = db.query(Order).filter(
-        Order.restaurant_id == restaurant.id
-    ).order_by(Order.created_at.desc()).all()
-    
-    return orders
+    return order_service.order_page(db, page, response, Order.restaurant_id == restaurant.id)
 
 
 @router.put("/orders/{order_id}/status", response_model=OrderResponse)
+@with_db_session
 def update_order_status(
     order_id: int,
     status_update: OrderStatusUpdate,
@@ -156,42 +165,18 @@ def update_order_status(
     """
     restaurant = get_owner_restaurant(db, current_user.id)
     
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.restaurant_id == restaurant.id
-    ).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    # Restaurant owner can only move from placed to preparing
-    if order.status != "placed":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order can only be moved to preparing from placed status"
-        )
-    
-    if status_update.status.value != "preparing":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Restaurant owner can only move order to preparing status"
-        )
-    
-    old_status = order.status
-    order.status = status_update.status.value
+    order = order_state.transition(
+        db, order_id, order_state.RESTAURANT_OWNER, status_update.status.value,
+        scope=[Order.restaurant_id == restaurant.id]
+    )
+    response = OrderResponse.model_validate(order)
     db.commit()
-    db.refresh(order)
-    
-    # Send notifications
-    notify_order_status_change(db, order, old_status)
     
-    return order
+    return response
 
 
 @router.put("/toggle-ordering")
+@with_db_session
 def toggle_ordering(
     toggle_data: RestaurantToggleOrdering,
     db: Session = Depends(get_db),
@@ -201,7 +186,10 @@ def toggle_ordering(
     restaurant = get_owner_restaurant(db, current_user.id)
     
     restaurant.is_ordering_enabled = toggle_data.is_ordering_enabled
+    pin_code = restaurant.pin_code
     db.commit()
+    invalidate_menu(restaurant.id)
+    invalidate_restaurant_list(pin_code)
     
     return {
         "message": f"Ordering {'enabled' if toggle_data.is_ordering_enabled else 'disabled'} successfully",
@@ -0,0 +1,45 @@
+"""
+Real-time order status stream (Server-Sent Events).
+"""
+import asyncio
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.dependencies.auth import CurrentUser, get_stream_user
+from app.services.order_stream import ORDER_STREAM_KEEPALIVE_SECONDS, format_sse, order_stream_hub
+
+router = APIRouter(prefix="/api/stream", tags=["Stream"])
+
+
+@router.get("/orders")
+async def stream_orders(
+    request: Request,
+    current_user: CurrentUser = Depends(get_stream_user)
+):
+    """
+    Stream status changes of the current user's orders as `order_status` events
+    (`{"order_id": ..., "status": ...}`), for customers, restaurant owners and
+    delivery partners alike. Replaces polling the order endpoints.
+    """
+    user_id = current_user.id
+    queue = order_stream_hub.subscribe(user_id)
+
+    async def events():
+        try:
+            # Ask EventSource to reconnect after 5s if the connection drops
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=ORDER_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    event = None
+                yield format_sse(event)
+        finally:
+            order_stream_hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
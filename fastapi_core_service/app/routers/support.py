@@ -1,36 +1,41 @@
 """
 Customer Care/Support API routes.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, with_db_session
 from app.dependencies.auth import get_customer_care_user
 from app.models.models import User, Complaint
 from app.schemas.schemas import ComplaintResponse, ComplaintResolve
 from app.utils.notifications import notify_complaint_resolved
+from app.utils.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/api/support", tags=["Customer Care"])
 
 
 @router.get("/complaints", response_model=List[ComplaintResponse])
+@with_db_session
 def list_all_complaints(
+    response: Response,
     status_filter: str = "open",
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_customer_care_user)
 ):
-    """List all complaints (filterable by status)."""
+    """List complaints (filterable by status), newest first, one page at a time."""
     query = db.query(Complaint)
     
     if status_filter and status_filter in ["open", "resolved"]:
         query = query.filter(Complaint.status == status_filter)
     
-    complaints = query.order_by(Complaint.created_at.desc()).all()
+    complaints = paginate(query, Complaint, page, response)
     return complaints
 
 
 @router.put("/complaints/{complaint_id}/resolve", response_model=ComplaintResponse)
+@with_db_session
 def resolve_complaint(
     complaint_id: int,
     resolve_data: ComplaintResolve,
@@ -60,6 +65,6 @@ def resolve_complaint(
     db.refresh(complaint)
     
     # Send notification to customer
-    notify_complaint_resolved(db, complaint.id, complaint.customer_id, complaint.order_id)
+    notify_complaint_resolved(complaint.id, complaint.customer_id, complaint.order_id)
     
     return complaint
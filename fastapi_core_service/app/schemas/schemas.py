@@ -250,3 +250,27 @@ class DeliveryPartnerResponse(BaseModel):
 # Restaurant Toggle schemas
 class RestaurantToggleOrdering(BaseModel):
     is_ordering_enabled: bool
+
+
+# Quote schemas
+class QuoteRequestItem(BaseModel):
+    restaurant_id: int
+    subtotal: Decimal = Field(..., ge=0, max_digits=12, decimal_places=2)
+
+
+class QuoteBatchRequest(BaseModel):
+    items: List[QuoteRequestItem]
+
+
+class QuoteResponse(BaseModel):
+    restaurant_id: int
+    subtotal: Decimal
+    offer_id: Optional[int] = None
+    discount_amount: Decimal
+    delivery_fee: Decimal
+    platform_fee: Decimal
+    total_amount: Decimal
+
+
+class QuoteBatchResponse(BaseModel):
+    quotes: List[QuoteResponse]
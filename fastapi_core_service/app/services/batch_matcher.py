@@ -0,0 +1,280 @@
+"""
+Batch order-to-partner matching for peak windows.
+
+Instead of handing each order the first free partner in its own pin code,
+the matcher collects unassigned `preparing` orders every
+BATCH_MATCHER_WINDOW_SECONDS and solves one assignment problem across them
+and all available partners, so orders in a busy pin code can go to idle
+partners a zone or two away.
+
+Cost of giving order i to partner j (seconds):
+
+    ZONE_HOP_SECONDS * zone_distance(order pin, partner pin)
+    - order wait time                 (older orders win scarce partners)
+    - IDLE_WEIGHT * partner idle rank (longest idle partners go first)
+
+Zone distances come from the pin code adjacency index, and pairs further
+apart than MAX_ZONE_DISTANCE are not allowed. The matrix is solved with the
+Hungarian algorithm (shortest augmenting paths, O(n^2 m) with NumPy row
+operations). Each chosen pair is then claimed with the same
+conditional UPDATEs as single assignment, so it never races with pickups,
+and an order_assigned event (partner notification, live order stream) is
+recorded in the same transaction.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.database import SessionLocal
+from app.models.models import DeliveryPartner, Order, Restaurant
+from app.services import delivery_service
+from app.services.order_events import record_assignment
+from app.services.partner_dispatcher import partner_dispatcher, track
+from app.services.zone_index import zone_index
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BATCH_MATCHER_ENABLED = os.getenv('BATCH_MATCHER_ENABLED', 'False').lower() == 'true'
+BATCH_MATCHER_WINDOW_SECONDS = float(os.getenv('BATCH_MATCHER_WINDOW_SECONDS', '2'))
+BATCH_MATCHER_MAX_ORDERS = int(os.getenv('BATCH_MATCHER_MAX_ORDERS', '200'))
+MATCH_ZONE_HOP_SECONDS = float(os.getenv('MATCH_ZONE_HOP_SECONDS', '300'))
+MATCH_MAX_ZONE_DISTANCE = int(os.getenv('MATCH_MAX_ZONE_DISTANCE', '2'))
+MATCH_IDLE_WEIGHT = float(os.getenv('MATCH_IDLE_WEIGHT', '1'))
+
+# Cost of a pair that must not be matched; dwarfs every allowed cost
+FORBIDDEN = 1e12
+
+ZoneDistance = Callable[[str, str], Optional[int]]
+
+
+def zone_distance(a: str, b: str) -> Optional[int]:
+    """Zones between two pin codes from the adjacency index, or None if out of reach."""
+    hops = zone_index.hops(a, b)
+    return hops if hops is not None and hops <= MATCH_MAX_ZONE_DISTANCE else None
+
+
+def build_cost_matrix(
+    order_pins: Sequence[str],
+    order_waits: Sequence[float],
+    partner_pins: Sequence[str],
+    partner_idle: Sequence[float],
+    distance: ZoneDistance = zone_distance,
+    hop_seconds: float = MATCH_ZONE_HOP_SECONDS,
+    idle_weight: float = MATCH_IDLE_WEIGHT
+) -> np.ndarray:
+    """Orders x partners cost matrix; FORBIDDEN marks pairs out of reach."""
+    # Distances per distinct pin pair, then broadcast to every order/partner
+    order_zones, order_index = np.unique(np.asarray(order_pins, dtype=object).astype(str), return_inverse=True)
+    partner_zones, partner_index = np.unique(np.asarray(partner_pins, dtype=object).astype(str), return_inverse=True)
+    zone_cost = np.full((len(order_zones), len(partner_zones)), FORBIDDEN)
+    for i, a in enumerate(order_zones):
+        for j, b in enumerate(partner_zones):
+            hops = distance(a, b)
+            if hops is not None:
+                zone_cost[i, j] = hops * hop_seconds
+
+    cost = zone_cost[np.ix_(order_index.ravel(), partner_index.ravel())]
+    allowed = cost < FORBIDDEN
+    cost -= np.asarray(order_waits, dtype=float)[:, None]
+    cost -= idle_weight * np.asarray(partner_idle, dtype=float)[None, :]
+    cost[~allowed] = FORBIDDEN
+    return cost
+
+
+def solve_assignment(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Minimum-cost assignment of rows to columns (Hungarian algorithm).
+    Every row of the smaller side is matched; returns (row, column) pairs.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return []
+
+    # 1-based potentials and matching, column 0 is the virtual start
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        row_of[0] = i
+        j0 = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            free = ~used[1:]
+            slack = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = j0
+            candidates = np.where(free, min_slack[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            used_columns = np.flatnonzero(used)
+            u[row_of[used_columns]] += delta
+            v[used_columns] -= delta
+            min_slack[1:][free] -= delta
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+
+    pairs = [(int(row_of[j]) - 1, j - 1) for j in range(1, m + 1) if row_of[j]]
+    return [(c, r) for r, c in pairs] if transposed else pairs
+
+
+def match_batch(
+    order_pins: Sequence[str],
+    order_waits: Sequence[float],
+    partner_pins: Sequence[str],
+    partner_idle: Sequence[float],
+    distance: ZoneDistance = zone_distance,
+    hop_seconds: float = MATCH_ZONE_HOP_SECONDS,
+    idle_weight: float = MATCH_IDLE_WEIGHT
+) -> List[Tuple[int, int]]:
+    """Return (order index, partner index) pairs of the best allowed matching."""
+    if not len(order_pins) or not len(partner_pins):
+        return []
+    cost = build_cost_matrix(order_pins, order_waits, partner_pins, partner_idle, distance, hop_seconds, idle_weight)
+    return [(i, j) for i, j in solve_assignment(cost) if cost[i, j] < FORBIDDEN]
+
+
+class BatchMatcher:
+    """Matches unassigned preparing orders to available partners every window."""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        window_seconds: float = BATCH_MATCHER_WINDOW_SECONDS,
+        max_orders: int = BATCH_MATCHER_MAX_ORDERS,
+        distance: ZoneDistance = zone_distance
+    ):
+        self.session_factory = session_factory
+        self.window_seconds = window_seconds
+        self.max_orders = max_orders
+        self.distance = distance
+        self.batches = 0
+        self.matched = 0
+        self.conflicts = 0
+        self.last_batch_ms = 0.0
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="batch-matcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.window_seconds):
+            try:
+                self.match_once()
+            except Exception:
+                logger.exception("Batch matching failed")
+
+    def _available_partners(self, db) -> Tuple[List[int], List[str], List[float]]:
+        """Available partners with an idle rank (higher = idle longer)."""
+        if partner_dispatcher.enabled and not partner_dispatcher.needs_reload():
+            queues = partner_dispatcher.snapshot()
+        else:
+            queues: Dict[str, List[int]] = {}
+            for user_id, pin_code in db.query(DeliveryPartner.user_id, DeliveryPartner.pin_code).filter(
+                DeliveryPartner.available == True
+            ).order_by(DeliveryPartner.id):
+                queues.setdefault(pin_code, []).append(user_id)
+        user_ids, pins, idle = [], [], []
+        for pin_code, queue in queues.items():
+            for rank, user_id in enumerate(queue):
+                user_ids.append(user_id)
+                pins.append(pin_code)
+                idle.append(len(queue) - rank)
+        return user_ids, pins, idle
+
+    def match_once(self) -> int:
+        """Match one batch. Returns the number of orders assigned."""
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            orders = db.query(
+                Order.id, Order.created_at, Restaurant.pin_code, Order.customer_id, Restaurant.owner_id
+            ).join(
+                Restaurant, Order.restaurant_id == Restaurant.id
+            ).filter(
+                Order.status == "preparing",
+                Order.delivery_partner_id.is_(None)
+            ).order_by(Order.created_at).limit(self.max_orders).all()
+            if not orders:
+                return 0
+            user_ids, partner_pins, partner_idle = self._available_partners(db)
+            db.rollback()
+
+            now = datetime.utcnow()
+            pairs = match_batch(
+                [order.pin_code for order in orders],
+                [(now - order.created_at).total_seconds() for order in orders],
+                partner_pins, partner_idle, self.distance
+            )
+
+            matched = 0
+            for i, j in pairs:
+                order, user_id = orders[i], user_ids[j]
+                if not delivery_service.claim_delivery_partner(db, user_id):
+                    # Booked since the snapshot (by another worker process when
+                    # it came from memory): drop the stale entry so the next
+                    # window does not pick the same partner again
+                    db.rollback()
+                    if partner_dispatcher.enabled:
+                        partner_dispatcher.set_available(user_id, partner_pins[j], False)
+                    self.conflicts += 1
+                elif delivery_service.claim_order(db, order.id, user_id):
+                    track(db, user_id, False, partner_pins[j])
+                    record_assignment(db, order.id, order.customer_id, order.owner_id, user_id)
+                    db.commit()
+                    matched += 1
+                else:
+                    # Order picked up since the snapshot; the partner stays available
+                    db.rollback()
+                    self.conflicts += 1
+            self.batches += 1
+            self.matched += matched
+            return matched
+        finally:
+            db.close()
+            self.last_batch_ms = (time.perf_counter() - start) * 1000
+
+    def stats(self) -> Dict:
+        """Matcher counters for this worker process."""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "window_seconds": self.window_seconds,
+            "batches": self.batches,
+            "matched": self.matched,
+            "conflicts": self.conflicts,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+        }
+
+
+batch_matcher = BatchMatcher()
@@ -1,54 +1,87 @@
 """
 Cart service for managing shopping cart.
-Cart is stored in-memory per session (can be moved to Redis/database in production).
+Carts live in the configured CartStore (memory, SQLite file or Redis), see cart_store.
 """
-from typing import Dict, List, Optional
-from decimal import Decimal
-from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session, undefer
 from app.models.models import Dish, Restaurant
 from app.schemas.schemas import CartItemResponse, CartResponse
+from app.services.cart_store import CartStore, create_cart_store
+from app.utils.money import ZERO, to_decimal
 from fastapi import HTTPException, status
 
-# In-memory cart storage: {user_id: {restaurant_id: int, items: {dish_id: quantity}}}
-cart_storage: Dict[int, Dict] = {}
+# Cart storage: {user_id: {restaurant_id: int, items: {dish_id: quantity}}}
+cart_store: CartStore = create_cart_store()
+
+# Per-session cache keys in Session.info (a session lives for one request)
+DISH_CACHE_KEY = "cart_dishes"
+RESTAURANT_CACHE_KEY = "cart_restaurants"
+
+
+def get_dishes(db: Session, dish_ids: Iterable[int]) -> Dict[int, Optional[Dish]]:
+    """
+    Load dishes by id with a single IN (...) query, with price_paise for pricing.
+    Results (including missing ids, as None) are cached on the session so
+    later service calls in the same request reuse them.
+    """
+    dish_ids = list(dish_ids)
+    cache = db.info.setdefault(DISH_CACHE_KEY, {})
+    missing = [dish_id for dish_id in dish_ids if dish_id not in cache]
+    if missing:
+        found = {
+            dish.id: dish
+            for dish in db.query(Dish).options(undefer(Dish.price_paise)).filter(Dish.id.in_(missing)).all()
+        }
+        for dish_id in missing:
+            cache[dish_id] = found.get(dish_id)
+    return {dish_id: cache[dish_id] for dish_id in dish_ids}
+
+
+def get_restaurant(db: Session, restaurant_id: int) -> Optional[Restaurant]:
+    """Load a restaurant by id, cached on the session like get_dishes."""
+    cache = db.info.setdefault(RESTAURANT_CACHE_KEY, {})
+    if restaurant_id not in cache:
+        cache[restaurant_id] = db.get(Restaurant, restaurant_id)
+    return cache[restaurant_id]
 
 
 def get_cart(user_id: int, db: Session) -> CartResponse:
     """Get user's cart."""
-    if user_id not in cart_storage or not cart_storage[user_id].get("items"):
+    cart = cart_store.get(user_id)
+    if not cart or not cart.get("items"):
         return CartResponse(
             restaurant_id=None,
             restaurant_name=None,
             items=[],
-            subtotal=Decimal("0.00"),
+            subtotal=to_decimal(ZERO),
             item_count=0
         )
     
-    cart = cart_storage[user_id]
     restaurant_id = cart.get("restaurant_id")
     items_dict = cart.get("items", {})
     
     # Get restaurant name
     restaurant_name = None
     if restaurant_id:
-        restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+        restaurant = get_restaurant(db, restaurant_id)
         if restaurant:
             restaurant_name = restaurant.name
     
-    # Build cart items with dish details
+    # Build cart items with dish details (amounts in paise, Decimal in the response)
     items = []
-    subtotal = Decimal("0.00")
+    subtotal = ZERO
     
+    dishes = get_dishes(db, items_dict.keys())
     for dish_id, quantity in items_dict.items():
-        dish = db.query(Dish).filter(Dish.id == dish_id).first()
+        dish = dishes[dish_id]
         if dish:
-            item_subtotal = dish.price * quantity
+            item_subtotal = dish.price_paise * quantity
             items.append(CartItemResponse(
                 dish_id=dish.id,
                 dish_name=dish.name,
                 price=dish.price,
                 quantity=quantity,
-                subtotal=item_subtotal
+                subtotal=to_decimal(item_subtotal)
             ))
             subtotal += item_subtotal
     
@@ -56,7 +89,7 @@ def get_cart(user_id: int, db: Session) -> CartResponse:
         restaurant_id=restaurant_id,
         restaurant_name=restaurant_name,
         items=items,
-        subtotal=subtotal,
+        subtotal=to_decimal(subtotal),
         item_count=sum(items_dict.values())
     )
 
@@ -67,7 +100,7 @@ def add_to_cart(user_id: int, dish_id: int, quantity: int, db: Session) -> CartR
     Validates multi-restaurant restriction.
     """
     # Get dish
-    dish = db.query(Dish).filter(Dish.id == dish_id).first()
+    dish = get_dishes(db, [dish_id])[dish_id]
     if not dish:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,69 +114,73 @@ def add_to_cart(user_id: int, dish_id: int, quantity: int, db: Session) -> CartR
         )
     
     # Check restaurant is active and ordering enabled
-    restaurant = db.query(Restaurant).filter(Restaurant.id == dish.restaurant_id).first()
+    restaurant = get_restaurant(db, dish.restaurant_id)
     if not restaurant or restaurant.status != "active" or not restaurant.is_ordering_enabled:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Restaurant is not accepting orders"
         )
     
-    # Initialize cart if not exists
-    if user_id not in cart_storage:
-        cart_storage[user_id] = {"restaurant_id": dish.restaurant_id, "items": {}}
-    
-    cart = cart_storage[user_id]
-    
-    # Multi-restaurant restriction check
-    if cart.get("restaurant_id") and cart["restaurant_id"] != dish.restaurant_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cart contains items from different restaurant. Please clear cart or remove items from restaurant {cart['restaurant_id']} first."
-        )
-    
-    # Set restaurant_id if cart was empty
-    if not cart.get("restaurant_id"):
-        cart["restaurant_id"] = dish.restaurant_id
-    
-    # Add or update item
-    if dish_id in cart["items"]:
-        cart["items"][dish_id] += quantity
-    else:
-        cart["items"][dish_id] = quantity
+    def add_item(cart: Optional[Dict]) -> Dict:
+        # Initialize cart if not exists
+        if cart is None:
+            cart = {"restaurant_id": dish.restaurant_id, "items": {}}
+        
+        # Multi-restaurant restriction check
+        if cart.get("restaurant_id") and cart["restaurant_id"] != dish.restaurant_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cart contains items from different restaurant. Please clear cart or remove items from restaurant {cart['restaurant_id']} first."
+            )
+        
+        # Set restaurant_id if cart was empty
+        if not cart.get("restaurant_id"):
+            cart["restaurant_id"] = dish.restaurant_id
+        
+        # Add or update item
+        if dish_id in cart["items"]:
+            cart["items"][dish_id] += quantity
+        else:
+            cart["items"][dish_id] = quantity
+        return cart
+    
+    # Read-modify-write in one atomic step, so concurrent requests don't lose items
+    cart_store.update(user_id, add_item)
     
     return get_cart(user_id, db)
 
 
 def remove_from_cart(user_id: int, dish_id: int, db: Session) -> CartResponse:
     """Remove item from cart."""
-    if user_id not in cart_storage:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cart is empty"
-        )
-    
-    cart = cart_storage[user_id]
-    
-    if dish_id not in cart.get("items", {}):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Item not in cart"
-        )
-    
-    # Remove item
-    del cart["items"][dish_id]
+    def remove_item(cart: Optional[Dict]) -> Dict:
+        if cart is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cart is empty"
+            )
+        
+        if dish_id not in cart.get("items", {}):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Item not in cart"
+            )
+        
+        # Remove item
+        del cart["items"][dish_id]
+        
+        # Clear restaurant_id if cart is empty
+        if not cart["items"]:
+            cart["restaurant_id"] = None
+        return cart
     
-    # Clear restaurant_id if cart is empty
-    if not cart["items"]:
-        cart["restaurant_id"] = None
+    cart_store.update(user_id, remove_item)
     
     return get_cart(user_id, db)
 
 
 def clear_cart(user_id: int) -> None:
     """Clear user's cart."""
-    if user_id in cart_storage:
-        cart_storage[user_id] = {"restaurant_id": None, "items": {}}
+    cart_store.delete(user_id)
 
 
 def validate_cart_for_checkout(user_id: int, db: Session) -> Dict:
@@ -151,13 +188,13 @@ def validate_cart_for_checkout(user_id: int, db: Session) -> Dict:
     Validate cart before checkout.
     Returns cart data if valid.
     """
-    if user_id not in cart_storage or not cart_storage[user_id].get("items"):
+    cart = cart_store.get(user_id)
+    if not cart or not cart.get("items"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cart is empty"
         )
     
-    cart = cart_storage[user_id]
     restaurant_id = cart.get("restaurant_id")
     
     if not restaurant_id:
@@ -167,7 +204,7 @@ def validate_cart_for_checkout(user_id: int, db: Session) -> Dict:
         )
     
     # Check restaurant status
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = get_restaurant(db, restaurant_id)
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -187,8 +224,8 @@ def validate_cart_for_checkout(user_id: int, db: Session) -> Dict:
         )
     
     # Validate all dishes are still available
-    for dish_id in cart["items"].keys():
-        dish = db.query(Dish).filter(Dish.id == dish_id).first()
+    dishes = get_dishes(db, cart["items"].keys())
+    for dish_id, dish in dishes.items():
         if not dish or not dish.available:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,275 @@
+"""
+Cart storage backends.
+
+CART_STORE selects the backend:
+
+- memory: per-process dict (single worker only).
+- sqlite: SQLite file shared by all workers on a host (CART_SQLITE_PATH,
+  by default in /dev/shm to keep it in shared memory).
+- redis: any Redis-protocol server, shared across hosts.
+
+Every backend expires carts CART_TTL_SECONDS after their last write. The
+memory and sqlite backends cap the number of stored carts at CART_MAX_ENTRIES
+(least recently written first); with redis the cap is the server's maxmemory
+and eviction policy.
+
+Cart changes go through update(), which applies a read-modify-write to one
+cart atomically across all workers sharing the store, so concurrent requests
+of the same user (on different workers) cannot lose each other's changes.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+from app.utils.cache import TTLCache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CART_STORE = os.getenv('CART_STORE', 'memory').lower()
+CART_TTL_SECONDS = float(os.getenv('CART_TTL_SECONDS', '86400'))
+CART_MAX_ENTRIES = int(os.getenv('CART_MAX_ENTRIES', '100000'))
+CART_SQLITE_PATH = os.getenv('CART_SQLITE_PATH', '/dev/shm/food_delivery_carts.db')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+
+def dump_cart(cart: Dict) -> str:
+    """Serialize a cart to JSON."""
+    return json.dumps({
+        "restaurant_id": cart.get("restaurant_id"),
+        "items": {str(dish_id): quantity for dish_id, quantity in cart.get("items", {}).items()}
+    })
+
+
+# update(): receives the current cart (None if missing) and returns the new one
+CartUpdate = Callable[[Optional[Dict]], Dict]
+
+
+def load_cart(data) -> Dict:
+    """Deserialize a cart from JSON (dish ids back to int)."""
+    cart = json.loads(data)
+    return {
+        "restaurant_id": cart.get("restaurant_id"),
+        "items": {int(dish_id): quantity for dish_id, quantity in cart.get("items", {}).items()}
+    }
+
+
+class CartStore(ABC):
+    """
+    Cart persistence interface.
+    Carts are dicts: {"restaurant_id": int | None, "items": {dish_id: quantity}}.
+    get() returns a copy; changes are only persisted by set() or update().
+    """
+
+    @abstractmethod
+    def get(self, user_id: int) -> Optional[Dict]:
+        """Return the user's cart, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, user_id: int, cart: Dict) -> None:
+        """Store the user's cart and restart its TTL."""
+
+    @abstractmethod
+    def update(self, user_id: int, change: CartUpdate) -> Dict:
+        """
+        Atomically replace the user's cart with change(current cart) and
+        restart its TTL; returns the new cart. If change raises, the cart is
+        left as it was. change may run more than once (optimistic backends),
+        so it must not have side effects.
+        """
+
+    @abstractmethod
+    def delete(self, user_id: int) -> None:
+        """Remove the user's cart."""
+
+    def stats(self) -> Dict:
+        """Backend counters for the metrics endpoint."""
+        return {"backend": type(self).__name__}
+
+
+class InMemoryCartStore(CartStore):
+    """Process-local store. Carts are not shared between workers."""
+
+    def __init__(self, ttl: float = CART_TTL_SECONDS, max_entries: int = CART_MAX_ENTRIES):
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._update_lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        cart = self._cache.get(user_id)
+        if cart is None:
+            return None
+        return {"restaurant_id": cart["restaurant_id"], "items": dict(cart["items"])}
+
+    def set(self, user_id: int, cart: Dict) -> None:
+        self._cache.set(user_id, {
+            "restaurant_id": cart.get("restaurant_id"),
+            "items": dict(cart.get("items", {}))
+        })
+
+    def update(self, user_id: int, change: CartUpdate) -> Dict:
+        with self._update_lock:
+            cart = change(self.get(user_id))
+            self.set(user_id, cart)
+        return cart
+
+    def delete(self, user_id: int) -> None:
+        self._cache.pop(user_id)
+
+    def stats(self) -> Dict:
+        return {"backend": type(self).__name__, **self._cache.stats()}
+
+
+class SQLiteCartStore(CartStore):
+    """SQLite file store shared by every worker process on the host."""
+
+    # Expired and over-cap rows are pruned once every PRUNE_EVERY writes
+    PRUNE_EVERY = 500
+
+    def __init__(self, path: str = CART_SQLITE_PATH, ttl: float = CART_TTL_SECONDS,
+                 max_entries: int = CART_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS carts ("
+            "user_id INTEGER PRIMARY KEY, data TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_carts_updated_at ON carts (updated_at)")
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        return self._get(self._connection(), user_id)
+
+    def _get(self, connection: sqlite3.Connection, user_id: int) -> Optional[Dict]:
+        row = connection.execute(
+            "SELECT data FROM carts WHERE user_id = ? AND expires_at > ?",
+            (user_id, time.time())
+        ).fetchone()
+        return load_cart(row[0]) if row else None
+
+    def _write(self, connection: sqlite3.Connection, user_id: int, cart: Dict) -> None:
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO carts (user_id, data, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+            (user_id, dump_cart(cart), now + self.ttl, now)
+        )
+
+    def set(self, user_id: int, cart: Dict) -> None:
+        self._write(self._connection(), user_id, cart)
+        self._count_write()
+
+    def update(self, user_id: int, change: CartUpdate) -> Dict:
+        # BEGIN IMMEDIATE takes the database write lock before reading, so
+        # concurrent updates from other workers wait instead of interleaving
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            cart = change(self._get(connection, user_id))
+            self._write(connection, user_id, cart)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        self._count_write()
+        return cart
+
+    def _count_write(self) -> None:
+        with self._writes_lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def delete(self, user_id: int) -> None:
+        self._connection().execute("DELETE FROM carts WHERE user_id = ?", (user_id,))
+
+    def prune(self) -> None:
+        """Delete expired carts and the least recently written carts over the cap."""
+        connection = self._connection()
+        connection.execute("DELETE FROM carts WHERE expires_at <= ?", (time.time(),))
+        connection.execute(
+            "DELETE FROM carts WHERE user_id IN ("
+            "SELECT user_id FROM carts ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def stats(self) -> Dict:
+        count = self._connection().execute("SELECT COUNT(*) FROM carts").fetchone()[0]
+        return {"backend": type(self).__name__, "path": self.path, "size": count, "maxsize": self.max_entries}
+
+
+class RedisCartStore(CartStore):
+    """
+    Redis-protocol store shared across hosts.
+    Expiry uses native key TTLs. The entry cap is enforced by the server's
+    maxmemory with an LRU eviction policy (e.g. allkeys-lru).
+    """
+
+    KEY_PREFIX = "cart:"
+
+    def __init__(self, url: str = REDIS_URL, ttl: float = CART_TTL_SECONDS, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CART_STORE=redis requires the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = int(ttl)
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        data = self.client.get(self._key(user_id))
+        return load_cart(data) if data else None
+
+    def set(self, user_id: int, cart: Dict) -> None:
+        self.client.set(self._key(user_id), dump_cart(cart), ex=self.ttl)
+
+    def update(self, user_id: int, change: CartUpdate) -> Dict:
+        key = self._key(user_id)
+
+        def apply(pipe) -> Dict:
+            # WATCH key / GET / MULTI / SET / EXEC; redis-py retries when
+            # another client wrote the key in between
+            data = pipe.get(key)
+            cart = change(load_cart(data) if data else None)
+            pipe.multi()
+            pipe.set(key, dump_cart(cart), ex=self.ttl)
+            return cart
+
+        return self.client.transaction(apply, key, value_from_callable=True)
+
+    def delete(self, user_id: int) -> None:
+        self.client.delete(self._key(user_id))
+
+
+def create_cart_store(backend: str = CART_STORE) -> CartStore:
+    """Build the configured cart store."""
+    if backend == "memory":
+        return InMemoryCartStore()
+    if backend == "sqlite":
+        return SQLiteCartStore()
+    if backend == "redis":
+        return RedisCartStore()
+    raise ValueError(f"CART_STORE must be 'memory', 'sqlite' or 'redis', got '{backend}'")
@@ -0,0 +1,200 @@
+"""
+Per-customer order counters.
+
+customer_stats holds, per customer, the number of non-cancelled orders,
+their total spend and the time of the last order placed. Checkout and
+cancellation update the row in the same transaction as the order with an
+atomic upsert/increment, so first-time offer eligibility is a primary-key
+lookup instead of a scan of the customer's orders.
+
+Customers who ordered before the table existed have no row until the
+backfill runs or they next place or cancel an order; the row is then created
+from all their orders rather than from that one order, so earlier orders are
+never lost from the counts. Until then is_first_time_customer falls back to
+checking orders.
+
+Checkout and cancellation only take row locks on the customer's stats row:
+existence is checked with a plain (snapshot) read, and a missing row's
+totals are computed with a plain SELECT before an INSERT ... VALUES upsert,
+never with INSERT ... SELECT (which would share-lock every order of the
+customer and deadlock two concurrent checkouts). Once the row exists, each
+write is a single upsert by primary key.
+
+Backfill (idempotent, recomputes every customer from orders):
+    python -m app.services.customer_stats --backfill
+"""
+import argparse
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from sqlalchemy import Select, case, func, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.models import CustomerStats, Order, OrderStatus
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _upsert(db: Session, on_conflict: Callable[[Any], Dict[str, Any]], source: Optional[Select] = None):
+    """
+    INSERT into customer_stats (rows passed at execute time, or from source)
+    that updates the existing customer's row with on_conflict(new values).
+    """
+    dialect = db.get_bind().dialect.name
+    table = CustomerStats.__table__
+    if dialect == "mysql":
+        statement = mysql.insert(table)
+    elif dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(table)
+    else:
+        raise NotImplementedError(f"customer_stats upsert is not supported on {dialect}")
+    if source is not None:
+        statement = statement.from_select(["customer_id", "order_count", "lifetime_spend", "last_order_at"], source)
+    if dialect == "mysql":
+        return statement.on_duplicate_key_update(**on_conflict(statement.inserted))
+    return statement.on_conflict_do_update(index_elements=[table.c.customer_id], set_=on_conflict(statement.excluded))
+
+
+def _order_totals(*criteria) -> Select:
+    """customer_stats rows (customer_id, order_count, lifetime_spend, last_order_at) computed from orders."""
+    active = Order.status != OrderStatus.CANCELLED.value
+    return select(
+        Order.customer_id,
+        func.sum(case((active, 1), else_=0)),
+        func.coalesce(func.sum(case((active, Order.total_amount), else_=0)), 0),
+        func.max(Order.created_at)
+    ).where(*criteria).group_by(Order.customer_id)
+
+
+def _new_row(db: Session, customer_id: int, row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Values to insert for the customer: row itself when their stats row
+    exists (the upsert then only applies its increment), else totals of all
+    their orders read without locks. A concurrent insert of the row wins and
+    this write becomes its increment.
+    """
+    if db.get(CustomerStats, customer_id) is not None:
+        return row
+    totals = db.execute(_order_totals(Order.customer_id == customer_id)).first()
+    if totals is None:
+        return row
+    _, order_count, lifetime_spend, last_order_at = totals
+    return {
+        "customer_id": customer_id,
+        "order_count": order_count,
+        "lifetime_spend": lifetime_spend,
+        "last_order_at": last_order_at,
+    }
+
+
+def record_order_placed(db: Session, customer_id: int, amount: Decimal, placed_at: datetime) -> None:
+    """
+    Count a new order, already flushed, in the caller's transaction. A
+    customer without a row gets one computed from all their orders
+    (including this one); an existing row is incremented.
+    """
+    table = CustomerStats.__table__
+    db.execute(_upsert(db, lambda new: {
+        "order_count": table.c.order_count + 1,
+        "lifetime_spend": table.c.lifetime_spend + amount,
+        "last_order_at": placed_at,
+    }), _new_row(db, customer_id, {
+        "customer_id": customer_id,
+        "order_count": 1,
+        "lifetime_spend": amount,
+        "last_order_at": placed_at,
+    }))
+
+
+def record_order_cancelled(db: Session, customer_id: int, amount: Decimal) -> None:
+    """
+    Uncount an order whose cancellation is already flushed, in the caller's
+    transaction. Like record_order_placed, a missing row is computed from
+    orders (which no longer count this one); an existing row is decremented.
+    """
+    table = CustomerStats.__table__
+    db.execute(_upsert(db, lambda new: {
+        "order_count": table.c.order_count - 1,
+        "lifetime_spend": table.c.lifetime_spend - amount,
+    }), _new_row(db, customer_id, {
+        "customer_id": customer_id,
+        "order_count": 0,
+        "lifetime_spend": 0,
+        "last_order_at": None,
+    }))
+
+
+def is_first_time_customer(db: Session, customer_id: int) -> bool:
+    """True if the customer has no non-cancelled orders."""
+    stats = db.get(CustomerStats, customer_id)
+    if stats is not None:
+        return stats.order_count == 0
+    return not db.query(
+        db.query(Order).filter(
+            Order.customer_id == customer_id,
+            Order.status != OrderStatus.CANCELLED.value
+        ).exists()
+    ).scalar()
+
+
+def first_time_customers(db: Session, customer_ids: Iterable[int]) -> Set[int]:
+    """Which of customer_ids have no non-cancelled orders (is_first_time_customer for many)."""
+    customer_ids = set(customer_ids)
+    if not customer_ids:
+        return set()
+    counts = dict(db.query(CustomerStats.customer_id, CustomerStats.order_count).filter(
+        CustomerStats.customer_id.in_(customer_ids)
+    ).all())
+    first_time = {customer_id for customer_id, order_count in counts.items() if order_count == 0}
+    missing = customer_ids - counts.keys()
+    if missing:
+        ordered = {customer_id for (customer_id,) in db.query(Order.customer_id).filter(
+            Order.customer_id.in_(missing),
+            Order.status != OrderStatus.CANCELLED.value
+        ).distinct()}
+        first_time |= missing - ordered
+    return first_time
+
+
+def backfill(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Recompute every customer's row from orders, overwriting what is there.
+    Each range of batch_size customer ids is one INSERT ... SELECT upsert
+    committed on its own, so the database applies it atomically against
+    concurrent checkouts. Returns the number of customers written.
+    """
+    low, high, customers = db.query(
+        func.min(Order.customer_id), func.max(Order.customer_id), func.count(Order.customer_id.distinct())
+    ).one()
+    if low is None:
+        return 0
+
+    for start in range(low, high + 1, batch_size):
+        totals = _order_totals(Order.customer_id >= start, Order.customer_id < start + batch_size)
+        db.execute(_upsert(db, lambda new: {
+            "order_count": new.order_count,
+            "lifetime_spend": new.lifetime_spend,
+            "last_order_at": new.last_order_at,
+        }, totals))
+        db.commit()
+    return customers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backfill", action="store_true", help="Recompute all rows from orders")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.error("nothing to do (use --backfill)")
+
+    db = SessionLocal()
+    try:
+        print(f"Backfilled {backfill(db, args.batch_size)} customers")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,174 @@
 """
 Delivery partner assignment service.
 """
+import os
+import random
+from sqlalchemy import case, select, update
 from sqlalchemy.orm import Session
-from app.models.models import DeliveryPartner, Restaurant
+from app.database import SessionLocal
+from app.models.models import DeliveryPartner, Order, Restaurant
+from app.services.partner_dispatcher import partner_dispatcher, track
+from app.services.zone_index import zone_index
 from typing import Optional
+from dotenv import load_dotenv
 
+load_dotenv()
 
-def assign_delivery_partner(db: Session, restaurant_id: int) -> Optional[int]:
+# Rounds of candidate reads before assign_delivery_partner gives up
+ASSIGN_MAX_ATTEMPTS = int(os.getenv('ASSIGN_MAX_ATTEMPTS', '5'))
+# Candidates read per round; callers racing for the same pin code spread over them
+ASSIGN_CANDIDATES = int(os.getenv('ASSIGN_CANDIDATES', '5'))
+# Pin codes searched for a partner: the restaurant's own, then its nearest neighbours
+ASSIGN_ZONES = int(os.getenv('ASSIGN_ZONES', '3'))
+
+# Orders that keep their delivery partner busy
+ACTIVE_DELIVERY_STATUSES = ("preparing", "out_for_delivery")
+
+
+def claim_delivery_partner(db: Session, user_id: int) -> bool:
+    """
+    Compare-and-swap a partner from available to busy.
+    Returns True only for the caller whose UPDATE flipped the row.
+    """
+    result = db.execute(
+        update(DeliveryPartner)
+        .where(DeliveryPartner.user_id == user_id, DeliveryPartner.available == True)
+        .values(available=False)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def assign_delivery_partner(
+    restaurant_id: int,
+    max_attempts: int = ASSIGN_MAX_ATTEMPTS,
+    session_factory=SessionLocal
+) -> Optional[int]:
     """
     Find and assign an available delivery partner.
-    Matches by pin_code with restaurant.
+    Matches by pin_code with restaurant, falling back to the nearest
+    ASSIGN_ZONES - 1 neighbouring pin codes when it has no free partner.
     Returns delivery partner user_id or None if no partner available.
+    
+    Greedy one-order-at-a-time assignment, not called on the request path:
+    preparing orders are picked up by partners or assigned by the batch
+    matcher. It is the baseline the dispatch benchmarks measure. It commits
+    the claim in a session of its own, because lost races end the transaction
+    to read fresh rows, which must not touch a caller's work.
+    """
+    db = session_factory()
+    try:
+        return _assign_delivery_partner(db, restaurant_id, max_attempts)
+    finally:
+        db.close()
+
+
+def _assign_delivery_partner(db: Session, restaurant_id: int, max_attempts: int) -> Optional[int]:
+    """
+    assign_delivery_partner on a session it owns.
+    
+    The longest idle partner is taken from the in-memory dispatcher and
+    claimed with a conditional UPDATE, so concurrent assignments never book
+    the same partner. When memory runs dry or only holds stale entries, the
+    table is read nearest zone first: a few candidates are shuffled within
+    their zone to spread concurrent callers over different rows, and after
+    max_attempts rounds of lost races it gives up.
     """
     # Get restaurant pin_code
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.get(Restaurant, restaurant_id)
     if not restaurant:
         return None
+    pin_codes = zone_index.nearest(restaurant.pin_code, ASSIGN_ZONES)
+    rank = {pin: i for i, pin in enumerate(pin_codes)}
     
-    # Find available delivery partner in same pin_code
-    delivery_partner = db.query(DeliveryPartner).filter(
-        DeliveryPartner.available == True,
-        DeliveryPartner.pin_code == restaurant.pin_code
-    ).first()
-    
-    if not delivery_partner:
-        return None
+    if partner_dispatcher.enabled:
+        if partner_dispatcher.needs_reload():
+            partner_dispatcher.load(db)
+        attempts = max_attempts
+        for pin_code in pin_codes:
+            while attempts:
+                user_id = partner_dispatcher.take(pin_code)
+                if user_id is None:
+                    break
+                if claim_delivery_partner(db, user_id):
+                    try:
+                        db.commit()
+                    except Exception:
+                        db.rollback()
+                        partner_dispatcher.put_back(user_id, pin_code)
+                        raise
+                    return user_id
+                # Stale entry: booked by another worker process
+                attempts -= 1
     
-    # Mark delivery partner as unavailable
-    delivery_partner.available = False
-    db.commit()
+    for _ in range(max_attempts):
+        # Find available delivery partners in the nearest pin codes
+        candidates = db.query(DeliveryPartner.user_id, DeliveryPartner.pin_code).filter(
+            DeliveryPartner.available == True,
+            DeliveryPartner.pin_code.in_(pin_codes)
+        ).order_by(case(rank, value=DeliveryPartner.pin_code)).limit(ASSIGN_CANDIDATES).all()
+        
+        if not candidates:
+            db.rollback()
+            return None
+        
+        candidates.sort(key=lambda candidate: (rank[candidate.pin_code], random.random()))
+        for i, (user_id, pin_code) in enumerate(candidates):
+            if claim_delivery_partner(db, user_id):
+                track(db, user_id, False, pin_code)
+                db.commit()
+                if partner_dispatcher.enabled:
+                    # Released by another process: let this one hand them out too
+                    for other_id, other_pin in candidates[i + 1:]:
+                        partner_dispatcher.set_available(other_id, other_pin, True)
+                return user_id
+        
+        # Every candidate was taken concurrently: end the transaction to see fresh rows
+        db.rollback()
     
-    return delivery_partner.user_id
+    return None
+
+
+def claim_order(db: Session, order_id: int, user_id: int) -> bool:
+    """
+    Compare-and-swap an unassigned preparing order to a delivery partner.
+    Runs in the caller's transaction. Returns False if another partner got it first.
+    """
+    result = db.execute(
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.status == "preparing",
+            Order.delivery_partner_id.is_(None)
+        )
+        .values(delivery_partner_id=user_id)
+    )
+    return result.rowcount == 1
 
 
-def release_delivery_partner(db: Session, user_id: int) -> None:
+def release_delivery_partner(db: Session, user_id: int) -> bool:
     """
-    Mark delivery partner as available again.
+    Mark delivery partner as available again, unless they still have an
+    active order. A single conditional UPDATE, so it is safe to repeat.
+    Runs in the caller's transaction; the partner rejoins the dispatcher's
+    queue once it commits. Returns True if the partner was released.
     """
-    delivery_partner = db.query(DeliveryPartner).filter(
-        DeliveryPartner.user_id == user_id
-    ).first()
+    active_orders = select(Order.id).where(
+        Order.delivery_partner_id == user_id,
+        Order.status.in_(ACTIVE_DELIVERY_STATUSES)
+    ).exists()
     
-    if delivery_partner:
-        delivery_partner.available = True
-        db.commit()
+    result = db.execute(
+        update(DeliveryPartner)
+        .where(
+            DeliveryPartner.user_id == user_id,
+            DeliveryPartner.available == False,
+            ~active_orders
+        )
+        .values(available=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    track(db, user_id, True)
+    return True
@@ -0,0 +1,46 @@
+"""
+Restaurant menu service: serialized menus cached per restaurant.
+
+Owner dish endpoints bump the restaurant's version after commit; the TTL
+covers changes made outside this process (other workers, Django admin).
+"""
+import os
+from typing import List
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.models.models import Dish, Restaurant
+from app.schemas.schemas import DishResponse
+from app.utils.response_cache import VersionedResponseCache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MENU_CACHE_MAX_BYTES = int(os.getenv('MENU_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+MENU_CACHE_TTL_SECONDS = float(os.getenv('MENU_CACHE_TTL_SECONDS', '60'))
+
+menu_cache = VersionedResponseCache(max_bytes=MENU_CACHE_MAX_BYTES, ttl=MENU_CACHE_TTL_SECONDS)
+
+_menu_adapter = TypeAdapter(List[DishResponse])
+
+
+def load_menu(db: Session, restaurant_id: int) -> bytes:
+    """Available dishes of a restaurant as a JSON response body."""
+    restaurant = db.query(Restaurant.id).filter(Restaurant.id == restaurant_id).first()
+    if not restaurant:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Restaurant not found"
+        )
+
+    dishes = db.query(Dish).filter(
+        Dish.restaurant_id == restaurant_id,
+        Dish.available == True
+    ).all()
+
+    return _menu_adapter.dump_json(_menu_adapter.validate_python(dishes, from_attributes=True))
+
+
+def invalidate_menu(restaurant_id: int) -> None:
+    """Call after committing a change to the restaurant's dishes."""
+    menu_cache.bump(restaurant_id)
@@ -1,9 +1,11 @@
 """
 Offer service for handling offer eligibility and application.
+Order amounts and discounts are Money (paise), see app.utils.money.
 """
 from sqlalchemy.orm import Session
-from app.models.models import Offer, Order, User
-from decimal import Decimal
+from app.services.customer_stats import is_first_time_customer
+from app.services.pricing_index import OfferRule, pricing_index
+from app.utils.money import ZERO, Money, percent_of
 from typing import Optional, Tuple
 
 
@@ -11,28 +13,20 @@ def get_applicable_offers(
     db: Session,
     user_id: int,
     restaurant_id: int,
-    order_amount: Decimal
-) -> list[Offer]:
+    order_amount: Money
+) -> list[OfferRule]:
     """
     Get all applicable offers for a user's order.
+    The first-time customer check only runs when a candidate offer needs it.
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return []
+    # Restaurant-specific and platform-level offers, from the in-memory index
+    offers = pricing_index.offers_for(db, restaurant_id, order_amount)
     
-    # Check if user is first-time customer
-    previous_orders = db.query(Order).filter(
-        Order.customer_id == user_id,
-        Order.status != "cancelled"
-    ).count()
-    is_first_time = previous_orders == 0
+    if not any(offer.first_time_user_only for offer in offers):
+        return offers
     
-    # Query restaurant-specific and platform-level offers
-    offers = db.query(Offer).filter(
-        Offer.active == True,
-        Offer.min_order_value <= order_amount,
-        (Offer.restaurant_id == restaurant_id) | (Offer.restaurant_id == None)
-    ).all()
+    # Check if user is first-time customer (primary-key lookup of their counters)
+    is_first_time = is_first_time_customer(db, user_id)
     
     # Filter offers based on first-time user condition
     applicable_offers = []
@@ -48,8 +42,8 @@ def get_best_offer(
     db: Session,
     user_id: int,
     restaurant_id: int,
-    order_amount: Decimal
-) -> Optional[Offer]:
+    order_amount: Money
+) -> Optional[OfferRule]:
     """
     Get the best applicable offer (highest discount).
     Restaurant-specific offers take precedence over platform-level offers.
@@ -65,46 +59,43 @@ def get_best_offer(
     
     # Restaurant-specific offers take precedence
     if restaurant_offers:
-        return max(restaurant_offers, key=lambda o: o.discount_percentage)
+        return max(restaurant_offers, key=lambda o: o.discount_basis_points)
     
     if platform_offers:
-        return max(platform_offers, key=lambda o: o.discount_percentage)
+        return max(platform_offers, key=lambda o: o.discount_basis_points)
     
     return None
 
 
-def calculate_discount(offer: Optional[Offer], order_amount: Decimal) -> Decimal:
+def calculate_discount(offer: Optional[OfferRule], order_amount: Money) -> Money:
     """
     Calculate discount amount based on offer.
+    Rounded half-even to whole paise, like round(discount, 2) on Decimals.
     """
     if not offer:
-        return Decimal("0.00")
+        return ZERO
     
-    discount = (order_amount * offer.discount_percentage) / Decimal("100")
-    return round(discount, 2)
+    return percent_of(order_amount, offer.discount_basis_points)
 
 
 def apply_offer(
     db: Session,
     user_id: int,
     restaurant_id: int,
-    order_amount: Decimal,
+    order_amount: Money,
     offer_id: Optional[int] = None
-) -> Tuple[Optional[Offer], Decimal]:
+) -> Tuple[Optional[OfferRule], Money]:
     """
     Apply offer to order and return offer and discount amount.
     If offer_id is provided, validate and use it.
     Otherwise, use the best applicable offer.
     """
     if offer_id:
-        offer = db.query(Offer).filter(Offer.id == offer_id).first()
-        if not offer or not offer.active:
-            return None, Decimal("0.00")
-        
-        # Validate offer is applicable
+        # Only active, applicable offers can be chosen
         applicable_offers = get_applicable_offers(db, user_id, restaurant_id, order_amount)
-        if offer not in applicable_offers:
-            return None, Decimal("0.00")
+        offer = next((o for o in applicable_offers if o.id == offer_id), None)
+        if not offer:
+            return None, ZERO
     else:
         offer = get_best_offer(db, user_id, restaurant_id, order_amount)
     
@@ -0,0 +1,340 @@
+"""
+Order events outbox and dispatcher.
+
+Request handlers call record_event() in the same transaction as the order
+change. The dispatcher claims pending events in batches (SELECT ... FOR UPDATE
+SKIP LOCKED, so several workers and processes can share the table) and fans
+them out to a thread pool.
+
+Each event is processed in one transaction: all of its handlers' writes and
+the conditional "done" marker commit together, so an event's database side
+effects happen exactly once even when it is retried. Handlers must only write
+through the session they are given. A failed event is retried with
+exponential backoff up to ORDER_EVENTS_MAX_ATTEMPTS times, then marked failed.
+
+Side effects outside the database (the live order stream) are registered
+with after_commit instead: they run once the done marker has committed, so a
+retried event never repeats them, but a crash right after the commit skips
+them (at most once).
+"""
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import and_, event, or_, update
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.models import Order, OrderEvent
+from app.services import delivery_service
+from app.services.order_stream import publish_order_status
+from app.utils.notifications import (
+    order_assigned_notifications, order_placed_notifications, order_status_notifications, store_notifications
+)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ORDER_EVENTS_WORKERS = int(os.getenv('ORDER_EVENTS_WORKERS', '4'))
+ORDER_EVENTS_BATCH_SIZE = int(os.getenv('ORDER_EVENTS_BATCH_SIZE', '50'))
+ORDER_EVENTS_POLL_SECONDS = float(os.getenv('ORDER_EVENTS_POLL_SECONDS', '1.0'))
+ORDER_EVENTS_LEASE_SECONDS = float(os.getenv('ORDER_EVENTS_LEASE_SECONDS', '60'))
+ORDER_EVENTS_MAX_ATTEMPTS = int(os.getenv('ORDER_EVENTS_MAX_ATTEMPTS', '5'))
+ORDER_EVENTS_MAX_BACKOFF_SECONDS = 300
+
+ORDER_PLACED = "order_placed"
+ORDER_STATUS_CHANGED = "order_status_changed"
+ORDER_ASSIGNED = "order_assigned"
+
+# Session.info flag set by record_event; the commit hook wakes the dispatcher
+_PENDING_KEY = "order_events_pending"
+
+Handler = Callable[[Session, Dict], None]
+HANDLERS: Dict[str, List[Handler]] = {}
+AfterCommitHandler = Callable[[Dict], None]
+AFTER_COMMIT_HANDLERS: Dict[str, List[AfterCommitHandler]] = {}
+
+
+def handles(event_type: str) -> Callable[[Handler], Handler]:
+    """Register a handler for an event type."""
+    def register(fn: Handler) -> Handler:
+        HANDLERS.setdefault(event_type, []).append(fn)
+        return fn
+    return register
+
+
+def after_commit(event_type: str) -> Callable[[AfterCommitHandler], AfterCommitHandler]:
+    """Register a handler run after an event of this type is committed as done."""
+    def register(fn: AfterCommitHandler) -> AfterCommitHandler:
+        AFTER_COMMIT_HANDLERS.setdefault(event_type, []).append(fn)
+        return fn
+    return register
+
+
+def record_event(db: Session, order_id: int, event_type: str, payload: Dict) -> None:
+    """Add an event to the caller's transaction."""
+    db.add(OrderEvent(order_id=order_id, event_type=event_type, payload=payload))
+    db.info[_PENDING_KEY] = True
+
+
+def record_status_change(db: Session, order: Order, restaurant_owner_id: int) -> None:
+    """
+    Record an order_status_changed event for the order's new status.
+    restaurant_owner_id comes from the caller (order_state selects it with
+    the order) so order.restaurant is not loaded just for it.
+    """
+    record_event(db, order.id, ORDER_STATUS_CHANGED, {
+        "order_id": order.id,
+        "customer_id": order.customer_id,
+        "restaurant_owner_id": restaurant_owner_id,
+        "delivery_partner_id": order.delivery_partner_id,
+        "status": order.status
+    })
+
+
+def record_assignment(
+    db: Session,
+    order_id: int,
+    customer_id: int,
+    restaurant_owner_id: int,
+    delivery_partner_id: int
+) -> None:
+    """Record an order_assigned event for a preparing order given a delivery partner."""
+    record_event(db, order_id, ORDER_ASSIGNED, {
+        "order_id": order_id,
+        "customer_id": customer_id,
+        "restaurant_owner_id": restaurant_owner_id,
+        "delivery_partner_id": delivery_partner_id,
+        "status": "preparing"
+    })
+
+
+@handles(ORDER_PLACED)
+def send_order_placed_notifications(db: Session, payload: Dict) -> None:
+    store_notifications(db, order_placed_notifications(
+        payload["order_id"], payload["customer_id"], payload["restaurant_owner_id"], payload["total_amount"]
+    ))
+
+
+@handles(ORDER_STATUS_CHANGED)
+def send_order_status_notifications(db: Session, payload: Dict) -> None:
+    store_notifications(db, order_status_notifications(
+        payload["order_id"], payload["customer_id"], payload.get("delivery_partner_id"), payload["status"]
+    ))
+
+
+@handles(ORDER_ASSIGNED)
+def send_order_assigned_notifications(db: Session, payload: Dict) -> None:
+    store_notifications(db, order_assigned_notifications(payload["order_id"], payload["delivery_partner_id"]))
+
+
+@after_commit(ORDER_PLACED)
+@after_commit(ORDER_STATUS_CHANGED)
+@after_commit(ORDER_ASSIGNED)
+def publish_order_stream(payload: Dict) -> None:
+    publish_order_status(payload["order_id"], payload.get("status", "placed"), [
+        payload["customer_id"], payload.get("restaurant_owner_id"), payload.get("delivery_partner_id")
+    ])
+
+
+@handles(ORDER_STATUS_CHANGED)
+def release_delivery_partner(db: Session, payload: Dict) -> None:
+    if payload["status"] in ("delivered", "cancelled") and payload.get("delivery_partner_id"):
+        delivery_service.release_delivery_partner(db, payload["delivery_partner_id"])
+
+
+class OrderEventDispatcher:
+    """Polls the outbox and runs claimed events on a thread pool."""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        workers: int = ORDER_EVENTS_WORKERS,
+        batch_size: int = ORDER_EVENTS_BATCH_SIZE,
+        poll_interval: float = ORDER_EVENTS_POLL_SECONDS,
+        lease_seconds: float = ORDER_EVENTS_LEASE_SECONDS,
+        max_attempts: int = ORDER_EVENTS_MAX_ATTEMPTS
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = str(uuid.uuid4())
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the polling thread and worker pool if not running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="order-events")
+            self._thread = threading.Thread(target=self._run, name="order-events-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish the current batch, dispatch what is already pending, and stop."""
+        with self._lock:
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout)
+        executor.shutdown(wait=True)
+
+    def wake(self) -> None:
+        """Poll now instead of waiting for the next interval."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                dispatched = self.dispatch_once()
+            except Exception:
+                logger.exception("Order event dispatch failed")
+                dispatched = 0
+            if self._stopping.is_set() and dispatched == 0:
+                break
+            if dispatched < self.batch_size:
+                self._wake.wait(self.poll_interval)
+
+    def dispatch_once(self) -> int:
+        """Claim one batch and process it on the pool. Returns the number of events."""
+        claimed = self._claim()
+        if claimed:
+            executor = self._executor
+            if executor is None:
+                for event_id, event_type, payload in claimed:
+                    self._process(event_id, event_type, payload)
+            else:
+                wait([executor.submit(self._process, *item) for item in claimed])
+        return len(claimed)
+
+    def _claim(self) -> List[tuple]:
+        """Lock a batch of due events (pending, or processing with an expired lease) and lease them."""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            events = db.query(OrderEvent).filter(
+                or_(
+                    and_(OrderEvent.status == "pending", OrderEvent.available_at <= now),
+                    and_(OrderEvent.status == "processing", OrderEvent.locked_until < now)
+                )
+            ).order_by(OrderEvent.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+            claimed = []
+            for order_event in events:
+                order_event.status = "processing"
+                order_event.attempts += 1
+                order_event.claimed_by = self.worker_id
+                order_event.locked_until = now + timedelta(seconds=self.lease_seconds)
+                claimed.append((order_event.id, order_event.event_type, order_event.payload))
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def _still_claimed(self, event_id: int):
+        return and_(
+            OrderEvent.id == event_id,
+            OrderEvent.status == "processing",
+            OrderEvent.claimed_by == self.worker_id
+        )
+
+    def _process(self, event_id: int, event_type: str, payload: Dict) -> None:
+        """Run every handler and mark the event done in one transaction, then the after-commit handlers."""
+        db = self.session_factory()
+        try:
+            for handler in HANDLERS.get(event_type, []):
+                handler(db, payload)
+            done = db.execute(
+                update(OrderEvent)
+                .where(self._still_claimed(event_id))
+                .values(status="done", processed_at=datetime.utcnow(), locked_until=None, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+            if done.rowcount != 1:
+                # Lease expired and another worker took the event over
+                db.rollback()
+                return
+            db.commit()
+            self.processed += 1
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"Order event {event_id} ({event_type}) failed")
+            self._schedule_retry(db, event_id, e)
+            return
+        finally:
+            db.close()
+
+        for handler in AFTER_COMMIT_HANDLERS.get(event_type, []):
+            try:
+                handler(payload)
+            except Exception:
+                # The event is done; not retried for this
+                logger.exception(f"Order event {event_id} ({event_type}) after-commit handler failed")
+
+    def _schedule_retry(self, db: Session, event_id: int, error: Exception) -> None:
+        order_event = db.get(OrderEvent, event_id)
+        if order_event is None or order_event.claimed_by != self.worker_id:
+            return
+        if order_event.attempts >= self.max_attempts:
+            values = {"status": "failed", "locked_until": None}
+            self.failed += 1
+        else:
+            backoff = min(2 ** order_event.attempts, ORDER_EVENTS_MAX_BACKOFF_SECONDS)
+            values = {
+                "status": "pending",
+                "locked_until": None,
+                "available_at": datetime.utcnow() + timedelta(seconds=backoff)
+            }
+            self.retried += 1
+        db.execute(
+            update(OrderEvent)
+            .where(self._still_claimed(event_id))
+            .values(last_error=repr(error)[:2000], **values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def stats(self) -> Dict:
+        """Dispatcher counters for this worker process."""
+        return {
+            "worker_id": self.worker_id,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "workers": self.workers,
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+order_event_dispatcher = OrderEventDispatcher()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    """Dispatch newly committed events right away."""
+    if session.info.pop(_PENDING_KEY, False):
+        order_event_dispatcher.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
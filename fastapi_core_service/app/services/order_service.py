@@ -1,72 +1,120 @@
 """
 Order service for handling order creation and management.
+Pricing runs on Money (paise); amounts become Decimal only on the Order row.
 """
-from sqlalchemy.orm import Session
-from app.models.models import Order, OrderItem, Dish, Fee
-from app.schemas.schemas import OrderCreate, CheckoutRequest
-from app.services import cart_service, offer_service, delivery_service
-from app.utils.notifications import notify_order_placed
-from decimal import Decimal
-from fastapi import HTTPException, status
-from typing import Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.models import Order, OrderItem
+from app.schemas.schemas import OrderCreate, CheckoutRequest, OrderResponse
+from app.services import cart_service, customer_stats, offer_service, delivery_service
+from app.services.order_events import ORDER_PLACED, record_event
+from app.services.pricing_index import DEFAULT_DELIVERY_FEE, DEFAULT_PLATFORM_FEE, pricing_index
+from app.utils.money import ZERO, Money, to_decimal
+from fastapi import HTTPException, Response, status
+from typing import List, Optional
+from app.utils.pagination import PageParams, paginate
 
 
-def get_fees(db: Session, restaurant_id: int) -> tuple[Decimal, Decimal]:
+def get_fees(db: Session, restaurant_id: int) -> tuple[Money, Money]:
     """
     Get delivery and platform fees for restaurant.
     Returns restaurant-specific fees if available, otherwise platform-level fees.
     """
-    # Try restaurant-specific fees first
-    fee = db.query(Fee).filter(Fee.restaurant_id == restaurant_id).first()
-    
-    # Fall back to platform-level fees
-    if not fee:
-        fee = db.query(Fee).filter(Fee.restaurant_id == None).first()
+    fee = pricing_index.fees_for(db, restaurant_id)
     
     if not fee:
         # Default fees if none configured
-        return Decimal("30.00"), Decimal("5.00")
+        return DEFAULT_DELIVERY_FEE, DEFAULT_PLATFORM_FEE
     
     return fee.delivery_fee, fee.platform_fee
 
 
 def calculate_order_total(
-    items_total: Decimal,
-    discount: Decimal,
-    delivery_fee: Decimal,
-    platform_fee: Decimal
-) -> Decimal:
-    """Calculate total order amount."""
-    total = items_total - discount + delivery_fee + platform_fee
-    return round(total, 2)
+    items_total: Money,
+    discount: Money,
+    delivery_fee: Money,
+    platform_fee: Money
+) -> Money:
+    """Calculate total order amount (exact in paise, no rounding needed)."""
+    return items_total - discount + delivery_fee + platform_fee
+
+
+def find_idempotent_order(
+    db: Session,
+    user_id: int,
+    idempotency_key: str,
+    request_fingerprint: str,
+    latest: bool = False
+) -> Optional[OrderResponse]:
+    """
+    The order already placed by this customer's checkout with idempotency_key,
+    or None. 422 if that checkout had a different request body.
+
+    latest=True reads the latest committed row (FOR UPDATE) rather than the
+    transaction's snapshot; use it only once the row is known to exist. A
+    locking read of a missing key takes a gap lock on MySQL, and two
+    duplicate checkouts holding it deadlock on their INSERTs.
+    """
+    query = db.query(Order).options(selectinload(Order.items)).filter(
+        Order.customer_id == user_id,
+        Order.idempotency_key == idempotency_key
+    )
+    if latest:
+        query = query.with_for_update()
+    order = query.first()
+    if order is None:
+        return None
+    if order.request_fingerprint != request_fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    return OrderResponse.model_validate(order)
 
 
 def create_order_from_cart(
     db: Session,
     user_id: int,
-    checkout_request: CheckoutRequest
-) -> Order:
+    checkout_request: CheckoutRequest,
+    idempotency_key: Optional[str] = None,
+    request_fingerprint: Optional[str] = None
+) -> OrderResponse:
     """
     Create order from current cart.
+    Order, items and the order_placed event are written in a single
+    transaction and the response is built from the flushed rows, without
+    reading them back.
+    With idempotency_key, the key is stored on the order under a unique
+    (customer_id, idempotency_key) constraint: a retry, on any worker, gets
+    the order its first attempt placed instead of a second order.
     """
-    # Validate cart
+    if idempotency_key is not None:
+        # Plain read: the transaction's first, so its snapshot is current
+        existing = find_idempotent_order(db, user_id, idempotency_key, request_fingerprint)
+        if existing is not None:
+            return existing
+    
+    # Validate cart (loads restaurant and dishes)
     cart = cart_service.validate_cart_for_checkout(user_id, db)
     restaurant_id = cart["restaurant_id"]
+    restaurant = cart_service.get_restaurant(db, restaurant_id)
+    dishes = cart_service.get_dishes(db, cart["items"].keys())
     
     # Calculate items total
-    items_total = Decimal("0.00")
+    items_total = ZERO
     order_items_data = []
     
     for dish_id, quantity in cart["items"].items():
-        dish = db.query(Dish).filter(Dish.id == dish_id).first()
+        dish = dishes[dish_id]
         if not dish:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Dish {dish_id} not found"
             )
         
-        item_total = dish.price * quantity
-        items_total += item_total
+        items_total += dish.price_paise * quantity
         
         order_items_data.append({
             "dish_id": dish_id,
@@ -90,34 +138,66 @@ def create_order_from_cart(
         customer_id=user_id,
         restaurant_id=restaurant_id,
         status="placed",
-        total_amount=total_amount,
-        discount_amount=discount_amount,
-        delivery_fee=delivery_fee,
-        platform_fee=platform_fee,
-        payment_mode=checkout_request.payment_mode.value
+        total_amount=to_decimal(total_amount),
+        discount_amount=to_decimal(discount_amount),
+        delivery_fee=to_decimal(delivery_fee),
+        platform_fee=to_decimal(platform_fee),
+        payment_mode=checkout_request.payment_mode.value,
+        idempotency_key=idempotency_key,
+        request_fingerprint=request_fingerprint
     )
-    
-    db.add(order)
-    db.flush()  # Get order ID
-    
-    # Create order items
-    for item_data in order_items_data:
-        order_item = OrderItem(
-            order_id=order.id,
-            **item_data
-        )
-        db.add(order_item)
-    
+    order.restaurant = restaurant
+    
+    try:
+        # Savepoint: a duplicate key only undoes this insert
+        with db.begin_nested():
+            db.add(order)
+            db.flush()  # Get order ID
+    except IntegrityError:
+        # A concurrent checkout with the same key committed the order first;
+        # it is newer than this transaction's snapshot
+        existing = None
+        if idempotency_key is not None:
+            existing = find_idempotent_order(db, user_id, idempotency_key, request_fingerprint, latest=True)
+        if existing is None:
+            raise
+        return existing
+    
+    # Bulk insert order items (one executemany), then read their IDs in one query
+    db.execute(insert(OrderItem), [{"order_id": order.id, **item_data} for item_data in order_items_data])
+    items = db.query(OrderItem).filter(OrderItem.order_id == order.id).order_by(OrderItem.id).all()
+    set_committed_value(order, "items", items)
+    
+    customer_stats.record_order_placed(db, user_id, order.total_amount, order.created_at)
+    
+    # Side effects (notifications) run from the outbox after commit
+    record_event(db, order.id, ORDER_PLACED, {
+        "order_id": order.id,
+        "customer_id": user_id,
+        "restaurant_owner_id": restaurant.owner_id,
+        "total_amount": str(order.total_amount)
+    })
+    
+    response = OrderResponse.model_validate(order)
     db.commit()
-    db.refresh(order)
     
     # Clear cart
     cart_service.clear_cart(user_id)
     
-    # Send notifications
-    notify_order_placed(db, order)
-    
-    return order
+    return response
+
+
+def order_page(db: Session, page: PageParams, response: Response, *criteria) -> List[OrderResponse]:
+    """
+    One newest-first page of orders matching criteria, serialized with their items.
+    Items for the whole page are loaded in a single IN query, so a page costs
+    two statements however many orders it holds.
+    """
+    orders = paginate(
+        db.query(Order).options(selectinload(Order.items)).filter(*criteria),
+        Order, page, response
+    )
+    return [OrderResponse.model_validate(order) for order in orders]
 
 
 def reorder(db: Session, user_id: int, order_id: int) -> dict:
@@ -141,8 +221,9 @@ def reorder(db: Session, user_id: int, order_id: int) -> dict:
     cart_service.clear_cart(user_id)
     
     # Add items from original order to cart
+    dishes = cart_service.get_dishes(db, [order_item.dish_id for order_item in original_order.items])
     for order_item in original_order.items:
-        dish = db.query(Dish).filter(Dish.id == order_item.dish_id).first()
+        dish = dishes[order_item.dish_id]
         
         if not dish:
             continue  # Skip if dish no longer exists
@@ -0,0 +1,125 @@
+"""
+Order state machine.
+
+Every status change is one conditional UPDATE:
+
+    UPDATE orders SET status=:new WHERE id=:id AND status=:expected [AND guards]
+
+so two requests racing on the same order (e.g. a customer cancelling while
+the restaurant starts preparing) cannot both succeed: the database applies
+one and the other matches no row. The order is only read again, together
+with its restaurant's owner for the status change event, to build the
+response (in the same statement with RETURNING where the database supports
+it), or to explain why nothing was updated.
+"""
+from typing import Any, Dict, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models.models import Order, OrderStatus, Restaurant
+from app.services import customer_stats
+from app.services.order_events import record_status_change
+
+# Selected with the updated order instead of lazy-loading order.restaurant
+_RESTAURANT_OWNER_ID = select(Restaurant.owner_id).where(Restaurant.id == Order.restaurant_id).scalar_subquery()
+
+CUSTOMER = "customer"
+RESTAURANT_OWNER = "restaurant_owner"
+DELIVERY_PARTNER = "delivery_partner"
+
+# actor -> {new status: status the order must currently have}
+TRANSITIONS: Dict[str, Dict[str, str]] = {
+    CUSTOMER: {
+        OrderStatus.CANCELLED.value: OrderStatus.PLACED.value,
+    },
+    RESTAURANT_OWNER: {
+        OrderStatus.PREPARING.value: OrderStatus.PLACED.value,
+    },
+    DELIVERY_PARTNER: {
+        OrderStatus.OUT_FOR_DELIVERY.value: OrderStatus.PREPARING.value,
+        OrderStatus.DELIVERED.value: OrderStatus.OUT_FOR_DELIVERY.value,
+    },
+}
+
+
+def expected_status(actor: str, new_status: str) -> str:
+    """Status an order must have for actor to move it to new_status."""
+    expected = TRANSITIONS[actor].get(new_status)
+    if expected is None:
+        allowed = ", ".join(TRANSITIONS[actor])
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot move order to {new_status} (allowed: {allowed})"
+        )
+    return expected
+
+
+def transition(
+    db: Session,
+    order_id: int,
+    actor: str,
+    new_status: str,
+    scope: Sequence[Any] = (),
+    guards: Sequence[Any] = (),
+    values: Optional[Dict[str, Any]] = None,
+    guard_error: Optional[HTTPException] = None
+) -> Order:
+    """
+    Move an order to new_status if actor may and the order still has the
+    expected status. Runs in the caller's transaction and records the status
+    change event; the caller commits.
+
+    scope: criteria limiting which orders actor can see (404 otherwise).
+    guards: extra criteria the order must meet (guard_error, default 409, otherwise).
+    values: other columns to set in the same UPDATE.
+    """
+    expected = expected_status(actor, new_status)
+    statement = update(Order).where(
+        Order.id == order_id,
+        Order.status == expected,
+        *scope,
+        *guards
+    ).values(status=new_status, **(values or {})).execution_options(synchronize_session=False)
+
+    if db.get_bind().dialect.update_returning:
+        row = db.execute(
+            statement.returning(Order, _RESTAURANT_OWNER_ID), execution_options={"populate_existing": True}
+        ).first()
+    else:
+        row = None
+        if db.execute(statement).rowcount == 1:
+            row = db.query(Order, _RESTAURANT_OWNER_ID).populate_existing().filter(Order.id == order_id).first()
+
+    if row is None:
+        _raise_not_applied(db, order_id, new_status, expected, scope, guard_error)
+
+    order, restaurant_owner_id = row
+    if new_status == OrderStatus.CANCELLED.value:
+        customer_stats.record_order_cancelled(db, order.customer_id, order.total_amount)
+    record_status_change(db, order, restaurant_owner_id)
+    return order
+
+
+def _raise_not_applied(
+    db: Session,
+    order_id: int,
+    new_status: str,
+    expected: str,
+    scope: Sequence[Any],
+    guard_error: Optional[HTTPException]
+) -> None:
+    current = db.query(Order.status).filter(Order.id == order_id, *scope).scalar()
+    if current is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+    if current != expected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid status transition from {current} to {new_status}"
+        )
+    raise guard_error or HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Order was changed by another request"
+    )
@@ -0,0 +1,195 @@
+"""
+Real-time order status streaming.
+
+Order event handlers publish status messages to a broker. Every worker
+process runs an OrderStreamHub that delivers messages to the SSE streams of
+the users involved (customer, restaurant owner, delivery partner).
+
+ORDER_STREAM_BROKER selects the broker:
+
+- memory: in-process only (single worker).
+- redis: Redis pub/sub, so a status change handled by one worker reaches
+  streams held open by every other worker.
+
+Delivery is at least once: a retried order event can publish twice, and
+clients treat messages as "order X is now in status Y".
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ORDER_STREAM_BROKER = os.getenv('ORDER_STREAM_BROKER', 'memory').lower()
+ORDER_STREAM_QUEUE_SIZE = int(os.getenv('ORDER_STREAM_QUEUE_SIZE', '100'))
+ORDER_STREAM_KEEPALIVE_SECONDS = float(os.getenv('ORDER_STREAM_KEEPALIVE_SECONDS', '15'))
+ORDER_STREAM_CHANNEL = os.getenv('ORDER_STREAM_CHANNEL', 'order_status')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+
+class OrderStreamHub:
+    """
+    Per-user subscriber queues on this worker's event loop.
+    deliver() may be called from any thread.
+    """
+
+    def __init__(self, queue_size: int = ORDER_STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.delivered = 0
+        self.dropped = 0
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Set the event loop that owns the subscriber queues."""
+        self._loop = loop
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """Register a stream for a user. Must run on the event loop."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        """Remove a stream. Must run on the event loop."""
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def deliver(self, message: Dict) -> None:
+        """Hand a broker message to the subscribed streams."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver_local(message)
+        else:
+            loop.call_soon_threadsafe(self._deliver_local, message)
+
+    def _deliver_local(self, message: Dict) -> None:
+        for user_id in message["user_ids"]:
+            for queue in self._subscribers.get(user_id, ()):
+                if queue.full():
+                    # Slow client: drop its oldest message rather than grow
+                    queue.get_nowait()
+                    self.dropped += 1
+                queue.put_nowait(message["event"])
+                self.delivered += 1
+
+    def stats(self) -> Dict:
+        """Subscriber and delivery counters for this worker process."""
+        return {
+            "users": len(self._subscribers),
+            "streams": sum(len(queues) for queues in self._subscribers.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+class OrderStreamBroker(ABC):
+    """Fans published messages out to the hub of every worker."""
+
+    def start(self, hub: OrderStreamHub) -> None:
+        """Begin delivering messages to this worker's hub."""
+        self.hub = hub
+
+    def stop(self) -> None:
+        """Stop delivering messages."""
+
+    @abstractmethod
+    def publish(self, message: Dict) -> None:
+        """Publish a message to all workers. Called from worker threads."""
+
+
+class InProcessBroker(OrderStreamBroker):
+    """Delivers straight to this process's hub."""
+
+    hub: Optional[OrderStreamHub] = None
+
+    def publish(self, message: Dict) -> None:
+        if self.hub is not None:
+            self.hub.deliver(message)
+
+
+class RedisBroker(OrderStreamBroker):
+    """Redis pub/sub broker shared by all workers and hosts."""
+
+    def __init__(self, url: str = REDIS_URL, channel: str = ORDER_STREAM_CHANNEL, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("ORDER_STREAM_BROKER=redis requires the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.channel = channel
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, hub: OrderStreamHub) -> None:
+        super().start(hub)
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+        self._thread = threading.Thread(target=self._listen, name="order-stream-redis", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+    def _listen(self) -> None:
+        pubsub = self._pubsub
+        try:
+            for item in pubsub.listen():
+                if item.get("type") == "message":
+                    self.hub.deliver(json.loads(item["data"]))
+        except Exception:
+            if self._pubsub is not None:
+                logger.exception("Order stream subscriber stopped")
+
+    def publish(self, message: Dict) -> None:
+        self.client.publish(self.channel, json.dumps(message))
+
+
+def create_order_stream_broker(backend: str = ORDER_STREAM_BROKER) -> OrderStreamBroker:
+    """Build the configured broker."""
+    if backend == "memory":
+        return InProcessBroker()
+    if backend == "redis":
+        return RedisBroker()
+    raise ValueError(f"ORDER_STREAM_BROKER must be 'memory' or 'redis', got '{backend}'")
+
+
+order_stream_hub = OrderStreamHub()
+order_stream_broker: OrderStreamBroker = create_order_stream_broker()
+
+
+def publish_order_status(order_id: int, order_status: str, user_ids: List[Optional[int]]) -> None:
+    """Publish an order's new status to the streams of the given users."""
+    order_stream_broker.publish({
+        "user_ids": sorted({user_id for user_id in user_ids if user_id}),
+        "event": {"order_id": order_id, "status": order_status}
+    })
+
+
+def format_sse(event: Optional[Dict]) -> str:
+    """Encode an SSE frame; None encodes a keepalive comment."""
+    if event is None:
+        return ": keepalive\n\n"
+    return f"event: order_status\ndata: {json.dumps(event)}\n\n"
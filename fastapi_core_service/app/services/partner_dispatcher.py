@@ -0,0 +1,176 @@
+"""
+In-memory dispatcher for available delivery partners.
+
+Each worker process keeps its available partners in one OrderedDict per pin
+code, longest idle first, so assignment pops the partner who has waited the
+longest in O(1) without reading the delivery_partners table.
+
+The table stays the source of truth. Memory is only a hint:
+
+- A partner taken from memory is still claimed with the conditional UPDATE in
+  delivery_service, so a stale entry (another worker already booked the
+  partner) costs one failed UPDATE, never a double booking.
+- Committed DeliveryPartner changes made through any Session in this process
+  (ORM attribute writes, and bulk UPDATEs registered with track()) are applied
+  to memory after commit and dropped on rollback.
+- Changes made by other processes are picked up by the periodic reload and by
+  the database fallback in delivery_service when a pin code runs dry here.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.models import DeliveryPartner
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PARTNER_DISPATCHER_ENABLED = os.getenv('PARTNER_DISPATCHER_ENABLED', 'True').lower() == 'true'
+# Rebuild from the table this often, to pick up changes made by other processes
+PARTNER_DISPATCHER_RELOAD_SECONDS = float(os.getenv('PARTNER_DISPATCHER_RELOAD_SECONDS', '300'))
+
+# Session.info key for availability changes to apply after commit
+_PENDING_KEY = "partner_dispatcher_pending"
+
+
+class PartnerDispatcher:
+    """Per-pin-code queues of available partners, longest idle first. Thread-safe."""
+
+    def __init__(self, enabled: bool = PARTNER_DISPATCHER_ENABLED,
+                 reload_seconds: float = PARTNER_DISPATCHER_RELOAD_SECONDS):
+        self.enabled = enabled
+        self.reload_seconds = reload_seconds
+        self.taken = 0
+        self.misses = 0
+        self.loaded_at: Optional[float] = None
+        self._queues: Dict[str, "OrderedDict[int, None]"] = {}
+        self._pins: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        """Rebuild from the delivery_partners table."""
+        rows = db.query(
+            DeliveryPartner.user_id, DeliveryPartner.pin_code, DeliveryPartner.available
+        ).order_by(DeliveryPartner.id).all()
+        queues: Dict[str, "OrderedDict[int, None]"] = {}
+        pins: Dict[int, str] = {}
+        for user_id, pin_code, available in rows:
+            pins[user_id] = pin_code
+            if available:
+                queues.setdefault(pin_code, OrderedDict())[user_id] = None
+        with self._lock:
+            self._queues, self._pins = queues, pins
+            self.loaded_at = time.monotonic()
+        logger.info(f"Partner dispatcher loaded {len(pins)} partners in {len(queues)} pin codes")
+
+    def needs_reload(self) -> bool:
+        loaded_at = self.loaded_at
+        return self.enabled and (loaded_at is None or time.monotonic() - loaded_at >= self.reload_seconds)
+
+    def take(self, pin_code: str) -> Optional[int]:
+        """Remove and return the longest idle partner in a pin code, or None."""
+        with self._lock:
+            queue = self._queues.get(pin_code)
+            if not queue:
+                self.misses += 1
+                return None
+            user_id, _ = queue.popitem(last=False)
+            self.taken += 1
+            return user_id
+
+    def put_back(self, user_id: int, pin_code: str) -> None:
+        """Return a taken partner to the front of its queue (the claim did not commit)."""
+        with self._lock:
+            queue = self._queues.setdefault(pin_code, OrderedDict())
+            queue[user_id] = None
+            queue.move_to_end(user_id, last=False)
+
+    def pin_code_of(self, user_id: int) -> Optional[str]:
+        return self._pins.get(user_id)
+
+    def set_available(self, user_id: int, pin_code: str, available: bool) -> None:
+        """Apply a committed availability change. A newly available partner joins the back."""
+        with self._lock:
+            old_pin = self._pins.get(user_id)
+            if old_pin is not None and old_pin != pin_code:
+                self._discard(user_id, old_pin)
+            self._pins[user_id] = pin_code
+            if available:
+                self._queues.setdefault(pin_code, OrderedDict()).setdefault(user_id, None)
+            else:
+                self._discard(user_id, pin_code)
+
+    def _discard(self, user_id: int, pin_code: str) -> None:
+        queue = self._queues.get(pin_code)
+        if queue is not None:
+            queue.pop(user_id, None)
+            if not queue:
+                del self._queues[pin_code]
+
+    def snapshot(self) -> Dict[str, List[int]]:
+        """Available partners per pin code, longest idle first."""
+        with self._lock:
+            return {pin_code: list(queue) for pin_code, queue in self._queues.items()}
+
+    def available_count(self, pin_code: str) -> int:
+        return len(self._queues.get(pin_code, ()))
+
+    def stats(self) -> Dict:
+        """Queue sizes and counters for this worker process."""
+        with self._lock:
+            available = sum(len(queue) for queue in self._queues.values())
+            pin_codes = len(self._queues)
+        return {
+            "enabled": self.enabled,
+            "partners": len(self._pins),
+            "available": available,
+            "pin_codes": pin_codes,
+            "taken": self.taken,
+            "misses": self.misses,
+            "loaded_seconds_ago": None if self.loaded_at is None else round(time.monotonic() - self.loaded_at, 1),
+        }
+
+
+partner_dispatcher = PartnerDispatcher()
+
+
+def track(db: Session, user_id: int, available: bool, pin_code: Optional[str] = None) -> None:
+    """
+    Apply an availability change made with a bulk UPDATE once db commits.
+    pin_code may be omitted for partners the dispatcher already knows.
+    """
+    db.info.setdefault(_PENDING_KEY, []).append((user_id, pin_code, available))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_orm_changes(session: Session, flush_context) -> None:
+    """Record availability changes made through DeliveryPartner objects."""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, DeliveryPartner):
+            continue
+        state = inspect(obj)
+        if obj in session.new or state.attrs.available.history.has_changes() \
+                or state.attrs.pin_code.history.has_changes():
+            track(session, obj.user_id, bool(obj.available), obj.pin_code)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    changes: List[Tuple[int, Optional[str], bool]] = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+    for user_id, pin_code, available in changes:
+        pin_code = pin_code or partner_dispatcher.pin_code_of(user_id)
+        if pin_code is not None:
+            partner_dispatcher.set_available(user_id, pin_code, available)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
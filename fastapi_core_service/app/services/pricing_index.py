@@ -0,0 +1,179 @@
+"""
+Process-local index of active offers and fees.
+
+Both tables are tiny and only change through the Django admin, so each
+worker keeps them in memory:
+
+- offers grouped by restaurant id (None = platform-wide), sorted by
+  min_order_value so the offers an order amount qualifies for are a prefix
+  found by bisection;
+- fees keyed by restaurant id, with the platform row (None) as fallback.
+
+Amounts are held as Money (paise) and percentages as basis points,
+converted once per load.
+
+The index reloads on first use after bump() (Django calls the internal
+invalidate endpoint when an offer or fee is saved or deleted) or once
+PRICING_INDEX_TTL_SECONDS have passed, which bounds staleness when a
+notification is lost. Between reloads, offer and fee resolution do not
+touch the database.
+
+No lock is held across the reload queries: with DB_ASYNC_ENABLED they run
+on the event loop thread (AsyncSession.run_sync) and yield to other
+requests, which would then block the loop waiting for the lock. One caller
+reloads while the others keep using the previous snapshot if it only
+expired; after bump() (or before the first load) they load too rather than
+use offers known to be stale, and the newest load wins.
+"""
+import bisect
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.models import Fee, Offer
+from app.utils.money import Money, to_basis_points, to_money
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PRICING_INDEX_TTL_SECONDS = float(os.getenv('PRICING_INDEX_TTL_SECONDS', '30'))
+
+# Charged when neither the restaurant nor the platform has a fees row
+DEFAULT_DELIVERY_FEE = Money(3000)
+DEFAULT_PLATFORM_FEE = Money(500)
+
+
+@dataclass(frozen=True)
+class OfferRule:
+    """Snapshot of an active offer row."""
+    id: int
+    restaurant_id: Optional[int]
+    discount_basis_points: int
+    min_order_value: Money
+    first_time_user_only: bool
+
+
+@dataclass(frozen=True)
+class FeeRule:
+    """Snapshot of a fee row."""
+    id: int
+    restaurant_id: Optional[int]
+    delivery_fee: Money
+    platform_fee: Money
+
+
+@dataclass(frozen=True)
+class PricingSnapshot:
+    """One immutable load of the offers and fees tables."""
+    # restaurant id (None = platform) -> (offers sorted by min_order_value, their min_order_values)
+    offers: Dict[Optional[int], Tuple[Tuple[OfferRule, ...], Tuple[Money, ...]]]
+    # restaurant id (None = platform) -> fees
+    fees: Dict[Optional[int], FeeRule]
+
+
+class PricingIndex:
+    """Offers and fees of this worker process, reloaded on version bump or TTL."""
+
+    def __init__(self, ttl: float = PRICING_INDEX_TTL_SECONDS):
+        self.ttl = ttl
+        self.version = 0
+        self.reloads = 0
+        self._loaded_version = -1
+        self._expires_at = 0.0
+        self._snapshot = PricingSnapshot(offers={}, fees={})
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def bump(self) -> None:
+        """Invalidate after offers or fees changed; the next lookup reloads."""
+        with self._lock:
+            self.version += 1
+
+    def needs_reload(self) -> bool:
+        return self._loaded_version != self.version or time.monotonic() >= self._expires_at
+
+    def load(self, db: Session) -> None:
+        """Rebuild from the database (two queries); kept unless a newer version was loaded meanwhile."""
+        version = self.version
+        offers = db.query(Offer).filter(Offer.active == True).order_by(Offer.min_order_value, Offer.id).all()
+        fees = db.query(Fee).order_by(Fee.id).all()
+
+        grouped: Dict[Optional[int], List[OfferRule]] = {}
+        for offer in offers:
+            grouped.setdefault(offer.restaurant_id, []).append(OfferRule(
+                offer.id, offer.restaurant_id, to_basis_points(offer.discount_percentage),
+                to_money(offer.min_order_value), bool(offer.first_time_user_only)
+            ))
+        fee_rules: Dict[Optional[int], FeeRule] = {}
+        for fee in fees:
+            # First row per restaurant wins
+            fee_rules.setdefault(fee.restaurant_id, FeeRule(
+                fee.id, fee.restaurant_id, to_money(fee.delivery_fee), to_money(fee.platform_fee)
+            ))
+
+        snapshot = PricingSnapshot(
+            offers={
+                restaurant_id: (tuple(rules), tuple(rule.min_order_value for rule in rules))
+                for restaurant_id, rules in grouped.items()
+            },
+            fees=fee_rules
+        )
+        with self._lock:
+            if version < self._loaded_version:
+                return
+            self._snapshot = snapshot
+            self._loaded_version = version
+            self._expires_at = time.monotonic() + self.ttl
+            self.reloads += 1
+
+    def refresh(self, db: Session) -> None:
+        """
+        Reload if bumped or expired. While another caller reloads, an expired
+        snapshot is still served; a bumped (or never loaded) one is reloaded.
+        """
+        if not self.needs_reload():
+            return
+        if self._load_lock.acquire(blocking=False):
+            try:
+                if self.needs_reload():
+                    self.load(db)
+            finally:
+                self._load_lock.release()
+        elif self._loaded_version != self.version:
+            self.load(db)
+
+    def snapshot(self, db: Session) -> PricingSnapshot:
+        """Current offers and fees, reloaded first if bumped or expired."""
+        self.refresh(db)
+        return self._snapshot
+
+    def offers_for(self, db: Session, restaurant_id: int, order_amount: Money) -> List[OfferRule]:
+        """Active restaurant and platform offers whose minimum order_amount meets."""
+        offers = self.snapshot(db).offers
+        applicable: List[OfferRule] = []
+        for key in (restaurant_id, None):
+            rules, min_values = offers.get(key, ((), ()))
+            applicable.extend(rules[:bisect.bisect_right(min_values, order_amount)])
+        return applicable
+
+    def fees_for(self, db: Session, restaurant_id: int) -> Optional[FeeRule]:
+        """The restaurant's fees, else the platform fees, else None."""
+        fees = self.snapshot(db).fees
+        return fees.get(restaurant_id) or fees.get(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and reload counters for this worker process."""
+        snapshot = self._snapshot
+        return {
+            "version": self.version,
+            "loaded_version": self._loaded_version,
+            "reloads": self.reloads,
+            "ttl": self.ttl,
+            "offers": sum(len(rules) for rules, _ in snapshot.offers.values()),
+            "fees": len(snapshot.fees),
+        }
+
+
+pricing_index = PricingIndex()
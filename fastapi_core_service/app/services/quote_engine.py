@@ -0,0 +1,206 @@
+"""
+Vectorized price quotes ("your total with best offer").
+
+Prices many (restaurant, subtotal, customer) tuples at once with NumPy
+integer paise arrays and returns the same offer, discount, fees and total
+as the checkout path (offer_service.get_best_offer, calculate_discount,
+order_service.get_fees and calculate_order_total).
+
+Each pricing index snapshot is compiled once into flat arrays:
+
+- restaurants with offers or fees get a dense slot; unknown restaurants
+  share one extra slot without rows, and platform offers get their own
+  segment;
+- offers are laid out per segment, sorted by min_order_value, under the key
+  segment * KEY_STRIDE + min_order_paise, so one searchsorted finds the
+  last offer each subtotal qualifies for;
+- the best offer of every segment prefix is precomputed, for first-time and
+  for returning customers, so best-offer selection is a gather.
+
+Discounts are rounded half-even to whole paise, as money.percent_of does.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence
+import numpy as np
+from sqlalchemy.orm import Session
+from app.services.customer_stats import first_time_customers
+from app.services.pricing_index import (
+    DEFAULT_DELIVERY_FEE, DEFAULT_PLATFORM_FEE, PricingIndex, PricingSnapshot, pricing_index
+)
+from app.utils.money import BASIS_POINTS
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUOTE_BATCH_MAX_ITEMS = int(os.getenv('QUOTE_BATCH_MAX_ITEMS', '5000'))
+
+# Larger than any subtotal in paise (subtotals have at most 10 integer digits)
+KEY_STRIDE = 1 << 40
+
+
+def divide_half_even(numerator: np.ndarray, divisor: int) -> np.ndarray:
+    """numerator / divisor rounded half-even to integers (array money.percent_of)."""
+    quotient, remainder = np.divmod(numerator, divisor)
+    half = divisor // 2
+    return quotient + ((remainder > half) | ((remainder == half) & (quotient % 2 == 1)))
+
+
+@dataclass(frozen=True)
+class QuoteArrays:
+    """Quotes in paise, aligned with the request; offer_id is -1 without an offer."""
+    offer_id: np.ndarray
+    discount: np.ndarray
+    delivery_fee: np.ndarray
+    platform_fee: np.ndarray
+    total: np.ndarray
+
+
+class CompiledPricing:
+    """A pricing snapshot as flat arrays."""
+
+    def __init__(self, snapshot: PricingSnapshot):
+        self.snapshot = snapshot
+        restaurant_ids = sorted(
+            {key for key in snapshot.offers if key is not None} | {key for key in snapshot.fees if key is not None}
+        )
+        self.restaurant_ids = np.array(restaurant_ids, dtype=np.int64)
+        self.unknown_slot = len(restaurant_ids)
+        self.platform_segment = len(restaurant_ids) + 1
+
+        # Fees per slot: the restaurant's row, else the platform row, else the defaults
+        platform_fees = snapshot.fees.get(None)
+        default_delivery = platform_fees.delivery_fee if platform_fees else DEFAULT_DELIVERY_FEE
+        default_platform = platform_fees.platform_fee if platform_fees else DEFAULT_PLATFORM_FEE
+        self.delivery_fee = np.full(len(restaurant_ids) + 1, default_delivery, dtype=np.int64)
+        self.platform_fee = np.full(len(restaurant_ids) + 1, default_platform, dtype=np.int64)
+        for slot, restaurant_id in enumerate(restaurant_ids):
+            fee = snapshot.fees.get(restaurant_id)
+            if fee:
+                self.delivery_fee[slot] = fee.delivery_fee
+                self.platform_fee[slot] = fee.platform_fee
+
+        keys: List[int] = []
+        segments: List[int] = []
+        offer_ids: List[int] = []
+        basis_points: List[int] = []
+        best_first_time: List[int] = []
+        best_returning: List[int] = []
+        self.has_first_time_offers = False
+        for segment, restaurant_id in [*enumerate(restaurant_ids), (self.platform_segment, None)]:
+            rules, _ = snapshot.offers.get(restaurant_id, ((), ()))
+            best_any = best_regular = -1
+            for rule in rules:
+                position = len(keys)
+                keys.append(segment * KEY_STRIDE + rule.min_order_value)
+                segments.append(segment)
+                offer_ids.append(rule.id)
+                basis_points.append(rule.discount_basis_points)
+                # Strictly greater: the first of equal discounts wins, like max()
+                if best_any < 0 or basis_points[position] > basis_points[best_any]:
+                    best_any = position
+                if rule.first_time_user_only:
+                    self.has_first_time_offers = True
+                elif best_regular < 0 or basis_points[position] > basis_points[best_regular]:
+                    best_regular = position
+                best_first_time.append(best_any)
+                best_returning.append(best_regular)
+
+        self.keys = np.array(keys, dtype=np.int64)
+        self.segments = np.array(segments, dtype=np.int64)
+        self.offer_ids = np.array(offer_ids, dtype=np.int64)
+        self.basis_points = np.array(basis_points, dtype=np.int64)
+        self.best_first_time = np.array(best_first_time, dtype=np.int64)
+        self.best_returning = np.array(best_returning, dtype=np.int64)
+
+    def slots(self, restaurant_ids: np.ndarray) -> np.ndarray:
+        """Dense slot of each restaurant id (unknown_slot if it has no rows)."""
+        if not len(self.restaurant_ids):
+            return np.full(len(restaurant_ids), self.unknown_slot, dtype=np.int64)
+        slots = np.searchsorted(self.restaurant_ids, restaurant_ids)
+        clipped = np.minimum(slots, len(self.restaurant_ids) - 1)
+        known = (slots < len(self.restaurant_ids)) & (self.restaurant_ids[clipped] == restaurant_ids)
+        return np.where(known, slots, self.unknown_slot)
+
+    def best_offer(self, segments: np.ndarray, subtotals: np.ndarray, first_time: np.ndarray) -> np.ndarray:
+        """Position of the best qualifying offer in each segment, or -1."""
+        if not len(self.keys):
+            return np.full(len(subtotals), -1, dtype=np.int64)
+        positions = np.searchsorted(
+            self.keys, segments * KEY_STRIDE + np.minimum(subtotals, KEY_STRIDE - 1), side="right"
+        ) - 1
+        clipped = np.maximum(positions, 0)
+        inside = (positions >= 0) & (self.segments[clipped] == segments)
+        best = np.where(first_time, self.best_first_time[clipped], self.best_returning[clipped])
+        return np.where(inside, best, -1)
+
+    def quote(self, restaurant_ids: np.ndarray, subtotals: np.ndarray, first_time: np.ndarray) -> QuoteArrays:
+        """Quote subtotals (paise) at restaurants for first-time or returning customers."""
+        slots = self.slots(restaurant_ids)
+        restaurant_best = self.best_offer(slots, subtotals, first_time)
+        platform_best = self.best_offer(np.full_like(slots, self.platform_segment), subtotals, first_time)
+        # Restaurant offers take precedence over platform offers
+        best = np.where(restaurant_best >= 0, restaurant_best, platform_best)
+        has_offer = best >= 0
+        clipped = np.maximum(best, 0)
+
+        basis_points = np.where(has_offer, self.basis_points[clipped] if len(self.keys) else 0, 0)
+        discount = divide_half_even(subtotals * basis_points, BASIS_POINTS)
+        delivery_fee = self.delivery_fee[slots]
+        platform_fee = self.platform_fee[slots]
+        return QuoteArrays(
+            offer_id=np.where(has_offer, self.offer_ids[clipped] if len(self.keys) else -1, -1),
+            discount=discount,
+            delivery_fee=delivery_fee,
+            platform_fee=platform_fee,
+            total=subtotals - discount + delivery_fee + platform_fee,
+        )
+
+
+class QuoteEngine:
+    """Batch quotes against the process's pricing index."""
+
+    def __init__(self, index: PricingIndex = pricing_index):
+        self.index = index
+        self.compiles = 0
+        self._compiled: Optional[CompiledPricing] = None
+        self._lock = threading.Lock()
+
+    def compiled(self, db: Session) -> CompiledPricing:
+        """Arrays for the current pricing snapshot, compiled once per reload."""
+        snapshot = self.index.snapshot(db)
+        compiled = self._compiled
+        if compiled is None or compiled.snapshot is not snapshot:
+            with self._lock:
+                compiled = self._compiled
+                if compiled is None or compiled.snapshot is not snapshot:
+                    compiled = CompiledPricing(snapshot)
+                    self._compiled = compiled
+                    self.compiles += 1
+        return compiled
+
+    def quote(
+        self,
+        db: Session,
+        restaurant_ids: Sequence[int],
+        subtotals: Sequence[int],
+        customer_ids: Iterable[int]
+    ) -> QuoteArrays:
+        """
+        Quote subtotals (paise) at restaurants for customers. Database access is
+        at most an index reload and one first-time customer lookup per batch.
+        """
+        compiled = self.compiled(db)
+        customer_ids = np.asarray(customer_ids, dtype=np.int64)
+        if compiled.has_first_time_offers:
+            first_time_ids = first_time_customers(db, np.unique(customer_ids).tolist())
+            first_time = np.isin(customer_ids, np.fromiter(first_time_ids, dtype=np.int64, count=len(first_time_ids)))
+        else:
+            first_time = np.zeros(len(customer_ids), dtype=bool)
+        return compiled.quote(
+            np.asarray(restaurant_ids, dtype=np.int64), np.asarray(subtotals, dtype=np.int64), first_time
+        )
+
+
+quote_engine = QuoteEngine()
@@ -0,0 +1,63 @@
+"""
+Restaurant listing service: serialized listings cached per (pin code, zones).
+
+A listing depends on the versions of every pin code it covers, so
+invalidate_restaurant_list(pin_code) drops each listing that includes it.
+"""
+import os
+from typing import List, Optional
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.models.models import Restaurant
+from app.schemas.schemas import RestaurantResponse
+from app.services.zone_index import zone_index
+from app.utils.response_cache import VersionedResponseCache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESTAURANT_LIST_CACHE_MAX_BYTES = int(os.getenv('RESTAURANT_LIST_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+RESTAURANT_LIST_CACHE_TTL_SECONDS = float(os.getenv('RESTAURANT_LIST_CACHE_TTL_SECONDS', '30'))
+
+# Version key of the unfiltered listing, bumped by every restaurant change
+ALL_PIN_CODES = "*"
+
+restaurant_list_cache = VersionedResponseCache(
+    max_bytes=RESTAURANT_LIST_CACHE_MAX_BYTES, ttl=RESTAURANT_LIST_CACHE_TTL_SECONDS
+)
+
+_restaurant_list_adapter = TypeAdapter(List[RestaurantResponse])
+
+
+def listing_pin_codes(pin_code: Optional[str], zones: int) -> List[str]:
+    """Pin codes a listing covers, nearest first; the unfiltered listing covers all."""
+    if not pin_code:
+        return [ALL_PIN_CODES]
+    return zone_index.nearest(pin_code, zones)
+
+
+def load_restaurant_list(db: Session, pin_codes: List[str]) -> bytes:
+    """Active, ordering-enabled restaurants in pin_codes (nearest first) as a JSON response body."""
+    query = db.query(Restaurant).filter(
+        Restaurant.status == "active",
+        Restaurant.is_ordering_enabled == True
+    )
+    
+    if pin_codes == [ALL_PIN_CODES]:
+        restaurants = query.all()
+    elif len(pin_codes) == 1:
+        restaurants = query.filter(Restaurant.pin_code == pin_codes[0]).all()
+    else:
+        rank = {pin: i for i, pin in enumerate(pin_codes)}
+        restaurants = query.filter(Restaurant.pin_code.in_(pin_codes)).all()
+        restaurants.sort(key=lambda restaurant: rank[restaurant.pin_code])
+    
+    return _restaurant_list_adapter.dump_json(
+        _restaurant_list_adapter.validate_python(restaurants, from_attributes=True)
+    )
+
+
+def invalidate_restaurant_list(pin_code: str) -> None:
+    """Call after committing a change to a restaurant in pin_code."""
+    restaurant_list_cache.bump(pin_code)
+    restaurant_list_cache.bump(ALL_PIN_CODES)
@@ -0,0 +1,119 @@
+"""
+Pin code adjacency index.
+
+Built once per process from a local CSV of neighbouring pin codes
+(PIN_ADJACENCY_FILE) by running Dijkstra from every pin code. Each pin code
+keeps its ZONE_MAX_NEIGHBOURS nearest zones within ZONE_MAX_DISTANCE_KM, so
+nearest() and distance() are dictionary lookups and never touch the database.
+
+Pin codes missing from the file only match themselves, which is the
+behaviour of an exact pin_code filter.
+"""
+import csv
+import heapq
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PIN_ADJACENCY_FILE = os.getenv(
+    'PIN_ADJACENCY_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'pin_adjacency.csv')
+)
+ZONE_MAX_NEIGHBOURS = int(os.getenv('ZONE_MAX_NEIGHBOURS', '8'))
+ZONE_MAX_DISTANCE_KM = float(os.getenv('ZONE_MAX_DISTANCE_KM', '10'))
+
+# (pin_code, distance_km, hops), nearest first
+Zone = Tuple[str, float, int]
+
+
+class ZoneIndex:
+    """Nearest zones of every pin code, precomputed."""
+
+    def __init__(self, edges: Iterable[Tuple[str, str, float]] = (),
+                 max_neighbours: int = ZONE_MAX_NEIGHBOURS, max_distance_km: float = ZONE_MAX_DISTANCE_KM):
+        self.max_neighbours = max_neighbours
+        self.max_distance_km = max_distance_km
+        graph: Dict[str, List[Tuple[str, float]]] = {}
+        for a, b, km in edges:
+            graph.setdefault(a, []).append((b, km))
+            graph.setdefault(b, []).append((a, km))
+        self._nearest: Dict[str, Tuple[Zone, ...]] = {pin: self._search(graph, pin) for pin in graph}
+        self._distance: Dict[Tuple[str, str], Zone] = {
+            (pin, zone[0]): zone for pin, zones in self._nearest.items() for zone in zones
+        }
+
+    @classmethod
+    def from_file(cls, path: str = PIN_ADJACENCY_FILE, **kwargs) -> "ZoneIndex":
+        """Load a pin_code_a,pin_code_b,distance_km CSV; '#' lines are comments."""
+        with open(path, newline="") as f:
+            rows = csv.DictReader(line for line in f if not line.startswith("#"))
+            edges = [(row["pin_code_a"].strip(), row["pin_code_b"].strip(), float(row["distance_km"]))
+                     for row in rows]
+        return cls(edges, **kwargs)
+
+    def _search(self, graph: Dict[str, List[Tuple[str, float]]], source: str) -> Tuple[Zone, ...]:
+        """Dijkstra from source, stopping at max_neighbours zones or max_distance_km."""
+        found: List[Zone] = []
+        settled = set()
+        heap = [(0.0, 0, source)]
+        while heap and len(found) <= self.max_neighbours:
+            km, hops, pin = heapq.heappop(heap)
+            if pin in settled:
+                continue
+            settled.add(pin)
+            found.append((pin, round(km, 3), hops))
+            for neighbour, edge_km in graph[pin]:
+                if neighbour not in settled and km + edge_km <= self.max_distance_km:
+                    heapq.heappush(heap, (km + edge_km, hops + 1, neighbour))
+        return tuple(found)
+
+    def nearest(self, pin_code: str, k: int) -> List[str]:
+        """The k nearest zones to pin_code, itself first."""
+        zones = self._nearest.get(pin_code)
+        if zones is None:
+            return [pin_code]
+        return [pin for pin, _, _ in zones[:k]]
+
+    def zones(self, pin_code: str) -> Tuple[Zone, ...]:
+        """Every indexed zone near pin_code with its distance and hop count, itself first."""
+        return self._nearest.get(pin_code) or ((pin_code, 0.0, 0),)
+
+    def distance(self, a: str, b: str) -> Optional[float]:
+        """Road distance in km, or None if b is not among a's indexed zones."""
+        if a == b:
+            return 0.0
+        zone = self._distance.get((a, b))
+        return zone[1] if zone else None
+
+    def hops(self, a: str, b: str) -> Optional[int]:
+        """Zone boundaries crossed on the shortest route, or None if not indexed."""
+        if a == b:
+            return 0
+        zone = self._distance.get((a, b))
+        return zone[2] if zone else None
+
+    def stats(self) -> Dict:
+        return {
+            "pin_codes": len(self._nearest),
+            "max_neighbours": self.max_neighbours,
+            "max_distance_km": self.max_distance_km,
+        }
+
+
+def load_zone_index(path: str = PIN_ADJACENCY_FILE) -> ZoneIndex:
+    """Load the configured adjacency file; an unreadable file leaves exact pin matching only."""
+    try:
+        index = ZoneIndex.from_file(path)
+    except (OSError, KeyError, ValueError):
+        logger.exception(f"Could not load pin code adjacency from {path}; using exact pin codes only")
+        return ZoneIndex()
+    logger.info(f"Loaded pin code adjacency for {index.stats()['pin_codes']} pin codes")
+    return index
+
+
+zone_index = load_zone_index()
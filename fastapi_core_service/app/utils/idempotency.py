@@ -0,0 +1,92 @@
+"""
+Idempotency-Key support for non-idempotent POST endpoints.
+
+Completed responses are kept in a bounded TTL cache per (user, key). A retry
+with the same key and body gets the stored response without running the
+handler again; a concurrent duplicate waits for the in-flight request.
+Failures are not stored, so a retry after an error runs the handler again.
+
+The store is per worker process and only saves work: a retry that reaches
+another worker, or takes over from a cancelled request whose handler is
+still running on the threadpool, runs the handler again. Handlers must
+therefore be idempotent themselves (checkout stores the key on the order
+under a unique constraint and returns the existing order).
+"""
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+from fastapi import HTTPException, status
+from app.utils.cache import TTLCache
+from app.utils.single_flight import SingleFlight
+from dotenv import load_dotenv
+
+load_dotenv()
+
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '10000'))
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+T = TypeVar("T")
+
+
+def fingerprint(payload: str) -> str:
+    """Hash of the request body, used to detect a key reused for another request."""
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def validate_idempotency_key(key: str) -> None:
+    """Reject empty or oversized keys."""
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+        )
+
+
+class IdempotencyStore:
+    """
+    Stored responses and in-flight requests keyed by (user_id, idempotency key).
+    Must be used from a single event loop (one per worker process).
+    """
+
+    def __init__(self, maxsize: int = IDEMPOTENCY_CACHE_SIZE, ttl: float = IDEMPOTENCY_TTL_SECONDS):
+        self._responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight = SingleFlight()
+        self.replays = 0
+
+    @staticmethod
+    def _check_fingerprint(stored: str, request_fingerprint: str) -> None:
+        if stored != request_fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request"
+            )
+
+    async def run(self, key: Hashable, request_fingerprint: str, handler: Callable[[], Awaitable[T]]) -> T:
+        """Return the stored response for key, await the in-flight one, or run handler."""
+        def lookup() -> Optional[T]:
+            stored = self._responses.get(key)
+            if stored is not None:
+                self._check_fingerprint(stored[0], request_fingerprint)
+                self.replays += 1
+                return stored[1]
+            in_flight = self._in_flight.tag(key)
+            if in_flight is not None:
+                self._check_fingerprint(in_flight, request_fingerprint)
+            return None
+
+        async def run_handler() -> T:
+            response = await handler()
+            self._responses.set(key, (request_fingerprint, response))
+            return response
+
+        return await self._in_flight.run(key, request_fingerprint, lookup, run_handler)
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored response cache counters plus replay and wait counts."""
+        return {
+            **self._responses.stats(),
+            "in_flight": len(self._in_flight),
+            "replays": self.replays,
+            "waits": self._in_flight.waits,
+        }
@@ -0,0 +1,53 @@
+"""
+Money as whole paise.
+
+Pricing math (cart subtotals, offer thresholds and discounts, fees, order
+totals) runs on Money, a plain int of paise, so it is exact integer
+arithmetic without a Decimal object per operation. Amounts are converted
+from Decimal where they enter pricing (Numeric columns, request bodies,
+the pricing index load) and back to Decimal only where they leave it
+(schemas and Numeric columns).
+
+Rounding rules:
+- to_money rounds half-even to whole paise, which is exact for the
+  Numeric(..., 2) amounts stored in the database;
+- percent_of rounds half-even to whole paise, as round(Decimal, 2) did for
+  amount * percentage / 100.
+
+Money is a NewType rather than a class: on CPython a Python-level __add__
+costs several times a C Decimal addition, while a NewType is free at
+runtime and still keeps paise and rupees apart for type checkers.
+"""
+from decimal import Decimal
+from typing import NewType
+
+Money = NewType("Money", int)
+
+ZERO = Money(0)
+CENT = Decimal("0.01")
+_HUNDRED = Decimal(100)
+# percent_of: paise * basis points / BASIS_POINTS
+BASIS_POINTS = 10000
+
+
+def to_money(amount: Decimal) -> Money:
+    """Paise of a rupee amount, rounded half-even to whole paise."""
+    return round(amount * _HUNDRED)
+
+
+def to_decimal(money: Money) -> Decimal:
+    """Two-decimal rupee amount (0.00 for zero) of paise."""
+    return CENT * money
+
+
+def to_basis_points(percentage: Decimal) -> int:
+    """Hundredths of a percent, rounded half-even (Numeric(5, 2) percentages are exact)."""
+    return round(percentage * _HUNDRED)
+
+
+def percent_of(money: Money, basis_points: int) -> Money:
+    """money * basis_points / 10000 rounded half-even to whole paise."""
+    quotient, remainder = divmod(money * basis_points, BASIS_POINTS)
+    if remainder > BASIS_POINTS // 2 or (remainder == BASIS_POINTS // 2 and quotient % 2):
+        quotient += 1
+    return quotient
@@ -1,63 +1,256 @@
 """
 Notification simulation service.
+
+Order lifecycle notifications are written by order event handlers (see
+app.services.order_events) in the handler's transaction. Other notifications
+are queued in memory and written by a background worker that bulk-inserts
+them in batches on its own session, so request handlers never wait on
+notification writes. The queue is bounded; when it is full new
+notifications are dropped and counted. Call notification_queue.stop() on
+shutdown to flush what is still queued.
 """
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from app.models.models import Notification, User, Order
+from app.database import SessionLocal
+from app.models.models import Notification
 from datetime import datetime
+from typing import Dict, List, Optional
 import logging
+import os
+import queue
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+NOTIFICATION_QUEUE_SIZE = int(os.getenv('NOTIFICATION_QUEUE_SIZE', '10000'))
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '200'))
+NOTIFICATION_FLUSH_INTERVAL_SECONDS = float(os.getenv('NOTIFICATION_FLUSH_INTERVAL_SECONDS', '0.2'))
+
+_STOP = object()
+
+
+def simulate_delivery(row: Dict) -> None:
+    """Simulate sending a notification by logging it."""
+    logger.info(f"[NOTIFICATION] Type: {row['type']}, User: {row['user_id']}, Order: {row['order_id']}, Message: {row['message']}")
+    print(f"[NOTIFICATION] Type: {row['type']}, User: {row['user_id']}, Order: {row['order_id']}, Message: {row['message']}")
+
+
+def notification_row(user_id: int, order_id: int, notification_type: str, message: str) -> Dict:
+    """Build a notifications table row."""
+    return {
+        "user_id": user_id,
+        "order_id": order_id,
+        "type": notification_type,
+        "message": message,
+        "created_at": datetime.utcnow()
+    }
+
+
+class NotificationQueue:
+    """Bounded in-process queue drained by a single background writer thread."""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        maxsize: int = NOTIFICATION_QUEUE_SIZE,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+        flush_interval: float = NOTIFICATION_FLUSH_INTERVAL_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the writer thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notification-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Write everything still queued and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Notification queue still full on shutdown; unwritten notifications are lost")
+            return
+        thread.join(timeout)
+
+    def put(self, row: Dict) -> bool:
+        """Queue a notification row. Returns False if the queue is full and it was dropped."""
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Notification queue full, dropped {row['type']} for order {row['order_id']}")
+            return False
+
+    def join(self) -> None:
+        """Block until every queued notification has been written."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, rows: List[Dict]) -> None:
+        """Insert a batch with one executemany; on failure retry rows one by one."""
+        for row in rows:
+            simulate_delivery(row)
+
+        db = self.session_factory()
+        try:
+            db.execute(insert(Notification), rows)
+            db.commit()
+            self.written += len(rows)
+            return
+        except Exception:
+            db.rollback()
+            if len(rows) == 1:
+                self.failed += 1
+                logger.exception(f"Failed to store notification {rows[0]['type']} for order {rows[0]['order_id']}")
+                return
+        finally:
+            db.close()
+
+        for row in rows:
+            self._write_one(row)
+
+    def _write_one(self, row: Dict) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(insert(Notification), [row])
+            db.commit()
+            self.written += 1
+        except Exception:
+            db.rollback()
+            self.failed += 1
+            logger.exception(f"Failed to store notification {row['type']} for order {row['order_id']}")
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        """Queue depth and writer counters."""
+        return {
+            "queued": self._queue.qsize(),
+            "maxsize": self._queue.maxsize,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+notification_queue = NotificationQueue()
+
 
 def send_notification(
-    db: Session,
     user_id: int,
     order_id: int,
     notification_type: str,
     message: str
 ) -> None:
     """
-    Simulate sending notification by logging and storing in database.
+    Simulate sending notification by queueing it for logging and storage.
     """
-    # Log to console
-    logger.info(f"[NOTIFICATION] Type: {notification_type}, User: {user_id}, Order: {order_id}, Message: {message}")
-    print(f"[NOTIFICATION] Type: {notification_type}, User: {user_id}, Order: {order_id}, Message: {message}")
-    
-    # Store in database
-    notification = Notification(
-        user_id=user_id,
-        order_id=order_id,
-        type=notification_type,
-        message=message,
-        created_at=datetime.utcnow()
-    )
-    db.add(notification)
-    db.commit()
+    notification_queue.put(notification_row(user_id, order_id, notification_type, message))
 
 
-def notify_order_placed(db: Session, order: Order) -> None:
-    """Send notifications when order is placed."""
-    # Notify customer
-    send_notification(
-        db,
-        user_id=order.customer_id,
-        order_id=order.id,
-        notification_type="ORDER_PLACED_CUSTOMER",
-        message=f"Your order #{order.id} has been placed successfully! Total: ₹{order.total_amount}"
-    )
-    
-    # Notify restaurant owner
-    send_notification(
-        db,
-        user_id=order.restaurant.owner_id,
-        order_id=order.id,
-        notification_type="ORDER_PLACED_RESTAURANT",
-        message=f"New order #{order.id} received! Please start preparing."
-    )
+def store_notifications(db: Session, rows: List[Dict]) -> None:
+    """
+    Simulate sending notifications and insert them in the caller's transaction.
+    Used by order event handlers, whose writes must commit atomically.
+    """
+    if not rows:
+        return
+    for row in rows:
+        simulate_delivery(row)
+    db.execute(insert(Notification), rows)
 
 
-def notify_order_status_change(db: Session, order: Order, old_status: str) -> None:
-    """Send notifications when order status changes."""
+def order_placed_notifications(
+    order_id: int,
+    customer_id: int,
+    restaurant_owner_id: int,
+    total_amount
+) -> List[Dict]:
+    """Notifications when order is placed."""
+    return [
+        # Notify customer
+        notification_row(
+            user_id=customer_id,
+            order_id=order_id,
+            notification_type="ORDER_PLACED_CUSTOMER",
+            message=f"Your order #{order_id} has been placed successfully! Total: ₹{total_amount}"
+        ),
+        # Notify restaurant owner
+        notification_row(
+            user_id=restaurant_owner_id,
+            order_id=order_id,
+            notification_type="ORDER_PLACED_RESTAURANT",
+            message=f"New order #{order_id} received! Please start preparing."
+        ),
+    ]
+
+
+def order_assigned_notifications(order_id: int, delivery_partner_id: int) -> List[Dict]:
+    """Notification when the batch matcher assigns an order to a delivery partner."""
+    return [notification_row(
+        user_id=delivery_partner_id,
+        order_id=order_id,
+        notification_type="ORDER_ASSIGNED_DELIVERY",
+        message=f"Order #{order_id} assigned to you for delivery"
+    )]
+
+
+def order_status_notifications(
+    order_id: int,
+    customer_id: int,
+    delivery_partner_id: Optional[int],
+    order_status: str
+) -> List[Dict]:
+    """Notifications when order status changes."""
     status_messages = {
         "preparing": "Your order is being prepared",
         "out_for_delivery": "Your order is out for delivery",
@@ -65,32 +258,31 @@ def notify_order_status_change(db: Session, order: Order, old_status: str) -> No
         "cancelled": "Your order has been cancelled"
     }
     
-    message = status_messages.get(order.status, f"Order status updated to {order.status}")
+    message = status_messages.get(order_status, f"Order status updated to {order_status}")
     
     # Notify customer
-    send_notification(
-        db,
-        user_id=order.customer_id,
-        order_id=order.id,
-        notification_type=f"ORDER_STATUS_{order.status.upper()}",
-        message=f"Order #{order.id}: {message}"
-    )
+    rows = [notification_row(
+        user_id=customer_id,
+        order_id=order_id,
+        notification_type=f"ORDER_STATUS_{order_status.upper()}",
+        message=f"Order #{order_id}: {message}"
+    )]
     
     # Notify delivery partner when assigned
-    if order.status == "out_for_delivery" and order.delivery_partner_id:
-        send_notification(
-            db,
-            user_id=order.delivery_partner_id,
-            order_id=order.id,
+    if order_status == "out_for_delivery" and delivery_partner_id:
+        rows.append(notification_row(
+            user_id=delivery_partner_id,
+            order_id=order_id,
             notification_type="ORDER_ASSIGNED_DELIVERY",
-            message=f"Order #{order.id} assigned to you for delivery"
-        )
+            message=f"Order #{order_id} assigned to you for delivery"
+        ))
+    
+    return rows
 
 
-def notify_complaint_resolved(db: Session, complaint_id: int, customer_id: int, order_id: int) -> None:
+def notify_complaint_resolved(complaint_id: int, customer_id: int, order_id: int) -> None:
     """Send notification when complaint is resolved."""
     send_notification(
-        db,
         user_id=customer_id,
         order_id=order_id,
         notification_type="COMPLAINT_RESOLVED",
@@ -0,0 +1,71 @@
+"""
+Keyset (cursor) pagination for newest-first listings.
+
+Pages are ordered by (created_at DESC, id DESC) and the cursor is the last
+row's (created_at, id), so every page is an index range scan no matter how
+deep the client pages. Responses stay a plain JSON list; the cursor for the
+next page is returned in the X-Next-Cursor header and is absent on the last
+page.
+"""
+import base64
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query as OrmQuery
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', '50'))
+PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', '200'))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters shared by paginated endpoints."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX)
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def paginate(query: OrmQuery, model, page: PageParams, response: Response) -> List:
+    """
+    Return one newest-first page of query and set the next page's cursor header.
+    model must have created_at and id columns.
+    """
+    if page.cursor:
+        created_at, row_id = decode_cursor(page.cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows
@@ -0,0 +1,140 @@
+"""
+Connection pool instrumentation.
+Tracks checkout wait time, checkout timeouts and idle-based pre-ping for the engines.
+"""
+import threading
+import time
+from typing import Dict, List
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (milliseconds) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class PoolMetrics:
+    """Thread-safe counters for one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.wait_ms_total = 0.0
+        self.wait_histogram: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, wait_ms: float, timed_out: bool) -> None:
+        """Record one checkout attempt."""
+        bucket = len(WAIT_BUCKETS_MS)
+        for index, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                bucket = index
+                break
+
+        with self._lock:
+            self.wait_histogram[bucket] += 1
+            self.wait_ms_total += wait_ms
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def record_ping(self, ok: bool) -> None:
+        """Record one pre-ping round trip."""
+        with self._lock:
+            self.pings += 1
+            if not ok:
+                self.ping_failures += 1
+
+    def snapshot(self) -> Dict:
+        """Return counters as a plain dict."""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_histogram)}
+            histogram["gt_{}ms".format(WAIT_BUCKETS_MS[-1])] = self.wait_histogram[-1]
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "pre_pings": self.pings,
+                "pre_ping_failures": self.ping_failures,
+                "avg_wait_ms": round(self.wait_ms_total / attempts, 3) if attempts else 0.0,
+                "wait_histogram": histogram,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout from the pool queue."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.metrics.record_wait((time.perf_counter() - start) * 1000, timed_out=False)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool with checkout metrics (sync engine)."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout metrics (async engine)."""
+
+
+def install_idle_pre_ping(engine: Engine, idle_seconds: float) -> None:
+    """
+    Ping a connection on checkout only if it sat idle in the pool longer than idle_seconds.
+    Unlike pool_pre_ping, busy connections skip the extra round trip.
+    """
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        last_checkin = connection_record.info.get("last_checkin")
+        if last_checkin is None or time.monotonic() - last_checkin < idle_seconds:
+            return
+
+        metrics = getattr(engine.pool, "metrics", None)
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        except Exception as e:
+            if metrics:
+                metrics.record_ping(ok=False)
+            # The pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError() from e
+        finally:
+            cursor.close()
+        if metrics:
+            metrics.record_ping(ok=True)
+
+
+def pool_status(engine: Engine) -> Dict:
+    """Live pool state plus collected metrics for an engine."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics:
+        status.update(metrics.snapshot())
+    return status
@@ -0,0 +1,168 @@
+"""
+Versioned cache of serialized responses.
+
+Entries are keyed by e.g. restaurant id and stored with the versions of the
+keys they depend on (by default just their own key) at the time loading
+started. bump(key) after a committed write makes every entry loaded before it
+a miss, even one whose load is still running. A TTL bounds staleness for
+writes this process never sees (other workers, Django admin), and total size
+is bounded in bytes with LRU eviction.
+
+Loads are single-flight: concurrent misses for the same key and version
+await one loader instead of all querying the database (see single_flight).
+
+Each body is stored with a strong ETag (a hash of the bytes, so every worker
+derives the same tag for the same content), and conditional requests are
+answered from the cache without touching the database.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence, Tuple
+from fastapi import Response
+from app.utils.single_flight import SingleFlight
+
+# (body, etag)
+CachedBody = Tuple[bytes, str]
+Version = Tuple[int, ...]
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_json_response(cached: CachedBody, if_none_match: Optional[str]) -> Response:
+    """200 with the cached body, or an empty 304 if the client already has it."""
+    body, etag = cached
+    # Per-user authenticated responses: browsers may keep them but must revalidate
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class VersionedResponseCache:
+    """
+    Serialized response bodies per key, bounded by total bytes and a TTL.
+    get_or_load must be used from a single event loop (one per worker
+    process); bump may be called from any thread.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        # key -> (version, expires_at, (body, etag)), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Version, float, CachedBody]]" = OrderedDict()
+        self._versions: Dict[Hashable, int] = {}
+        self._loading = SingleFlight()
+        self._lock = threading.Lock()
+
+    def version(self, keys: Sequence[Hashable]) -> Version:
+        """Current versions of the keys an entry depends on."""
+        return tuple(self._versions.get(key, 0) for key in keys)
+
+    def bump(self, key: Hashable) -> None:
+        """Invalidate key after a committed write."""
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._discard(key)
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[2][0])
+
+    def clear(self) -> None:
+        """Drop every entry (versions are kept, so in-flight loads stay valid)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get(self, key: Hashable, version: Version) -> Optional[CachedBody]:
+        """Cached body and ETag for key if loaded at this version and not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, expires_at, cached = entry
+            if entry_version != version or expires_at <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return cached
+
+    def set(self, key: Hashable, version: Version, depends_on: Sequence[Hashable], cached: CachedBody) -> None:
+        size = len(cached[0])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self.version(depends_on):
+                # Written while loading
+                return
+            self._discard(key)
+            self._entries[key] = (version, time.monotonic() + self.ttl, cached)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, (evicted, _)) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[bytes]],
+        depends_on: Optional[Sequence[Hashable]] = None
+    ) -> CachedBody:
+        """
+        Return the cached body and ETag, await an in-flight load of the same
+        version, or run loader. depends_on lists the keys whose bump()
+        invalidates this entry (default: the entry's own key).
+        """
+        depends_on = (key,) if depends_on is None else tuple(depends_on)
+        version = self.version(depends_on)
+
+        def lookup() -> Optional[CachedBody]:
+            cached = self.get(key, version)
+            if cached is not None:
+                self.hits += 1
+            return cached
+
+        async def load() -> CachedBody:
+            self.misses += 1
+            body = await loader()
+            cached = (body, make_etag(body))
+            self.set(key, version, depends_on, cached)
+            return cached
+
+        return await self._loading.run(key, version, lookup, load)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit counters for this worker process."""
+        with self._lock:
+            entries, size = len(self._entries), self._bytes
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "waits": self._loading.waits,
+            "evictions": self.evictions,
+            "loading": len(self._loading),
+        }
@@ -0,0 +1,82 @@
+"""
+Single-flight calls: concurrent requests for the same key share one run of
+an async function instead of each running it.
+
+Each call is tagged (a request fingerprint, a cache version); only callers
+with the same tag wait for it, and a caller with another tag starts a new
+call that later callers join instead. Before starting or joining, callers
+check for an already stored result with their own lookup.
+
+If the request running the call is cancelled (client went away), its
+waiters look up again and the first one takes over. Work the cancelled
+request started on the threadpool may still finish, so the function must
+tolerate running twice (a duplicate cache load, an idempotent handler).
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """In-flight calls by key. Must be used from a single event loop (one per worker process)."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Tuple[Hashable, asyncio.Future]] = {}
+        self.waits = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def tag(self, key: Hashable) -> Optional[Hashable]:
+        """Tag of the call in flight for key, or None."""
+        call = self._calls.get(key)
+        return None if call is None else call[0]
+
+    async def run(
+        self,
+        key: Hashable,
+        tag: Hashable,
+        lookup: Callable[[], Optional[T]],
+        fn: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Return lookup()'s result if not None, await the in-flight call with
+        the same tag, or run fn (which stores its result for lookup).
+        """
+        while True:
+            found = lookup()
+            if found is not None:
+                return found
+
+            call = self._calls.get(key)
+            if call is None or call[0] != tag:
+                break
+
+            self.waits += 1
+            try:
+                return await asyncio.shield(call[1])
+            except asyncio.CancelledError:
+                # The running request was cancelled: take over.
+                # Re-raise if this request itself is being cancelled.
+                if not call[1].cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = (tag, future)
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # A call with a newer tag may have replaced this one
+            if self._calls.get(key, (None, None))[1] is future:
+                del self._calls[key]
@@ -0,0 +1,75 @@
+"""
+Microbenchmark: per-request auth cost with and without the decoded-token cache.
+
+Usage (from fastapi_core_service/):
+    python -m benchmarks.auth_benchmark --requests 100000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from app.dependencies import auth
+
+
+def make_token(user_id: int) -> str:
+    """Build a SimpleJWT-shaped access token."""
+    payload = {
+        "token_type": "access",
+        "exp": datetime.utcnow() + timedelta(minutes=60),
+        "jti": f"bench-{user_id}",
+        "user_id": user_id,
+        "email": f"user{user_id}@example.com",
+        "role": "Customer",
+        "name": f"User {user_id}",
+    }
+    return jwt.encode(payload, auth.JWT_SECRET_KEY, algorithm=auth.JWT_ALGORITHM)
+
+
+def bench_decode(tokens, requests: int, cached: bool) -> float:
+    """Return microseconds per decode_token call."""
+    auth.JWT_DECODE_CACHE_ENABLED = cached
+    auth.token_cache.clear()
+    start = time.perf_counter()
+    for i in range(requests):
+        auth.decode_token(tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def bench_get_current_user(tokens, requests: int, cached: bool) -> float:
+    """Return microseconds per get_current_user call in claims mode (warm status cache)."""
+    auth.JWT_AUTH_MODE = "claims"
+    auth.JWT_DECODE_CACHE_ENABLED = cached
+    auth.token_cache.clear()
+    for user_id in range(len(tokens)):
+        auth.user_status_cache.set(user_id + 1, True)
+    credentials = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=t) for t in tokens]
+
+    async def run() -> float:
+        start = time.perf_counter()
+        for i in range(requests):
+            await auth.get_current_user(credentials[i % len(credentials)], db=None)
+        return time.perf_counter() - start
+
+    return asyncio.run(run()) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--clients", type=int, default=100, help="distinct tokens in rotation")
+    args = parser.parse_args()
+
+    tokens = [make_token(user_id + 1) for user_id in range(args.clients)]
+
+    print(f"{args.requests} requests over {args.clients} tokens")
+    for label, bench in [("decode_token", bench_decode), ("get_current_user (claims)", bench_get_current_user)]:
+        uncached = bench(tokens, args.requests, cached=False)
+        cached = bench(tokens, args.requests, cached=True)
+        print(f"{label:28s} uncached {uncached:8.2f} us  cached {cached:8.2f} us  speedup {uncached / cached:5.1f}x")
+    print(f"token cache: {auth.token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Shared database fixtures for benchmarks: a statement counter and seed data.
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.models import Dish, Fee, Offer, Restaurant, User
+
+CUSTOMER_ID = 1
+OWNER_ID = 2
+RESTAURANT_ID = 1
+
+
+class QueryCounter:
+    """Counts statements executed on an engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def make_session_factory(database_url: str = "sqlite://"):
+    """Create the schema on database_url and return (engine, session factory)."""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def seed(session_factory, dishes: int) -> None:
+    """Create a customer, an owner, one restaurant with `dishes` dishes, fees and offers."""
+    db = session_factory()
+    db.add_all([
+        User(id=CUSTOMER_ID, name="Customer", email="customer@example.com", password="x",
+             role="Customer", pin_code="110001"),
+        User(id=OWNER_ID, name="Owner", email="owner@example.com", password="x",
+             role="Restaurant Owner", pin_code="110001"),
+    ])
+    db.flush()
+    db.add(Restaurant(id=RESTAURANT_ID, name="Restaurant", owner_id=OWNER_ID, pin_code="110001"))
+    db.flush()
+    db.add_all([
+        Dish(id=i, restaurant_id=RESTAURANT_ID, name=f"Dish {i}", price=f"{i * 10}.50")
+        for i in range(1, dishes + 1)
+    ])
+    db.add_all([
+        Fee(restaurant_id=None, delivery_fee="30.00", platform_fee="5.00"),
+        Fee(restaurant_id=RESTAURANT_ID, delivery_fee="25.00", platform_fee="4.00"),
+        Offer(restaurant_id=RESTAURANT_ID, discount_percentage="12.50", min_order_value="100",
+              first_time_user_only=True),
+        Offer(restaurant_id=None, discount_percentage="5.00", min_order_value="50"),
+    ])
+    db.commit()
+    db.close()
@@ -0,0 +1,156 @@
+"""
+Replay: batch matching versus greedy single-order assignment at peak.
+
+Simulates a line of --zones adjacent pin codes (2 km apart) with --partners-per-zone
+partners each and Poisson order arrivals, where the middle zones get
+--hot-factor times the base rate (a lunch rush downtown). A delivery keeps its
+partner busy for --delivery-seconds plus MATCH_ZONE_HOP_SECONDS per zone
+between the partner's zone and the restaurant's.
+
+Policies:
+- greedy: what assign_delivery_partner does. Every second, each waiting order
+  (oldest first) takes the longest idle partner in its own pin code, if any.
+- batch: every --window seconds, batch_matcher.match_batch over all waiting
+  orders and idle partners, across zones up to MATCH_MAX_ZONE_DISTANCE apart.
+
+Both policies replay the same arrivals. Reports mean and p95 wait until a
+partner is assigned, deliveries completed per hour, orders still waiting at
+the end, and solver time per batch.
+
+Usage (from fastapi_core_service/):
+    python -m benchmarks.matching_replay
+    python -m benchmarks.matching_replay --hours 2 --hot-factor 4 --window 5
+"""
+import argparse
+import heapq
+import statistics
+import time
+from collections import OrderedDict, deque
+import numpy as np
+from app.services.batch_matcher import MATCH_MAX_ZONE_DISTANCE, MATCH_ZONE_HOP_SECONDS, match_batch
+from app.services.zone_index import ZoneIndex
+
+
+def make_arrivals(args, rng):
+    """(arrival second, zone index) for every order, in arrival order."""
+    rates = np.full(args.zones, args.orders_per_zone_hour / 3600.0)
+    hot = slice(args.zones // 2 - args.hot_zones // 2, args.zones // 2 - args.hot_zones // 2 + args.hot_zones)
+    rates[hot] *= args.hot_factor
+    seconds = int(args.hours * 3600)
+    counts = rng.poisson(rates, size=(seconds, args.zones))
+    return [(t, z) for t, z in zip(*np.nonzero(counts)) for _ in range(counts[t, z])]
+
+
+class Replay:
+    def __init__(self, args, pins):
+        self.args = args
+        self.pins = pins
+        self.index = ZoneIndex([(a, b, 2.0) for a, b in zip(pins, pins[1:])],
+                               max_neighbours=2 * MATCH_MAX_ZONE_DISTANCE)
+        self.idle = {pin: OrderedDict() for pin in pins}  # pin -> partners, longest idle first
+        partner = 0
+        for pin in pins:
+            for _ in range(args.partners_per_zone):
+                self.idle[pin][partner] = None
+                partner += 1
+        self.home = {p: pin for pin in pins for p in self.idle[pin]}
+        self.returns = []  # (second free again, partner)
+        self.waiting = deque()  # (order arrival second, pin)
+        self.waits = []
+        self.completed = 0
+        self.solver_ms = []
+
+    def distance(self, a, b):
+        hops = self.index.hops(a, b)
+        return hops if hops is not None and hops <= MATCH_MAX_ZONE_DISTANCE else None
+
+    def assign(self, now, arrival, pin, partner):
+        self.waits.append(now - arrival)
+        hops = self.distance(pin, self.home[partner]) or 0
+        free_at = now + self.args.delivery_seconds + hops * MATCH_ZONE_HOP_SECONDS
+        heapq.heappush(self.returns, (free_at, partner))
+
+    def release(self, now):
+        while self.returns and self.returns[0][0] <= now:
+            _, partner = heapq.heappop(self.returns)
+            self.idle[self.home[partner]][partner] = None
+            self.completed += 1
+
+    def greedy(self, now):
+        still_waiting = deque()
+        for arrival, pin in self.waiting:
+            if self.idle[pin]:
+                partner, _ = self.idle[pin].popitem(last=False)
+                self.assign(now, arrival, pin, partner)
+            else:
+                still_waiting.append((arrival, pin))
+        self.waiting = still_waiting
+
+    def batch(self, now):
+        if now % self.args.window or not self.waiting:
+            return
+        partners, partner_pins, partner_idle = [], [], []
+        for pin, queue in self.idle.items():
+            for rank, partner in enumerate(queue):
+                partners.append(partner)
+                partner_pins.append(pin)
+                partner_idle.append(len(queue) - rank)
+        orders = list(self.waiting)
+        start = time.perf_counter()
+        pairs = match_batch([pin for _, pin in orders], [now - arrival for arrival, _ in orders],
+                            partner_pins, partner_idle, self.distance)
+        self.solver_ms.append((time.perf_counter() - start) * 1000)
+        matched = set()
+        for i, j in pairs:
+            arrival, pin = orders[i]
+            partner = partners[j]
+            del self.idle[partner_pins[j]][partner]
+            self.assign(now, arrival, pin, partner)
+            matched.add(i)
+        self.waiting = deque(order for i, order in enumerate(orders) if i not in matched)
+
+    def run(self, arrivals, policy):
+        step = self.greedy if policy == "greedy" else self.batch
+        end = int(self.args.hours * 3600)
+        arrivals = deque(arrivals)
+        for now in range(end):
+            self.release(now)
+            while arrivals and arrivals[0][0] == now:
+                self.waiting.append((now, self.pins[arrivals.popleft()[1]]))
+            step(now)
+        return self
+
+
+def report(name, replay, args, total_orders):
+    waits = sorted(replay.waits)
+    p95 = waits[int(len(waits) * 0.95) - 1] if waits else 0
+    solver = f"  solver {statistics.mean(replay.solver_ms):.2f} ms/batch (max {max(replay.solver_ms):.1f})" \
+        if replay.solver_ms else ""
+    print(f"{name:<7} wait (assigned) mean {statistics.mean(waits):7.1f}s  p95 {p95:6.0f}s  "
+          f"deliveries/h {replay.completed / args.hours:7.0f}  "
+          f"assigned {len(waits)}/{total_orders}  still waiting {len(replay.waiting)}{solver}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", type=int, default=9)
+    parser.add_argument("--partners-per-zone", type=int, default=12)
+    parser.add_argument("--orders-per-zone-hour", type=float, default=15)
+    parser.add_argument("--hot-zones", type=int, default=3)
+    parser.add_argument("--hot-factor", type=float, default=3)
+    parser.add_argument("--delivery-seconds", type=int, default=1800)
+    parser.add_argument("--window", type=int, default=5, help="batch window in seconds")
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    pins = [str(560001 + z) for z in range(args.zones)]
+    arrivals = make_arrivals(args, np.random.default_rng(args.seed))
+    print(f"{len(arrivals)} orders over {args.hours}h, {args.zones} zones x {args.partners_per_zone} partners, "
+          f"{args.hot_zones} hot zones at {args.hot_factor}x, batch window {args.window}s")
+    report("greedy", Replay(args, pins).run(arrivals, "greedy"), args, len(arrivals))
+    report("batch", Replay(args, pins).run(arrivals, "batch"), args, len(arrivals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Money (integer paise) vs. the Decimal pricing math it replaced.
+
+Times both versions of the cart view and checkout pricing math for one
+cart. That both give identical results is checked by tests/test_money.py.
+
+Usage (from fastapi_core_service/):
+    python -m benchmarks.money_benchmark --lines 20
+"""
+import argparse
+import random
+import timeit
+from decimal import Decimal
+from app.services import offer_service, order_service
+from app.services.pricing_index import OfferRule
+from app.utils.money import ZERO, to_basis_points, to_decimal, to_money
+
+
+# The Decimal formulas of cart_service.get_cart, offer_service.calculate_discount
+# and order_service.calculate_order_total before pricing moved to paise
+def decimal_cart(prices, quantities):
+    lines = []
+    subtotal = Decimal("0.00")
+    for price, quantity in zip(prices, quantities):
+        line = price * quantity
+        lines.append(line)
+        subtotal += line
+    return lines, subtotal
+
+
+def decimal_discount(percentage, order_amount):
+    if percentage is None:
+        return Decimal("0.00")
+    return round((order_amount * percentage) / Decimal("100"), 2)
+
+
+def decimal_total(items_total, discount, delivery_fee, platform_fee):
+    return round(items_total - discount + delivery_fee + platform_fee, 2)
+
+
+def money_cart(prices_paise, quantities):
+    """cart_service.get_cart's math on Dish.price_paise."""
+    lines = []
+    subtotal = ZERO
+    for price, quantity in zip(prices_paise, quantities):
+        line = price * quantity
+        lines.append(to_decimal(line))
+        subtotal += line
+    return lines, subtotal
+
+
+def offer(percentage):
+    if percentage is None:
+        return None
+    return OfferRule(1, None, to_basis_points(percentage), ZERO, False)
+
+
+def amount(rng: random.Random, high: int) -> Decimal:
+    return to_decimal(rng.choice([rng.randint(0, high), rng.randint(0, 10000)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20, help="cart lines in the timed cart")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    # Prices come from the database and fees from the pricing index, both
+    # already in the representation each version uses.
+    prices = [amount(rng, 100000) for _ in range(args.lines)]
+    prices_paise = [to_money(price) for price in prices]
+    quantities = [rng.randint(1, 5) for _ in range(args.lines)]
+    percentage = Decimal("12.50")
+    rule = offer(percentage)
+    fees = (Decimal("30.00"), Decimal("5.00"))
+    fee_paise = (3000, 500)
+
+    # Cart view (get_cart): every line and the subtotal leave as Decimals
+    def cart_decimal():
+        return decimal_cart(prices, quantities)
+
+    def cart_money():
+        lines, subtotal = money_cart(prices_paise, quantities)
+        return lines, to_decimal(subtotal)
+
+    # Checkout: subtotal, best-offer discount and total; only the order row gets Decimals
+    def checkout_decimal():
+        subtotal = Decimal("0.00")
+        for price, quantity in zip(prices, quantities):
+            subtotal += price * quantity
+        discount = decimal_discount(percentage, subtotal)
+        return subtotal, discount, decimal_total(subtotal, discount, *fees)
+
+    def checkout_money():
+        subtotal = ZERO
+        for price, quantity in zip(prices_paise, quantities):
+            subtotal += price * quantity
+        discount = offer_service.calculate_discount(rule, subtotal)
+        total = order_service.calculate_order_total(subtotal, discount, *fee_paise)
+        return to_decimal(subtotal), to_decimal(discount), to_decimal(total)
+
+    print(f"pricing math per cart, {args.lines} lines (min of 5 runs):")
+    for scenario, decimal_version, money_version in [
+        ("cart view", cart_decimal, cart_money), ("checkout", checkout_decimal, checkout_money)
+    ]:
+        assert decimal_version() == money_version()
+        timings = [
+            min(timeit.repeat(function, number=2000, repeat=5)) / 2000 * 1e6
+            for function in (decimal_version, money_version)
+        ]
+        print(f"  {scenario:10s} Decimal {timings[0]:7.2f} us   paise {timings[1]:7.2f} us   "
+              f"({timings[0] / timings[1]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Batch quote engine vs. the per-item checkout pricing path.
+
+Seeds restaurants with random offers and fees plus customers with and
+without orders, quotes random (restaurant, subtotal, customer) tuples both
+ways, and fails unless every offer, discount, fee and total is identical.
+
+Usage (from fastapi_core_service/):
+    python -m benchmarks.quote_benchmark --quotes 5000 --restaurants 500
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+from app.models.models import CustomerStats, Fee, Offer, Order, Restaurant, User
+from app.services import offer_service, order_service
+from app.services.pricing_index import pricing_index
+from app.services.quote_engine import quote_engine
+from app.utils.money import to_decimal
+from benchmarks.fixtures import make_session_factory
+
+OWNER_ID = 1
+
+
+def cents(rng: random.Random, low: int, high: int) -> Decimal:
+    return to_decimal(rng.randint(low, high))
+
+
+def seed(session_factory, rng: random.Random, restaurants: int, customers: int) -> None:
+    db = session_factory()
+    db.add(User(id=OWNER_ID, name="Owner", email="owner@example.com", password="x",
+                role="Restaurant Owner", pin_code="110001"))
+    db.add_all([
+        User(id=customer_id, name=f"Customer {customer_id}", email=f"c{customer_id}@example.com",
+             password="x", role="Customer", pin_code="110001")
+        for customer_id in range(2, customers + 2)
+    ])
+    db.add_all([
+        Restaurant(id=restaurant_id, name=f"Restaurant {restaurant_id}", owner_id=OWNER_ID, pin_code="110001")
+        for restaurant_id in range(1, restaurants + 1)
+    ])
+    db.flush()
+
+    # Platform offers and fees, then a random mix per restaurant
+    db.add_all([
+        Offer(restaurant_id=None, discount_percentage=cents(rng, 100, 2000),
+              min_order_value=cents(rng, 0, 50000), first_time_user_only=rng.random() < 0.3)
+        for _ in range(4)
+    ])
+    db.add(Fee(restaurant_id=None, delivery_fee="30.00", platform_fee="5.00"))
+    for restaurant_id in range(1, restaurants + 1):
+        for _ in range(rng.choice([0, 0, 1, 2, 3])):
+            db.add(Offer(restaurant_id=restaurant_id, discount_percentage=cents(rng, 50, 5000),
+                         min_order_value=cents(rng, 0, 100000), first_time_user_only=rng.random() < 0.25,
+                         active=rng.random() < 0.9))
+        if rng.random() < 0.4:
+            db.add(Fee(restaurant_id=restaurant_id, delivery_fee=cents(rng, 0, 6000),
+                       platform_fee=cents(rng, 0, 1000)))
+
+    # Customers: counters with and without orders, and no counters (pre-backfill) with and without orders
+    for customer_id in range(2, customers + 2):
+        kind = rng.randrange(4)
+        if kind < 2:
+            db.add(CustomerStats(customer_id=customer_id, order_count=kind * rng.randint(1, 5),
+                                 lifetime_spend=0))
+        elif kind == 3:
+            db.add(Order(customer_id=customer_id, restaurant_id=1, status=rng.choice(["delivered", "cancelled"]),
+                         total_amount="100.00", discount_amount="0.00", delivery_fee="30.00",
+                         platform_fee="5.00", payment_mode="cash"))
+    db.commit()
+    db.close()
+
+
+def scalar_quote(db, restaurant_id: int, subtotal: int, customer_id: int):
+    """The checkout path, one tuple at a time."""
+    offer = offer_service.get_best_offer(db, customer_id, restaurant_id, subtotal)
+    discount = offer_service.calculate_discount(offer, subtotal)
+    delivery_fee, platform_fee = order_service.get_fees(db, restaurant_id)
+    total = order_service.calculate_order_total(subtotal, discount, delivery_fee, platform_fee)
+    return offer.id if offer else None, discount, delivery_fee, platform_fee, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quotes", type=int, default=5000)
+    parser.add_argument("--restaurants", type=int, default=500)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engine, session_factory = make_session_factory(args.database_url)
+    seed(session_factory, rng, args.restaurants, args.customers)
+    pricing_index.bump()
+
+    # Include restaurants without rows and subtotals on offer thresholds / rounding ties
+    restaurant_ids = [rng.randint(1, args.restaurants + 20) for _ in range(args.quotes)]
+    subtotals = [rng.choice([rng.randint(0, 150000), rng.randint(1, 400) * 4, 50000]) for _ in range(args.quotes)]
+    customer_ids = [rng.randint(2, args.customers + 1) for _ in range(args.quotes)]
+
+    db = session_factory()
+    quote_engine.compiled(db)  # Load the index outside both timings
+    start = time.perf_counter()
+    expected = [
+        scalar_quote(db, restaurant_id, subtotal, customer_id)
+        for restaurant_id, subtotal, customer_id in zip(restaurant_ids, subtotals, customer_ids)
+    ]
+    scalar_seconds = time.perf_counter() - start
+    db.close()
+
+    db = session_factory()
+    start = time.perf_counter()
+    quotes = quote_engine.quote(db, restaurant_ids, subtotals, customer_ids)
+    batch_seconds = time.perf_counter() - start
+    db.close()
+
+    mismatches = 0
+    offers = 0
+    for i, (offer_id, discount, delivery_fee, platform_fee, total) in enumerate(expected):
+        batch = (
+            int(quotes.offer_id[i]) if quotes.offer_id[i] >= 0 else None,
+            int(quotes.discount[i]), int(quotes.delivery_fee[i]), int(quotes.platform_fee[i]), int(quotes.total[i])
+        )
+        scalar = (offer_id, discount, delivery_fee, platform_fee, total)
+        offers += offer_id is not None
+        if batch != scalar:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"mismatch: restaurant {restaurant_ids[i]} subtotal {subtotals[i]} "
+                      f"customer {customer_ids[i]}: scalar {scalar} batch {batch}")
+
+    print(f"{args.quotes} quotes, {args.restaurants} restaurants, {offers} with an offer "
+          f"({engine.dialect.name})")
+    print(f"per-item path: {scalar_seconds * 1000:9.1f} ms  ({scalar_seconds / args.quotes * 1e6:7.1f} us/quote)")
+    print(f"batch engine:  {batch_seconds * 1000:9.1f} ms  ({batch_seconds / args.quotes * 1e6:7.1f} us/quote)")
+    print(f"speedup: {scalar_seconds / batch_seconds:.0f}x")
+    if mismatches:
+        raise SystemExit(f"{mismatches} quotes differ from the per-item path")
+    print("OK: identical to the per-item path")
+
+
+if __name__ == "__main__":
+    main()
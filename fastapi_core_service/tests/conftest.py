@@ -0,0 +1,158 @@
+"""
+Shared test setup.
+
+The app reads its configuration at import time, so the environment is set
+here before anything from app is imported: a SQLite file as the primary, a
+second SQLite file as the read replica, the sync request path and the
+in-memory cart store. Every test starts with empty tables on both databases
+and empty per-process caches.
+
+Run from fastapi_core_service/:
+    python -m pytest
+"""
+import os
+import tempfile
+import time
+
+_DB_DIR = tempfile.mkdtemp(prefix="core-service-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_DB_DIR}/primary.db",
+    "REPLICA_DATABASE_URL": f"sqlite:///{_DB_DIR}/replica.db",
+    "DB_ASYNC_ENABLED": "false",
+    "JWT_AUTH_MODE": "db",
+    "CART_STORE": "memory",
+    "ORDER_STREAM_BROKER": "memory",
+    "BATCH_MATCHER_ENABLED": "false",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event
+from app import database
+from app.database import Base, ReplicaSessionLocal, SessionLocal
+from app.dependencies import auth, read_routing
+from app.main import app
+from app.routers import customer
+from app.models.models import DeliveryPartner, Dish, Fee, Restaurant, User
+from app.services import cart_service
+from app.services.cart_store import InMemoryCartStore
+from app.services.menu_service import menu_cache
+from app.services.partner_dispatcher import partner_dispatcher
+from app.services.pricing_index import pricing_index
+from app.services.restaurant_service import restaurant_list_cache
+from app.utils.idempotency import IdempotencyStore
+
+CUSTOMER_ID = 1
+OWNER_ID = 2
+PARTNER_ID = 3
+RESTAURANT_ID = 1
+PIN_CODE = "110001"
+
+
+class StatementCounter:
+    """Counts statements executed on an engine while attached."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def seed(session_factory, dishes: int = 2) -> None:
+    """A customer, an owner, a delivery partner, one restaurant with dishes, and fees."""
+    db = session_factory()
+    db.add_all([
+        User(id=CUSTOMER_ID, name="Customer", email="customer@example.com", password="x",
+             role="Customer", pin_code=PIN_CODE),
+        User(id=OWNER_ID, name="Owner", email="owner@example.com", password="x",
+             role="Restaurant Owner", pin_code=PIN_CODE),
+        User(id=PARTNER_ID, name="Partner", email="partner@example.com", password="x",
+             role="Delivery Partner", pin_code=PIN_CODE),
+    ])
+    db.flush()
+    db.add(Restaurant(id=RESTAURANT_ID, name="Restaurant", owner_id=OWNER_ID, pin_code=PIN_CODE))
+    db.add(DeliveryPartner(user_id=PARTNER_ID, pin_code=PIN_CODE, available=True))
+    db.flush()
+    db.add_all([
+        Dish(id=i, restaurant_id=RESTAURANT_ID, name=f"Dish {i}", price=f"{i * 10}.50")
+        for i in range(1, dishes + 1)
+    ])
+    db.add(Fee(restaurant_id=None, delivery_fee="30.00", platform_fee="5.00"))
+    db.commit()
+    db.close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    for bind in {database.engine, database.replica_engine}:
+        Base.metadata.drop_all(bind)
+        Base.metadata.create_all(bind)
+    monkeypatch.setattr(cart_service, "cart_store", InMemoryCartStore())
+    monkeypatch.setattr(customer, "checkout_idempotency", IdempotencyStore())
+    pricing_index.bump()
+    menu_cache.clear()
+    restaurant_list_cache.clear()
+    monkeypatch.setattr(partner_dispatcher, "loaded_at", None)
+    auth.token_cache.clear()
+    auth.user_status_cache.clear()
+    read_routing._recent_writes.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def replica_db():
+    session = ReplicaSessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def seeded():
+    seed(SessionLocal)
+
+
+@pytest.fixture
+def client():
+    # Without the context manager, so the app's background workers are not started
+    return TestClient(app)
+
+
+def auth_headers(user_id: int, role: str) -> dict:
+    token = jwt.encode(
+        {"user_id": user_id, "role": role, "exp": time.time() + 3600},
+        auth.JWT_SECRET_KEY, algorithm=auth.JWT_ALGORITHM
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def customer_headers():
+    return auth_headers(CUSTOMER_ID, "Customer")
+
+
+@pytest.fixture
+def owner_headers():
+    return auth_headers(OWNER_ID, "Restaurant Owner")
+
+
+@pytest.fixture
+def partner_headers():
+    return auth_headers(PARTNER_ID, "Delivery Partner")
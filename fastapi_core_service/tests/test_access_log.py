@@ -0,0 +1,25 @@
+"""
+Access log: bearer tokens passed to the stream endpoints as ?token= are
+masked before uvicorn writes the request line.
+"""
+import logging
+from app.main import RedactTokenFilter
+
+
+def access_record(path: str) -> logging.LogRecord:
+    return logging.LogRecord(
+        "uvicorn.access", logging.INFO, __file__, 0, '%s - "%s %s HTTP/%s" %d',
+        ("127.0.0.1:5000", "GET", path, "1.1", 200), None
+    )
+
+
+def test_token_is_redacted():
+    record = access_record("/api/stream/orders?token=eyJhbGciOi.payload.sig&last=3")
+    assert RedactTokenFilter().filter(record)
+    assert record.getMessage() == '127.0.0.1:5000 - "GET /api/stream/orders?token=[redacted]&last=3 HTTP/1.1" 200'
+
+
+def test_other_paths_are_unchanged():
+    record = access_record("/api/customer/orders?cursor=abc")
+    assert RedactTokenFilter().filter(record)
+    assert record.getMessage() == '127.0.0.1:5000 - "GET /api/customer/orders?cursor=abc HTTP/1.1" 200'
@@ -0,0 +1,99 @@
+"""
+Batch matcher: the Hungarian solver finds a minimum-cost assignment
+(checked against brute force), every pair match_once claims is recorded
+as an order_assigned event in the same transaction, and partners that turn
+out to be booked already are dropped from the dispatcher.
+"""
+import itertools
+import random
+import numpy as np
+import pytest
+from app.database import SessionLocal
+from app.models.models import DeliveryPartner, Order, OrderEvent, OrderStatus, User
+from app.services.batch_matcher import FORBIDDEN, BatchMatcher, solve_assignment
+from app.services.order_events import ORDER_ASSIGNED
+from app.services.partner_dispatcher import partner_dispatcher
+from tests.conftest import CUSTOMER_ID, OWNER_ID, PARTNER_ID, PIN_CODE, RESTAURANT_ID
+
+MATRICES = 3000
+
+
+def brute_force_cost(cost: np.ndarray) -> float:
+    """Minimum total cost over every way to match the smaller side."""
+    if cost.shape[0] > cost.shape[1]:
+        cost = cost.T
+    rows, columns = cost.shape
+    return min(
+        sum(cost[row, column] for row, column in zip(range(rows), chosen))
+        for chosen in itertools.permutations(range(columns), rows)
+    )
+
+
+def test_solver_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(MATRICES):
+        rows, columns = rng.randint(1, 5), rng.randint(1, 5)
+        cost = np.array([
+            [rng.choice([FORBIDDEN, rng.uniform(-600, 900), float(rng.randint(0, 3))]) for _ in range(columns)]
+            for _ in range(rows)
+        ])
+        pairs = solve_assignment(cost)
+
+        assert len(pairs) == min(rows, columns)
+        assert len({row for row, _ in pairs}) == len({column for _, column in pairs}) == len(pairs)
+        assert sum(cost[row, column] for row, column in pairs) == pytest.approx(brute_force_cost(cost), rel=0, abs=1e-2)
+
+
+def test_empty_matrix():
+    assert solve_assignment(np.zeros((0, 3))) == []
+
+
+def add_preparing_order(db) -> Order:
+    order = Order(
+        customer_id=CUSTOMER_ID, restaurant_id=RESTAURANT_ID, status=OrderStatus.PREPARING.value,
+        total_amount="100.00", discount_amount="0.00", delivery_fee="30.00", platform_fee="5.00",
+        payment_mode="cash"
+    )
+    db.add(order)
+    db.commit()
+    return order
+
+
+def test_match_once_records_the_assignment(db, seeded):
+    order = add_preparing_order(db)
+
+    matcher = BatchMatcher(session_factory=SessionLocal, distance=lambda a, b: 0 if a == b else None)
+    assert matcher.match_once() == 1
+
+    db.expire_all()
+    assert db.get(Order, order.id).delivery_partner_id == PARTNER_ID
+    assert not db.query(DeliveryPartner.available).filter(DeliveryPartner.user_id == PARTNER_ID).scalar()
+    event = db.query(OrderEvent).one()
+    assert event.event_type == ORDER_ASSIGNED
+    assert event.payload == {
+        "order_id": order.id, "customer_id": CUSTOMER_ID, "restaurant_owner_id": OWNER_ID,
+        "delivery_partner_id": PARTNER_ID, "status": OrderStatus.PREPARING.value
+    }
+
+
+def test_match_once_drops_partners_booked_by_another_process(db, seeded, monkeypatch):
+    monkeypatch.setattr(partner_dispatcher, "enabled", True)
+    other_id = PARTNER_ID + 1
+    db.add(User(id=other_id, name="Partner 2", email="partner2@example.com", password="x",
+                role="Delivery Partner", pin_code=PIN_CODE))
+    db.add(DeliveryPartner(user_id=other_id, pin_code=PIN_CODE, available=True))
+    db.commit()
+    partner_dispatcher.load(db)
+    # Booked by another worker process after this one loaded its queues
+    db.query(DeliveryPartner).filter(DeliveryPartner.user_id == PARTNER_ID).update({"available": False})
+    db.commit()
+    order = add_preparing_order(db)
+
+    matcher = BatchMatcher(session_factory=SessionLocal, distance=lambda a, b: 0 if a == b else None)
+    assert matcher.match_once() == 0
+    assert matcher.conflicts == 1
+    assert partner_dispatcher.snapshot() == {PIN_CODE: [other_id]}
+
+    assert matcher.match_once() == 1
+    db.expire_all()
+    assert db.get(Order, order.id).delivery_partner_id == other_id
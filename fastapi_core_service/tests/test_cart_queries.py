@@ -0,0 +1,45 @@
+"""
+Cart pricing and checkout validation load dishes and the restaurant in a
+fixed number of statements, whatever the number of items in the cart.
+"""
+import pytest
+from app import database
+from app.database import SessionLocal
+from app.services import cart_service
+from app.services.cart_store import InMemoryCartStore
+from tests.conftest import CUSTOMER_ID, StatementCounter, seed
+
+ITEMS = 20
+
+
+def measure(items: int) -> dict:
+    """Statements per operation for a cart with `items` dishes."""
+    cart_service.cart_store = InMemoryCartStore()
+    counts = {}
+
+    db = SessionLocal()
+    for dish_id in range(1, items):
+        cart_service.add_to_cart(CUSTOMER_ID, dish_id, 1, db)
+    db.close()
+
+    operations = [
+        ("add_to_cart", lambda db: cart_service.add_to_cart(CUSTOMER_ID, items, 2, db)),
+        ("get_cart", lambda db: cart_service.get_cart(CUSTOMER_ID, db)),
+        ("remove_from_cart", lambda db: cart_service.remove_from_cart(CUSTOMER_ID, items, db)),
+        ("validate_and_price", lambda db: (
+            cart_service.validate_cart_for_checkout(CUSTOMER_ID, db), cart_service.get_cart(CUSTOMER_ID, db)
+        )),
+    ]
+    for operation, run in operations:
+        db = SessionLocal()
+        with StatementCounter(database.engine) as counter:
+            run(db)
+        counts[operation] = counter.count
+        db.close()
+    return counts
+
+
+@pytest.mark.parametrize("operation", ["add_to_cart", "get_cart", "remove_from_cart", "validate_and_price"])
+def test_query_count_is_constant_in_cart_size(operation):
+    seed(SessionLocal, ITEMS)
+    assert measure(ITEMS)[operation] == measure(2)[operation]
@@ -0,0 +1,58 @@
+"""
+Cart store backends: update() is an atomic read-modify-write, so concurrent
+adds for one user (threads here, workers in production) never lose items.
+"""
+import threading
+import pytest
+from fastapi import HTTPException
+from app.services.cart_store import InMemoryCartStore, SQLiteCartStore
+
+THREADS = 8
+ADDS_PER_THREAD = 50
+
+
+def add_one(cart):
+    if cart is None:
+        cart = {"restaurant_id": 1, "items": {}}
+    cart["items"][1] = cart["items"].get(1, 0) + 1
+    return cart
+
+
+def add_concurrently(stores):
+    def worker(store):
+        for _ in range(ADDS_PER_THREAD):
+            store.update(1, add_one)
+
+    threads = [threading.Thread(target=worker, args=(stores[i % len(stores)],)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_memory_store_updates_are_atomic():
+    store = InMemoryCartStore()
+    add_concurrently([store])
+    assert store.get(1)["items"][1] == THREADS * ADDS_PER_THREAD
+
+
+def test_sqlite_store_updates_are_atomic_across_instances(tmp_path):
+    # Two stores on one file stand in for two workers
+    path = str(tmp_path / "carts.db")
+    stores = [SQLiteCartStore(path=path), SQLiteCartStore(path=path)]
+    add_concurrently(stores)
+    assert stores[0].get(1)["items"][1] == THREADS * ADDS_PER_THREAD
+
+
+@pytest.mark.parametrize("make_store", [InMemoryCartStore, lambda: SQLiteCartStore(path=":memory:")])
+def test_failed_update_leaves_the_cart_unchanged(make_store):
+    store = make_store()
+    store.set(1, {"restaurant_id": 1, "items": {1: 2}})
+
+    def reject(cart):
+        cart["items"][1] = 99
+        raise HTTPException(status_code=400, detail="rejected")
+
+    with pytest.raises(HTTPException):
+        store.update(1, reject)
+    assert store.get(1) == {"restaurant_id": 1, "items": {1: 2}}
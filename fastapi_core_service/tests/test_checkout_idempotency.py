@@ -0,0 +1,85 @@
+"""
+Checkout Idempotency-Key: the key is stored on the order under a unique
+(customer_id, idempotency_key) constraint, so a retry places no second order
+even when it reaches another worker (a fresh per-process store here).
+"""
+from app.database import SessionLocal
+from app.models.models import Order
+from app.routers import customer
+from app.schemas.schemas import CheckoutRequest
+from app.services import cart_service, order_service
+from app.utils.idempotency import IdempotencyStore, fingerprint
+from tests.conftest import CUSTOMER_ID
+
+KEY = "checkout-1"
+
+
+def fill_cart(db) -> None:
+    cart_service.add_to_cart(CUSTOMER_ID, 1, 2, db)
+
+
+def checkout(client, headers, payment_mode="cash"):
+    return client.post(
+        "/api/checkout", json={"payment_mode": payment_mode}, headers={**headers, "Idempotency-Key": KEY}
+    )
+
+
+def order_count(db) -> int:
+    return db.query(Order).count()
+
+
+def test_retry_on_another_worker_returns_the_same_order(client, customer_headers, seeded, db, monkeypatch):
+    fill_cart(db)
+    first = checkout(client, customer_headers)
+    assert first.status_code == 200
+
+    # Another worker: its per-process store has never seen the key
+    monkeypatch.setattr(customer, "checkout_idempotency", IdempotencyStore())
+    retry = checkout(client, customer_headers)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert order_count(db) == 1
+
+
+def test_key_reused_with_another_body_is_rejected(client, customer_headers, seeded, db, monkeypatch):
+    fill_cart(db)
+    assert checkout(client, customer_headers).status_code == 200
+
+    monkeypatch.setattr(customer, "checkout_idempotency", IdempotencyStore())
+    assert checkout(client, customer_headers, payment_mode="upi").status_code == 422
+    assert order_count(db) == 1
+
+
+def test_concurrent_duplicate_returns_the_committed_order(seeded, db, monkeypatch):
+    request = CheckoutRequest(payment_mode="cash")
+    request_fingerprint = fingerprint(request.model_dump_json())
+    fill_cart(db)
+    first = order_service.create_order_from_cart(db, CUSTOMER_ID, request, KEY, request_fingerprint)
+
+    # The duplicate checked for the key before the first one committed
+    fill_cart(db)
+    find = order_service.find_idempotent_order
+    calls = []
+
+    def find_after_race(*args, **kwargs):
+        calls.append(kwargs)
+        return None if len(calls) == 1 else find(*args, **kwargs)
+
+    monkeypatch.setattr(order_service, "find_idempotent_order", find_after_race)
+    other = SessionLocal()
+    try:
+        duplicate = order_service.create_order_from_cart(other, CUSTOMER_ID, request, KEY, request_fingerprint)
+    finally:
+        other.close()
+
+    # Only the read after the duplicate key locks (no gap lock on a missing key)
+    assert calls == [{}, {"latest": True}]
+    assert duplicate.id == first.id
+    assert order_count(db) == 1
+
+
+def test_checkout_without_key_is_not_deduplicated(client, customer_headers, seeded, db):
+    for _ in range(2):
+        fill_cart(db)
+        assert client.post("/api/checkout", json={"payment_mode": "cash"}, headers=customer_headers).status_code == 200
+    assert order_count(db) == 2
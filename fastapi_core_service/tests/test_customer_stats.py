@@ -0,0 +1,88 @@
+"""
+customer_stats counters: rows created on checkout or cancellation include
+the customer's earlier orders, so legacy customers (orders placed before the
+table existed) are never mistaken for first-time customers.
+"""
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import event
+from app.database import engine
+from app.models.models import CustomerStats, Order, OrderStatus
+from app.services import customer_stats
+from tests.conftest import CUSTOMER_ID, RESTAURANT_ID
+
+
+def place_order(db, total: str, record: bool = True) -> Order:
+    order = Order(
+        customer_id=CUSTOMER_ID, restaurant_id=RESTAURANT_ID, status=OrderStatus.PLACED.value,
+        total_amount=Decimal(total), discount_amount="0.00", delivery_fee="30.00", platform_fee="5.00",
+        payment_mode="cod", created_at=datetime(2026, 1, 1)
+    )
+    db.add(order)
+    db.flush()
+    if record:
+        customer_stats.record_order_placed(db, CUSTOMER_ID, order.total_amount, order.created_at)
+    db.commit()
+    return order
+
+
+def cancel_order(db, order: Order) -> None:
+    order.status = OrderStatus.CANCELLED.value
+    db.flush()
+    customer_stats.record_order_cancelled(db, CUSTOMER_ID, order.total_amount)
+    db.commit()
+
+
+def stats(db) -> tuple:
+    row = db.get(CustomerStats, CUSTOMER_ID, populate_existing=True)
+    return row.order_count, row.lifetime_spend
+
+
+def test_new_customer(db, seeded):
+    assert customer_stats.is_first_time_customer(db, CUSTOMER_ID)
+    order = place_order(db, "100.00")
+    assert stats(db) == (1, Decimal("100.00"))
+    assert not customer_stats.is_first_time_customer(db, CUSTOMER_ID)
+
+    cancel_order(db, order)
+    assert stats(db) == (0, Decimal("0.00"))
+    assert customer_stats.is_first_time_customer(db, CUSTOMER_ID)
+
+
+def test_legacy_customer_keeps_earlier_orders_when_a_new_order_is_cancelled(db, seeded):
+    place_order(db, "50.00", record=False)
+    order = place_order(db, "100.00")
+    assert stats(db) == (2, Decimal("150.00"))
+
+    cancel_order(db, order)
+    assert stats(db) == (1, Decimal("50.00"))
+    assert not customer_stats.is_first_time_customer(db, CUSTOMER_ID)
+
+
+def test_legacy_customer_row_created_on_cancellation(db, seeded):
+    place_order(db, "50.00", record=False)
+    order = place_order(db, "100.00", record=False)
+
+    cancel_order(db, order)
+    assert stats(db) == (1, Decimal("50.00"))
+    assert not customer_stats.is_first_time_customer(db, CUSTOMER_ID)
+
+
+def test_existing_row_is_updated_without_reading_orders(db, seeded):
+    place_order(db, "50.00")
+    statements = []
+
+    def on_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        order = place_order(db, "100.00")
+        cancel_order(db, order)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+    touching_stats = [s for s in statements if "customer_stats" in s]
+    assert touching_stats
+    assert not [s for s in touching_stats if "FROM orders" in s]
+    assert stats(db) == (1, Decimal("50.00"))
@@ -0,0 +1,43 @@
+"""
+assign_delivery_partner claims a partner in a session of its own, so its
+commits and rollbacks never affect the caller's transaction.
+"""
+from app.models.models import Complaint, DeliveryPartner, Order, OrderStatus
+from app.services import delivery_service
+from app.services.partner_dispatcher import partner_dispatcher
+from tests.conftest import CUSTOMER_ID, PARTNER_ID, RESTAURANT_ID
+
+
+def available(db) -> bool:
+    db.expire_all()
+    return db.query(DeliveryPartner.available).filter(DeliveryPartner.user_id == PARTNER_ID).scalar()
+
+
+def test_assigns_without_touching_the_callers_transaction(db, seeded, monkeypatch):
+    monkeypatch.setattr(partner_dispatcher, "enabled", False)
+    order = Order(
+        customer_id=CUSTOMER_ID, restaurant_id=RESTAURANT_ID, status=OrderStatus.PREPARING.value,
+        total_amount="100.00", discount_amount="0.00", delivery_fee="30.00", platform_fee="5.00",
+        payment_mode="cash"
+    )
+    db.add(order)
+    db.commit()
+    # The caller's transaction: a read and a pending (not yet flushed) write
+    assert db.get(Order, order.id).status == OrderStatus.PREPARING.value
+    complaint = Complaint(order_id=order.id, customer_id=CUSTOMER_ID, description="Late", status="open")
+    db.add(complaint)
+
+    assert delivery_service.assign_delivery_partner(RESTAURANT_ID) == PARTNER_ID
+    # Nobody left: ends its own transaction, not the caller's
+    assert delivery_service.assign_delivery_partner(RESTAURANT_ID) is None
+
+    assert complaint in db.new
+    db.commit()
+    assert db.query(Complaint).count() == 1
+    assert not available(db)
+
+
+def test_assigns_from_the_dispatcher(db, seeded):
+    assert partner_dispatcher.enabled
+    assert delivery_service.assign_delivery_partner(RESTAURANT_ID) == PARTNER_ID
+    assert not available(db)
@@ -0,0 +1,57 @@
+"""
+Concurrent assign_delivery_partner calls, each on its own session, never
+hand out the same partner twice, from the dispatcher or from the table
+(the pytest counterpart of benchmarks/dispatch_stress.py).
+"""
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.database import SessionLocal
+from app.models.models import DeliveryPartner, User
+from app.services import delivery_service
+from app.services.partner_dispatcher import partner_dispatcher
+from tests.conftest import PARTNER_ID, PIN_CODE, RESTAURANT_ID
+
+THREADS = 8
+PARTNERS = 12
+# More calls than partners, so the last ones find nobody
+CALLS_PER_THREAD = 3
+
+
+def seed_partners(db) -> None:
+    """PARTNERS - 1 more available partners next to the seeded one."""
+    first_id = PARTNER_ID + 100
+    db.add_all([
+        User(id=first_id + i, name=f"Partner {i}", email=f"partner{i}@example.com", password="x",
+             role="Delivery Partner", pin_code=PIN_CODE)
+        for i in range(PARTNERS - 1)
+    ])
+    db.flush()
+    db.add_all([DeliveryPartner(user_id=first_id + i, pin_code=PIN_CODE, available=True) for i in range(PARTNERS - 1)])
+    db.commit()
+
+
+@pytest.mark.parametrize("dispatcher", [True, False], ids=["dispatcher", "table"])
+def test_no_partner_is_assigned_twice(db, seeded, monkeypatch, dispatcher):
+    monkeypatch.setattr(partner_dispatcher, "enabled", dispatcher)
+    seed_partners(db)
+    start_gate = threading.Barrier(THREADS)
+
+    def worker():
+        start_gate.wait()
+        return [
+            delivery_service.assign_delivery_partner(RESTAURANT_ID, session_factory=SessionLocal)
+            for _ in range(CALLS_PER_THREAD)
+        ]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        futures = [executor.submit(worker) for _ in range(THREADS)]
+        results = [user_id for future in futures for user_id in future.result(timeout=30)]
+
+    assigned = [user_id for user_id in results if user_id is not None]
+    assert [user_id for user_id, n in Counter(assigned).items() if n > 1] == []
+    db.expire_all()
+    still_available = db.query(DeliveryPartner).filter(DeliveryPartner.available == True).count()
+    assert len(assigned) <= PARTNERS
+    assert len(assigned) + still_available == PARTNERS
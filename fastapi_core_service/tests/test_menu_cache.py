@@ -0,0 +1,59 @@
+"""
+Menu and restaurant list caches: misses load from the primary, so an entry
+invalidated after a write is not reloaded from a replica that has not
+received the write yet.
+"""
+from app.database import ReplicaSessionLocal, SessionLocal
+from app.models.models import Dish, Restaurant
+from app.services.menu_service import invalidate_menu
+from app.services.restaurant_service import invalidate_restaurant_list
+from tests.conftest import PIN_CODE, RESTAURANT_ID, seed
+
+
+def menu_names(client, headers) -> list:
+    response = client.get(f"/api/restaurants/{RESTAURANT_ID}/menu", headers=headers)
+    assert response.status_code == 200
+    return [dish["name"] for dish in response.json()]
+
+
+def test_menu_reloads_from_the_primary_after_invalidation(client, customer_headers):
+    seed(SessionLocal)
+    seed(ReplicaSessionLocal)
+    assert menu_names(client, customer_headers) == ["Dish 1", "Dish 2"]
+
+    # Owner adds a dish; the replica lags behind
+    db = SessionLocal()
+    db.add(Dish(restaurant_id=RESTAURANT_ID, name="Dish 3", price="30.50"))
+    db.commit()
+    db.close()
+    invalidate_menu(RESTAURANT_ID)
+
+    assert menu_names(client, customer_headers) == ["Dish 1", "Dish 2", "Dish 3"]
+
+
+def test_menu_is_served_from_the_cache(client, customer_headers, seeded):
+    assert menu_names(client, customer_headers) == ["Dish 1", "Dish 2"]
+
+    db = SessionLocal()
+    db.query(Dish).filter(Dish.id == 2).update({Dish.available: False})
+    db.commit()
+    db.close()
+
+    # Not invalidated: still the cached menu
+    assert menu_names(client, customer_headers) == ["Dish 1", "Dish 2"]
+
+
+def test_restaurant_list_reloads_from_the_primary_after_invalidation(client, customer_headers):
+    seed(SessionLocal)
+    seed(ReplicaSessionLocal)
+    response = client.get("/api/restaurants", headers=customer_headers)
+    assert [restaurant["name"] for restaurant in response.json()] == ["Restaurant"]
+
+    db = SessionLocal()
+    db.query(Restaurant).filter(Restaurant.id == RESTAURANT_ID).update({Restaurant.name: "Renamed"})
+    db.commit()
+    db.close()
+    invalidate_restaurant_list(PIN_CODE)
+
+    response = client.get("/api/restaurants", headers=customer_headers)
+    assert [restaurant["name"] for restaurant in response.json()] == ["Renamed"]
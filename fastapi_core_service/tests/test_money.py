@@ -0,0 +1,119 @@
+"""
+Pricing in integer paise gives exactly the Decimals (value and two-decimal
+representation) of the Decimal formulas it replaced, and Dish.price_paise
+computed by the database equals to_money(Dish.price).
+"""
+import random
+from decimal import ROUND_HALF_EVEN, Decimal
+import pytest
+from sqlalchemy.orm import undefer
+from app.database import SessionLocal
+from app.models.models import Dish
+from app.services import offer_service, order_service
+from app.services.pricing_index import OfferRule
+from app.utils.money import CENT, ZERO, to_basis_points, to_decimal, to_money
+from tests.conftest import RESTAURANT_ID, seed
+
+MAX_PAISE = 10 ** 10 - 1  # Numeric(10, 2)
+MAX_BASIS_POINTS = 10 ** 5 - 1  # Numeric(5, 2)
+CASES = 3000
+
+
+# The Decimal formulas of cart_service.get_cart, offer_service.calculate_discount
+# and order_service.calculate_order_total before pricing moved to paise
+def decimal_discount(percentage, order_amount):
+    if percentage is None:
+        return Decimal("0.00")
+    return round((order_amount * percentage) / Decimal("100"), 2)
+
+
+def decimal_total(items_total, discount, delivery_fee, platform_fee):
+    return round(items_total - discount + delivery_fee + platform_fee, 2)
+
+
+def offer(percentage):
+    if percentage is None:
+        return None
+    return OfferRule(1, None, to_basis_points(percentage), ZERO, False)
+
+
+def amount(rng: random.Random, high: int = MAX_PAISE) -> Decimal:
+    return to_decimal(rng.choice([rng.randint(0, high), rng.randint(0, 10000)]))
+
+
+def assert_same(expected: Decimal, actual: Decimal) -> None:
+    """Equal value and equal representation (what the JSON responses show)."""
+    assert str(actual) == str(expected)
+
+
+@pytest.mark.parametrize("paise", [0, 1, 5, 10, 99, 100, MAX_PAISE])
+def test_round_trip(paise):
+    assert_same(to_decimal(paise), to_decimal(to_money(to_decimal(paise))))
+
+
+@pytest.mark.parametrize("value", ["0.005", "0.015", "0.025", "1.234", "2.675", "-1.015"])
+def test_to_money_rounds_half_even(value):
+    expected = Decimal(value).quantize(CENT, rounding=ROUND_HALF_EVEN)
+    assert_same(expected, to_decimal(to_money(Decimal(value))))
+
+
+# Ties (x.xx5 before rounding) in both directions
+@pytest.mark.parametrize("order_amount, percentage", [
+    ("1.00", "0.50"), ("3.00", "0.50"), ("0.10", "5.00"), ("0.30", "5.00"),
+    ("999.90", "12.50"), ("0.01", "50.00"), ("0.03", "50.00"), ("0.00", "99.99"),
+])
+def test_discount_ties(order_amount, percentage):
+    order_amount, percentage = Decimal(order_amount), Decimal(percentage)
+    assert_same(decimal_discount(percentage, order_amount),
+                to_decimal(offer_service.calculate_discount(offer(percentage), to_money(order_amount))))
+
+
+def test_cart_lines_and_subtotal_match_decimal():
+    rng = random.Random(7)
+    for _ in range(CASES):
+        lines = rng.randint(0, 30)
+        prices = [amount(rng, 10 ** 6) for _ in range(lines)]
+        quantities = [rng.randint(1, 50) for _ in range(lines)]
+        expected_subtotal = Decimal("0.00")
+        subtotal = ZERO
+        for price, quantity in zip(prices, quantities):
+            line = to_money(price) * quantity
+            assert_same(price * quantity, to_decimal(line))
+            expected_subtotal += price * quantity
+            subtotal += line
+        assert_same(expected_subtotal, to_decimal(subtotal))
+
+
+def test_discount_and_total_match_decimal():
+    rng = random.Random(7)
+    for _ in range(CASES):
+        order_amount = amount(rng)
+        percentage = rng.choice([None, to_decimal(rng.randint(0, MAX_BASIS_POINTS)),
+                                 to_decimal(rng.randint(1, 200) * 50)])
+        expected_discount = decimal_discount(percentage, order_amount)
+        discount = offer_service.calculate_discount(offer(percentage), to_money(order_amount))
+        assert_same(expected_discount, to_decimal(discount))
+
+        delivery_fee, platform_fee = amount(rng, 10 ** 5), amount(rng, 10 ** 5)
+        total = order_service.calculate_order_total(
+            to_money(order_amount), discount, to_money(delivery_fee), to_money(platform_fee)
+        )
+        assert_same(decimal_total(order_amount, expected_discount, delivery_fee, platform_fee), to_decimal(total))
+
+
+def test_price_paise_matches_to_money(db):
+    seed(SessionLocal, dishes=0)
+    rng = random.Random(7)
+    # Includes prices that are not exact in binary floating point (e.g. 0.29 * 100)
+    prices = [to_decimal(paise) for paise in [0, 1, 29, 57, 115, 1005, 99999, MAX_PAISE]]
+    prices += [amount(rng) for _ in range(CASES)]
+    db.add_all([
+        Dish(restaurant_id=RESTAURANT_ID, name=f"Dish {i}", price=price) for i, price in enumerate(prices)
+    ])
+    db.commit()
+    db.expunge_all()
+
+    dishes = db.query(Dish).options(undefer(Dish.price_paise)).all()
+    assert len(dishes) == len(prices)
+    for dish in dishes:
+        assert dish.price_paise == to_money(dish.price)
@@ -0,0 +1,76 @@
+"""
+Order events: status changes record the restaurant owner without loading the
+restaurant, and the live order stream is published only once the event is
+committed as done, so a retried event does not publish twice.
+"""
+from datetime import datetime
+import pytest
+from app import database
+from app.database import SessionLocal
+from app.models.models import Order, OrderEvent, OrderStatus
+from app.services import order_events, order_state
+from app.services.order_events import ORDER_STATUS_CHANGED, OrderEventDispatcher
+from tests.conftest import CUSTOMER_ID, OWNER_ID, RESTAURANT_ID, StatementCounter
+
+
+@pytest.fixture
+def order(db, seeded):
+    order = Order(
+        customer_id=CUSTOMER_ID, restaurant_id=RESTAURANT_ID, status=OrderStatus.PLACED.value,
+        total_amount="100.00", discount_amount="0.00", delivery_fee="30.00", platform_fee="5.00",
+        payment_mode="cash"
+    )
+    db.add(order)
+    db.commit()
+    return order.id
+
+
+@pytest.fixture
+def published(monkeypatch):
+    published = []
+    monkeypatch.setattr(order_events, "publish_order_status", lambda *args: published.append(args))
+    return published
+
+
+def start_preparing(order_id: int) -> None:
+    db = SessionLocal()
+    order_state.transition(db, order_id, order_state.RESTAURANT_OWNER, OrderStatus.PREPARING.value)
+    db.commit()
+    db.close()
+
+
+def test_status_change_is_one_statement_with_the_owner(db, order):
+    with StatementCounter(database.engine) as counter:
+        updated = order_state.transition(db, order, order_state.RESTAURANT_OWNER, OrderStatus.PREPARING.value)
+    assert counter.count == 1
+    assert updated.status == OrderStatus.PREPARING.value
+    db.commit()
+
+    payload = db.query(OrderEvent.payload).filter(OrderEvent.event_type == ORDER_STATUS_CHANGED).scalar()
+    assert payload["restaurant_owner_id"] == OWNER_ID
+
+
+def test_stream_is_published_once_after_a_retried_event(db, order, published, monkeypatch):
+    start_preparing(order)
+    attempts = []
+
+    def fails_once(session, payload):
+        attempts.append(payload["status"])
+        if len(attempts) == 1:
+            raise RuntimeError("handler failed")
+
+    monkeypatch.setitem(order_events.HANDLERS, ORDER_STATUS_CHANGED,
+                        [*order_events.HANDLERS[ORDER_STATUS_CHANGED], fails_once])
+    dispatcher = OrderEventDispatcher(session_factory=SessionLocal)
+
+    assert dispatcher.dispatch_once() == 1
+    assert published == []
+
+    # Due again right away instead of after the backoff
+    db.query(OrderEvent).update({OrderEvent.available_at: datetime.utcnow()})
+    db.commit()
+    assert dispatcher.dispatch_once() == 1
+
+    assert attempts == [OrderStatus.PREPARING.value] * 2
+    assert published == [(order, OrderStatus.PREPARING.value, [CUSTOMER_ID, OWNER_ID, None])]
+    assert db.query(OrderEvent.status).filter(OrderEvent.event_type == ORDER_STATUS_CHANGED).scalar() == "done"
@@ -0,0 +1,66 @@
+"""
+Order listings serialize a page of orders with their items in at most
+MAX_STATEMENTS statements, whatever the page size or items per order.
+"""
+import pytest
+from fastapi import Response
+from app import database
+from app.database import SessionLocal
+from app.models.models import Order, OrderItem
+from app.services import order_service
+from app.utils.pagination import NEXT_CURSOR_HEADER, PageParams
+from tests.conftest import CUSTOMER_ID, RESTAURANT_ID, StatementCounter, seed
+
+# Orders page + items of the whole page
+MAX_STATEMENTS = 2
+ORDERS = 120
+
+
+def seed_orders(orders: int, items: int) -> None:
+    db = SessionLocal()
+    for _ in range(orders):
+        order = Order(
+            customer_id=CUSTOMER_ID, restaurant_id=RESTAURANT_ID, status="delivered",
+            total_amount="100.00", discount_amount="0.00", delivery_fee="25.00",
+            platform_fee="4.00", payment_mode="cod"
+        )
+        order.items = [
+            OrderItem(dish_id=dish_id, quantity=1, price_snapshot=f"{dish_id * 10}.50")
+            for dish_id in range(1, items + 1)
+        ]
+        db.add(order)
+    db.commit()
+    db.close()
+
+
+def pages(limit: int) -> list:
+    """Page through all orders; (order ids, items, statements) per page."""
+    result = []
+    cursor = None
+    while True:
+        db = SessionLocal()
+        response = Response()
+        with StatementCounter(database.engine) as counter:
+            page = order_service.order_page(
+                db, PageParams(cursor=cursor, limit=limit), response, Order.customer_id == CUSTOMER_ID
+            )
+            items = sum(len(order.items) for order in page)
+        result.append(([order.id for order in page], items, counter.count))
+        db.close()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return result
+
+
+@pytest.mark.parametrize("limit, items", [(50, 4), (10, 1), (100, 8)])
+def test_order_pages_take_constant_statements(limit, items):
+    seed(SessionLocal, items)
+    seed_orders(ORDERS, items)
+
+    result = pages(limit)
+
+    order_ids = [order_id for ids, _, _ in result for order_id in ids]
+    assert sorted(order_ids) == list(range(1, ORDERS + 1))
+    for ids, page_items, statements in result:
+        assert page_items == len(ids) * items
+        assert statements <= MAX_STATEMENTS
@@ -0,0 +1,46 @@
+"""
+Pricing index reloads never wait on a reload in progress (with
+DB_ASYNC_ENABLED a waiting caller would block the event loop the reload
+needs): an expired snapshot is served meanwhile, a bumped one is reloaded.
+"""
+import threading
+from app import database
+from app.models.models import Fee
+from app.services.pricing_index import PricingIndex
+from tests.conftest import RESTAURANT_ID, StatementCounter
+
+
+def in_thread(fn):
+    """Run fn in a thread; fail instead of hanging if it blocks."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert result, "blocked on the reload in progress"
+    return result[0]
+
+
+def test_expired_snapshot_is_served_during_another_reload(db, seeded):
+    index = PricingIndex(ttl=0)
+    index.load(db)
+    db.add(Fee(restaurant_id=RESTAURANT_ID, delivery_fee="10.00", platform_fee="1.00"))
+    db.commit()
+
+    with index._load_lock:  # another caller is reloading
+        with StatementCounter(database.engine) as counter:
+            fees = in_thread(lambda: index.fees_for(db, RESTAURANT_ID))
+    assert counter.count == 0
+    assert fees.restaurant_id is None
+
+
+def test_bumped_snapshot_is_reloaded_during_another_reload(db, seeded):
+    index = PricingIndex()
+    index.load(db)
+    db.add(Fee(restaurant_id=RESTAURANT_ID, delivery_fee="10.00", platform_fee="1.00"))
+    db.commit()
+    index.bump()
+
+    with index._load_lock:
+        fees = in_thread(lambda: index.fees_for(db, RESTAURANT_ID))
+    assert fees.restaurant_id == RESTAURANT_ID
+    assert not index.needs_reload()
@@ -0,0 +1,123 @@
+"""
+Batch quotes equal the checkout path (offer_service.apply_offer,
+order_service.get_fees and calculate_order_total) for random restaurants,
+subtotals and customers: first-time-only offers for customers with and
+without counters, equal discounts (the first offer wins, as with max()),
+and restaurants without offers or fees.
+"""
+import random
+from app.database import SessionLocal
+from app.models.models import CustomerStats, Fee, Offer, Order, Restaurant, User
+from app.services import offer_service, order_service
+from app.services.pricing_index import pricing_index
+from app.services.quote_engine import quote_engine
+from app.utils.money import to_decimal
+from tests.conftest import PIN_CODE
+
+OWNER_ID = 1
+RESTAURANTS = 40
+CUSTOMERS = 30
+QUOTES = 2000
+# Few distinct percentages and thresholds, so equal discounts are common
+PERCENTAGES = ["5.00", "10.00", "12.50", "33.33"]
+MIN_ORDER_VALUES = ["0.00", "99.00", "250.00", "500.00"]
+
+
+def seed_pricing(rng: random.Random) -> None:
+    db = SessionLocal()
+    db.add(User(id=OWNER_ID, name="Owner", email="owner@example.com", password="x",
+                role="Restaurant Owner", pin_code=PIN_CODE))
+    db.add_all([
+        User(id=customer_id, name=f"Customer {customer_id}", email=f"c{customer_id}@example.com",
+             password="x", role="Customer", pin_code=PIN_CODE)
+        for customer_id in range(2, CUSTOMERS + 2)
+    ])
+    db.add_all([
+        Restaurant(id=restaurant_id, name=f"Restaurant {restaurant_id}", owner_id=OWNER_ID, pin_code=PIN_CODE)
+        for restaurant_id in range(1, RESTAURANTS + 1)
+    ])
+    db.flush()
+
+    def offer(restaurant_id):
+        return Offer(restaurant_id=restaurant_id, discount_percentage=rng.choice(PERCENTAGES),
+                     min_order_value=rng.choice(MIN_ORDER_VALUES), first_time_user_only=rng.random() < 0.3,
+                     active=rng.random() < 0.9)
+
+    db.add_all([offer(None) for _ in range(4)])
+    db.add(Fee(restaurant_id=None, delivery_fee="30.00", platform_fee="5.00"))
+    for restaurant_id in range(1, RESTAURANTS + 1):
+        db.add_all([offer(restaurant_id) for _ in range(rng.choice([0, 1, 2, 3, 4]))])
+        if rng.random() < 0.4:
+            db.add(Fee(restaurant_id=restaurant_id, delivery_fee=to_decimal(rng.randint(0, 6000)),
+                       platform_fee=to_decimal(rng.randint(0, 1000))))
+
+    # Counters with and without orders, and no counters (before the backfill) with and without orders
+    for customer_id in range(2, CUSTOMERS + 2):
+        kind = customer_id % 4
+        if kind < 2:
+            db.add(CustomerStats(customer_id=customer_id, order_count=kind * rng.randint(1, 5), lifetime_spend=0))
+        elif kind == 3:
+            db.add(Order(customer_id=customer_id, restaurant_id=1, status=rng.choice(["delivered", "cancelled"]),
+                         total_amount="100.00", discount_amount="0.00", delivery_fee="30.00",
+                         platform_fee="5.00", payment_mode="cash"))
+    db.commit()
+    db.close()
+
+
+def checkout_quote(db, restaurant_id: int, subtotal: int, customer_id: int) -> tuple:
+    offer, discount = offer_service.apply_offer(db, customer_id, restaurant_id, subtotal)
+    delivery_fee, platform_fee = order_service.get_fees(db, restaurant_id)
+    total = order_service.calculate_order_total(subtotal, discount, delivery_fee, platform_fee)
+    return offer.id if offer else None, discount, delivery_fee, platform_fee, total
+
+
+def batch_quotes(db, restaurant_ids, subtotals, customer_ids) -> list:
+    quotes = quote_engine.quote(db, restaurant_ids, subtotals, customer_ids)
+    return [
+        (offer_id if offer_id >= 0 else None, discount, delivery_fee, platform_fee, total)
+        for offer_id, discount, delivery_fee, platform_fee, total in zip(
+            quotes.offer_id.tolist(), quotes.discount.tolist(), quotes.delivery_fee.tolist(),
+            quotes.platform_fee.tolist(), quotes.total.tolist()
+        )
+    ]
+
+
+def test_batch_quotes_match_checkout(db):
+    rng = random.Random(7)
+    seed_pricing(rng)
+    # Restaurants past RESTAURANTS have no rows; subtotals hit offer thresholds and rounding ties
+    restaurant_ids = [rng.randint(1, RESTAURANTS + 5) for _ in range(QUOTES)]
+    subtotals = [rng.choice([rng.randint(0, 100000), rng.randint(1, 400) * 4, 9900, 50000]) for _ in range(QUOTES)]
+    customer_ids = [rng.randint(2, CUSTOMERS + 1) for _ in range(QUOTES)]
+
+    expected = [
+        checkout_quote(db, restaurant_id, subtotal, customer_id)
+        for restaurant_id, subtotal, customer_id in zip(restaurant_ids, subtotals, customer_ids)
+    ]
+    assert batch_quotes(db, restaurant_ids, subtotals, customer_ids) == expected
+
+    # The cases above were actually exercised
+    first_time_offers = {offer.id for offer in db.query(Offer).filter(Offer.first_time_user_only == True)}
+    assert any(offer_id in first_time_offers for offer_id, *_ in expected)
+    assert any(restaurant_id > RESTAURANTS for restaurant_id in restaurant_ids)
+    ties = 0
+    for restaurant_id, subtotal, customer_id in zip(restaurant_ids, subtotals, customer_ids):
+        offers = offer_service.get_applicable_offers(db, customer_id, restaurant_id, subtotal)
+        own = [offer for offer in offers if offer.restaurant_id == restaurant_id] or offers
+        best = max((offer.discount_basis_points for offer in own), default=None)
+        ties += sum(offer.discount_basis_points == best for offer in own) > 1
+    assert ties
+
+
+def test_without_offers_or_fees(db):
+    seed_pricing(random.Random(7))
+    db.query(Offer).delete()
+    db.query(Fee).delete()
+    db.commit()
+    pricing_index.bump()
+
+    restaurant_ids, subtotals, customer_ids = [1, RESTAURANTS + 1], [10000, 0], [2, 3]
+    assert batch_quotes(db, restaurant_ids, subtotals, customer_ids) == [
+        checkout_quote(db, restaurant_id, subtotal, customer_id)
+        for restaurant_id, subtotal, customer_id in zip(restaurant_ids, subtotals, customer_ids)
+    ]
@@ -0,0 +1,89 @@
+"""
+Read replica routing (get_read_db) against two SQLite files: reads go to the
+replica, recent writers and replica-less setups stay on the primary, and a
+replica read does not keep a primary connection checked out. Quotes, which
+may reload the shared pricing index, always read the primary.
+"""
+from sqlalchemy import event
+from app import database
+from app.database import ReplicaSessionLocal, SessionLocal
+from app.dependencies.read_routing import mark_recent_write
+from app.models.models import Offer, Order
+from app.services.pricing_index import pricing_index
+from tests.conftest import CUSTOMER_ID, RESTAURANT_ID, seed
+
+
+def add_order(session_factory, total: str) -> None:
+    db = session_factory()
+    db.add(Order(
+        customer_id=CUSTOMER_ID, restaurant_id=RESTAURANT_ID, status="delivered", total_amount=total,
+        discount_amount="0.00", delivery_fee="30.00", platform_fee="5.00", payment_mode="cod"
+    ))
+    db.commit()
+    db.close()
+
+
+def history_totals(client, headers) -> list:
+    response = client.get("/api/orders/history", headers=headers)
+    assert response.status_code == 200
+    return [order["total_amount"] for order in response.json()]
+
+
+def setup_databases():
+    # The replica lags: it has not received the primary's second order yet
+    seed(SessionLocal)
+    seed(ReplicaSessionLocal)
+    add_order(SessionLocal, "100.00")
+    add_order(ReplicaSessionLocal, "100.00")
+    add_order(SessionLocal, "200.00")
+
+
+def test_reads_go_to_the_replica(client, customer_headers):
+    setup_databases()
+    assert history_totals(client, customer_headers) == ["100.00"]
+
+
+def test_recent_writer_reads_from_the_primary(client, customer_headers):
+    setup_databases()
+    mark_recent_write(CUSTOMER_ID)
+    assert history_totals(client, customer_headers) == ["200.00", "100.00"]
+
+
+def test_without_replica_reads_use_the_primary(client, customer_headers, monkeypatch):
+    setup_databases()
+    monkeypatch.setattr(database, "REPLICA_ENABLED", False)
+    assert history_totals(client, customer_headers) == ["200.00", "100.00"]
+
+
+def test_replica_read_releases_the_primary_connection(client, customer_headers):
+    setup_databases()
+    primary_checked_out = []
+
+    def on_replica_execute(*args):
+        primary_checked_out.append(database.engine.pool.checkedout())
+
+    event.listen(database.replica_engine, "before_cursor_execute", on_replica_execute)
+    try:
+        assert history_totals(client, customer_headers) == ["100.00"]
+    finally:
+        event.remove(database.replica_engine, "before_cursor_execute", on_replica_execute)
+
+    # The user was authenticated on the primary, which is closed before the replica is used
+    assert primary_checked_out and max(primary_checked_out) == 0
+
+
+def test_quotes_reload_pricing_from_the_primary(client, customer_headers):
+    seed(SessionLocal)
+    seed(ReplicaSessionLocal)
+    # The replica has not received the new offer yet
+    db = SessionLocal()
+    db.add(Offer(restaurant_id=RESTAURANT_ID, discount_percentage="10.00", min_order_value="0.00"))
+    db.commit()
+    db.close()
+    pricing_index.bump()
+
+    response = client.post("/api/quotes/batch", headers=customer_headers, json={
+        "items": [{"restaurant_id": RESTAURANT_ID, "subtotal": "200.00"}]
+    })
+    assert response.status_code == 200
+    assert response.json()["quotes"][0]["discount_amount"] == "20.00"
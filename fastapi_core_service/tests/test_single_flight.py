@@ -0,0 +1,87 @@
+"""
+SingleFlight, shared by the response caches and the idempotency store:
+concurrent callers with one key and tag share a run, other tags start their
+own, and a waiter takes over when the running request is cancelled.
+"""
+import asyncio
+from app.utils.single_flight import SingleFlight
+
+
+def counting(calls: list, result="result", gate: asyncio.Event = None):
+    async def fn():
+        calls.append(result)
+        if gate is not None:
+            await gate.wait()
+        return result
+    return fn
+
+
+def test_concurrent_callers_share_one_run():
+    async def scenario():
+        flight, calls, gate = SingleFlight(), [], asyncio.Event()
+        tasks = [asyncio.create_task(flight.run("key", 1, lambda: None, counting(calls, gate=gate)))
+                 for _ in range(5)]
+        await asyncio.sleep(0)
+        gate.set()
+        assert await asyncio.gather(*tasks) == ["result"] * 5
+        assert calls == ["result"]
+        assert flight.waits == 4
+        assert len(flight) == 0
+
+    asyncio.run(scenario())
+
+
+def test_lookup_result_skips_the_call():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        assert await flight.run("key", 1, lambda: "stored", counting(calls)) == "stored"
+        assert calls == []
+
+    asyncio.run(scenario())
+
+
+def test_other_tag_starts_its_own_call():
+    async def scenario():
+        flight, calls, gate = SingleFlight(), [], asyncio.Event()
+        old = asyncio.create_task(flight.run("key", 1, lambda: None, counting(calls, "old", gate)))
+        await asyncio.sleep(0)
+        new = asyncio.create_task(flight.run("key", 2, lambda: None, counting(calls, "new", gate)))
+        await asyncio.sleep(0)
+        assert flight.tag("key") == 2
+        gate.set()
+        assert await asyncio.gather(old, new) == ["old", "new"]
+        assert len(flight) == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiter_takes_over_from_a_cancelled_call():
+    async def scenario():
+        flight, calls, gate = SingleFlight(), [], asyncio.Event()
+        first = asyncio.create_task(flight.run("key", 1, lambda: None, counting(calls, "first", gate)))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.run("key", 1, lambda: None, counting(calls, "waiter")))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await waiter == "waiter"
+        assert calls == ["first", "waiter"]
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_waiters_and_are_not_kept():
+    async def scenario():
+        flight, gate = SingleFlight(), asyncio.Event()
+
+        async def fail():
+            await gate.wait()
+            raise ValueError("load failed")
+
+        tasks = [asyncio.create_task(flight.run("key", 1, lambda: None, fail)) for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await flight.run("key", 1, lambda: None, counting([])) == "result"
+
+    asyncio.run(scenario())
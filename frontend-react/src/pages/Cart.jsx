@@ -1,11 +1,17 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { customerAPI } from '../../services/api';
+import { customerAPI, newIdempotencyKey } from '../../services/api';
 
 const Cart = () => {
   const [cart, setCart] = useState(null);
   const [loading, setLoading] = useState(true);
   const [paymentMode, setPaymentMode] = useState('cash');
+  // Reused across retries and double clicks of the same checkout;
+  // generated once, not on every render
+  const checkoutKey = useRef(null);
+  if (checkoutKey.current === null) {
+    checkoutKey.current = newIdempotencyKey();
+  }
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -34,7 +40,8 @@ const Cart = () => {
 
   const handleCheckout = async () => {
     try {
-      await customerAPI.checkout({ payment_mode: paymentMode });
+      await customerAPI.checkout({ payment_mode: paymentMode }, checkoutKey.current);
+      checkoutKey.current = newIdempotencyKey();
       navigate('/orders');
     } catch (error) {
       alert(error.response?.data?.detail || 'Checkout failed');
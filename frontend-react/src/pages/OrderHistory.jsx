@@ -1,20 +1,38 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { customerAPI } from '../../services/api';
+import { customerAPI, openOrderStream } from '../../services/api';
 
 const OrderHistory = () => {
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const navigate = useNavigate();
 
   useEffect(() => {
     loadOrders();
+
+    // Live status updates instead of polling
+    const stream = openOrderStream();
+    stream.addEventListener('order_status', (event) => {
+      const { order_id, status } = JSON.parse(event.data);
+      if (status === 'placed') {
+        // New order (e.g. placed from another device)
+        loadOrders();
+        return;
+      }
+      setOrders((current) =>
+        current.map((order) => (order.id === order_id ? { ...order, status } : order))
+      );
+    });
+    return () => stream.close();
   }, []);
 
   const loadOrders = async () => {
     try {
       const response = await customerAPI.getOrders();
       setOrders(response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error loading orders:', error);
     } finally {
@@ -22,6 +40,19 @@ const OrderHistory = () => {
     }
   };
 
+  const loadMoreOrders = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await customerAPI.getOrders(nextCursor);
+      setOrders((current) => [...current, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error loading orders:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleReorder = async (orderId) => {
     try {
       await customerAPI.reorder(orderId);
@@ -121,6 +152,17 @@ const OrderHistory = () => {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div className="text-center">
+                <button
+                  onClick={loadMoreOrders}
+                  disabled={loadingMore}
+                  className="px-4 py-2 bg-white border border-indigo-600 text-indigo-600 rounded hover:bg-indigo-50 disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -3,6 +3,9 @@ import { useNavigate } from 'react-router-dom';
 import { customerAPI } from '../../services/api';
 import { useAuth } from '../../context/AuthContext';
 
+// The customer's pin code plus its nearest neighbouring zones
+const NEARBY_ZONES = 3;
+
 const RestaurantList = () => {
   const [restaurants, setRestaurants] = useState([]);
   const [pinCode, setPinCode] = useState('');
@@ -20,7 +23,7 @@ const RestaurantList = () => {
   const loadRestaurants = async (pc) => {
     setLoading(true);
     try {
-      const response = await customerAPI.getRestaurants(pc || null);
+      const response = await customerAPI.getRestaurants(pc || null, NEARBY_ZONES);
       setRestaurants(response.data);
     } catch (error) {
       console.error('Error loading restaurants:', error);
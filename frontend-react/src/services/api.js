@@ -64,19 +64,43 @@ export const authAPI = {
   getCurrentUser: () => api.get(`${AUTH_BASE_URL}/users/me`),
 };
 
+// Server-Sent Events stream of the current user's order status changes.
+// EventSource cannot send headers, so the access token goes in the query string.
+export const openOrderStream = () => {
+  const token = localStorage.getItem('access_token');
+  return new EventSource(`${API_BASE_URL}/stream/orders?token=${encodeURIComponent(token)}`);
+};
+
+// Random v4 UUID for the checkout Idempotency-Key. crypto.randomUUID only
+// exists in secure contexts (HTTPS, localhost); getRandomValues works everywhere.
+export const newIdempotencyKey = () => {
+  if (typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID();
+  }
+  const bytes = crypto.getRandomValues(new Uint8Array(16));
+  bytes[6] = (bytes[6] & 0x0f) | 0x40;
+  bytes[8] = (bytes[8] & 0x3f) | 0x80;
+  const hex = Array.from(bytes, (byte) => byte.toString(16).padStart(2, '0')).join('');
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+};
+
 export const customerAPI = {
-  getRestaurants: (pinCode) => api.get('/restaurants', { params: { pin_code: pinCode } }),
+  getRestaurants: (pinCode, zones = 1) => api.get('/restaurants', { params: { pin_code: pinCode, zones } }),
   getMenu: (restaurantId) => api.get(`/restaurants/${restaurantId}/menu`),
   addToCart: (data) => api.post('/cart/add', data),
   removeFromCart: (data) => api.post('/cart/remove', data),
   getCart: () => api.get('/cart'),
-  checkout: (data) => api.post('/checkout', data),
-  getOrders: () => api.get('/orders/history'),
+  checkout: (data, idempotencyKey) => api.post('/checkout', data, {
+    headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
+  }),
+  getOrders: (cursor) => api.get('/orders/history', { params: { cursor } }),
   getOrder: (orderId) => api.get(`/orders/${orderId}`),
   cancelOrder: (orderId) => api.post(`/orders/${orderId}/cancel`),
   reorder: (orderId) => api.post(`/orders/${orderId}/reorder`),
   createComplaint: (data) => api.post('/complaints', data),
   getComplaints: () => api.get('/complaints'),
+  // items: [{ restaurant_id, subtotal }] -> { quotes: [...] } with best offer, fees and total
+  getQuotes: (items) => api.post('/quotes/batch', { items }),
 };
 
 export const restaurantAPI = {
@@ -84,19 +108,19 @@ export const restaurantAPI = {
   updateDish: (dishId, data) => api.put(`/restaurant/dishes/${dishId}`, data),
   deleteDish: (dishId) => api.delete(`/restaurant/dishes/${dishId}`),
   getDishes: () => api.get('/restaurant/dishes'),
-  getOrders: () => api.get('/restaurant/orders'),
+  getOrders: (cursor) => api.get('/restaurant/orders', { params: { cursor } }),
   updateOrderStatus: (orderId, status) => api.put(`/restaurant/orders/${orderId}/status`, { status }),
   toggleOrdering: (enabled) => api.put('/restaurant/toggle-ordering', { is_ordering_enabled: enabled }),
 };
 
 export const deliveryAPI = {
   toggleAvailability: (available) => api.put('/delivery/toggle-availability', { available }),
-  getAssignedOrders: () => api.get('/delivery/assigned-orders'),
+  getAssignedOrders: (cursor) => api.get('/delivery/assigned-orders', { params: { cursor } }),
   updateOrderStatus: (orderId, status) => api.put(`/delivery/orders/${orderId}/status`, { status }),
 };
 
 export const supportAPI = {
-  getComplaints: (status) => api.get('/support/complaints', { params: { status_filter: status } }),
+  getComplaints: (status, cursor) => api.get('/support/complaints', { params: { status_filter: status, cursor } }),
   resolveComplaint: (complaintId, notes) => api.put(`/support/complaints/${complaintId}/resolve`, { resolution_notes: notes }),
 };
 
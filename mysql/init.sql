@@ -58,17 +58,27 @@ CREATE TABLE IF NOT EXISTS orders (
     delivery_fee DECIMAL(10, 2) NOT NULL,
     platform_fee DECIMAL(10, 2) NOT NULL,
     payment_mode ENUM('cash', 'card', 'upi') NOT NULL,
+    -- Idempotency-Key of the placing checkout and a hash of its body
+    idempotency_key VARCHAR(255),
+    request_fingerprint CHAR(64),
     created_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
     updated_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     FOREIGN KEY (customer_id) REFERENCES users_user(id) ON DELETE CASCADE,
     FOREIGN KEY (restaurant_id) REFERENCES restaurants(id) ON DELETE CASCADE,
     FOREIGN KEY (delivery_partner_id) REFERENCES users_user(id) ON DELETE SET NULL,
-    INDEX idx_customer (customer_id),
-    INDEX idx_restaurant (restaurant_id),
-    INDEX idx_delivery_partner (delivery_partner_id),
+    -- (owner, created_at, id): keyset pagination of newest-first listings
+    INDEX idx_customer_created (customer_id, created_at, id),
+    INDEX idx_restaurant_created (restaurant_id, created_at, id),
+    INDEX idx_delivery_partner_created (delivery_partner_id, created_at, id),
     INDEX idx_status (status),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    -- One order per checkout Idempotency-Key across all workers (NULLs don't collide)
+    UNIQUE KEY uq_customer_idempotency_key (customer_id, idempotency_key)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+-- Existing databases:
+--   ALTER TABLE orders ADD COLUMN idempotency_key VARCHAR(255) AFTER payment_mode,
+--     ADD COLUMN request_fingerprint CHAR(64) AFTER idempotency_key,
+--     ADD UNIQUE KEY uq_customer_idempotency_key (customer_id, idempotency_key);
 
 -- OrderItems table
 CREATE TABLE IF NOT EXISTS order_items (
@@ -105,7 +115,8 @@ CREATE TABLE IF NOT EXISTS complaints (
     resolved_at DATETIME(6),
     FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
     FOREIGN KEY (customer_id) REFERENCES users_user(id) ON DELETE CASCADE,
-    INDEX idx_status (status),
+    INDEX idx_status_created (status, created_at, id),
+    INDEX idx_created (created_at, id),
     INDEX idx_customer (customer_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -148,4 +159,33 @@ CREATE TABLE IF NOT EXISTS notifications (
     INDEX idx_order (order_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Per-customer order counters (maintained by FastAPI on checkout/cancel;
+-- backfill with: python -m app.services.customer_stats --backfill)
+CREATE TABLE IF NOT EXISTS customer_stats (
+    customer_id INT PRIMARY KEY,
+    order_count INT NOT NULL DEFAULT 0,
+    lifetime_spend DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    last_order_at DATETIME,
+    FOREIGN KEY (customer_id) REFERENCES users_user(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Order events outbox (written in the same transaction as the order change)
+CREATE TABLE IF NOT EXISTS order_events (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    order_id INT NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    payload JSON NOT NULL,
+    status ENUM('pending', 'processing', 'done', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    available_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    claimed_by VARCHAR(36),
+    locked_until DATETIME(6),
+    last_error TEXT,
+    created_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    processed_at DATETIME(6),
+    FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
+    INDEX idx_status_available (status, available_at),
+    INDEX idx_order (order_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 SET FOREIGN_KEY_CHECKS=1;